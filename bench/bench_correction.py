@@ -0,0 +1,171 @@
+"""
+OCR correction benchmark: cost per token of finding dictionary words within
+edit distance k, for each search path, and how often each path's correction
+agrees with the DAWG search (including SymSpell's, when installed).
+
+Tokens are OCR output from data/: the expected text of the OCR cases in
+data/cases.csv, misreads Tesseract produced on those images, and seeded
+OCR-style corruptions of dictionary words (0/O, 1/I, 5/S, rn/m, dropped
+letters). With --ocr, Tesseract's raw output on the data/ images is added.
+
+Paths:
+  full-dp    unbounded O(n*m) DP against every dictionary word (the old fallback)
+  bounded    bounded_levenshtein() against every dictionary word
+  dawg       Corrector.candidates(): pruned walk over the memory-mapped DAWG
+  numpy      nearest(): tokens x same-length-window words, batched DP rows
+  symspell   SymSpell.lookup() (if symspellpy is installed)
+
+Usage:
+  python bench/bench_correction.py
+  python bench/bench_correction.py --max-distance 2 --synthetic 500 --ocr
+"""
+
+import argparse
+import csv
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / 'ocr' / 'ocr-app' / 'src'))
+
+from ocr_app.correction import Corrector, bounded_levenshtein, nearest
+from ocr_app.dictionary import CompactDictionary
+from ocr_app.utils import load_english_dictionary, load_symspell
+
+DEFAULT_CASES = project_root / 'data' / 'cases.csv'
+
+# Misreads Tesseract produced on the data/ images (see the corrections in ocr_app.utils)
+OBSERVED_MISREADS = ['SOP', 'STGP', 'ST0P', 'STQP', 'WSIS', 'NAPPY', 'TALIVATIN', 'MERI', 'FRO']
+
+# Common OCR confusions, applied to clean words to make synthetic misreads
+CONFUSIONS = [('O', '0'), ('I', '1'), ('S', '5'), ('B', '8'), ('M', 'RN'), ('E', 'F'),
+              ('H', 'N'), ('G', '6'), ('L', 'I'), ('C', 'G')]
+
+
+def full_dp(a: str, b: str) -> int:
+    """The unbounded row-by-row DP the correction fallback used before."""
+    if a == b:
+        return 0
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        prev = cur
+    return prev[-1]
+
+
+def expected_words(csv_path: Path) -> list:
+    words = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if (row.get('expected_module') or '').strip().lower() == 'ocr':
+                words += re.findall(r"[A-Za-z]{2,}", row.get('expected_output') or '')
+    return [w.upper() for w in words]
+
+
+def corrupt(word: str, rng: random.Random) -> str:
+    """One OCR-style error: a confusion substitution, else a dropped letter."""
+    options = [(src, dst) for src, dst in CONFUSIONS if src in word]
+    if options and rng.random() < 0.7:
+        src, dst = rng.choice(options)
+        i = rng.choice([m.start() for m in re.finditer(src, word)])
+        return word[:i] + dst + word[i + len(src):]
+    i = rng.randrange(len(word))
+    return word[:i] + word[i + 1:]
+
+
+def tesseract_tokens(csv_path: Path) -> list:
+    import pytesseract
+    from PIL import Image
+
+    images = set()
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if (row.get('expected_module') or '').strip().lower() == 'ocr':
+                images.add(project_root / row['image_path'])
+    tokens = []
+    for path in sorted(images):
+        tokens += pytesseract.image_to_string(Image.open(path)).upper().split()
+    return tokens
+
+
+def build_tokens(args, words: list) -> list:
+    rng = random.Random(args.seed)
+    tokens = expected_words(Path(args.cases)) + OBSERVED_MISREADS
+    pool = [w for w in words if 3 <= len(w) <= 12]
+    tokens += [corrupt(rng.choice(pool), rng) for _ in range(args.synthetic)]
+    if args.ocr:
+        tokens += tesseract_tokens(Path(args.cases))
+    return tokens
+
+
+def best(matches: list):
+    """Unique closest (word, distance) match, else None - the rule Corrector.correct() uses."""
+    matches = sorted(matches, key=lambda m: (m[1], m[0]))
+    if not matches or (len(matches) > 1 and matches[1][1] == matches[0][1]):
+        return None
+    return matches[0][0]
+
+
+def time_path(name: str, tokens: list, fn) -> dict:
+    start = time.perf_counter()
+    results = fn(tokens)
+    seconds = time.perf_counter() - start
+    return {'path': name, 'tokens': len(tokens), 'us_per_token': seconds / len(tokens) * 1e6,
+            'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark OCR correction search paths")
+    parser.add_argument('--dictionary', help="Compact dictionary file (default: load_english_dictionary())")
+    parser.add_argument('--cases', default=str(DEFAULT_CASES))
+    parser.add_argument('--max-distance', type=int, default=1)
+    parser.add_argument('--synthetic', type=int, default=200, help="Synthetic misreads to add")
+    parser.add_argument('--scan-limit', type=int, default=50,
+                        help="Tokens timed on the full-dictionary scans (they are slow)")
+    parser.add_argument('--ocr', action='store_true', help="Add Tesseract output on the data/ images")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    dictionary = CompactDictionary.open(args.dictionary) if args.dictionary else load_english_dictionary()
+    words = list(dictionary)
+    tokens = build_tokens(args, words)
+    k = args.max_distance
+    corrector = Corrector(dictionary, k)
+    print(f"{len(words)} dictionary words, {len(tokens)} tokens, max distance {k}")
+
+    def scan(distance):
+        def run(batch):
+            return [best([(w, d) for w in words if (d := distance(t, w)) <= k]) for t in batch]
+        return run
+
+    sample = tokens[:args.scan_limit]
+    runs = [
+        time_path('full-dp', sample, scan(full_dp)),
+        time_path('bounded', sample, scan(lambda a, b: bounded_levenshtein(a, b, k))),
+        time_path('dawg', tokens, lambda batch: [best(corrector.candidates(t)) for t in batch]),
+        time_path('numpy', tokens, lambda batch: nearest(batch, words, k)),
+    ]
+    symspell = load_symspell()
+    if symspell is not None:
+        from symspellpy import Verbosity
+        runs.append(time_path('symspell', tokens, lambda batch: [
+            (s[0].term.upper() if (s := symspell.lookup(t.lower(), Verbosity.CLOSEST,
+                                                         max_edit_distance=k)) else None)
+            for t in batch]))
+    else:
+        print("symspellpy not installed; skipping the SymSpell comparison")
+
+    reference = runs[2]['results']  # dawg covers every token
+    print(f"\n{'path':<10} {'tokens':>7} {'us/token':>12} {'agrees w/ dawg':>15}")
+    for run in runs:
+        agree = sum(a == b for a, b in zip(run['results'], reference)) / run['tokens']
+        print(f"{run['path']:<10} {run['tokens']:>7} {run['us_per_token']:>12.1f} {agree:>14.0%}")
+
+
+if __name__ == '__main__':
+    main()
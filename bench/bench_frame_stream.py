@@ -0,0 +1,189 @@
+"""
+Camera stream benchmark: OCR work and accuracy of reading a sign from every
+frame versus ui/frame_stream.py's sampled frames with temporal voting.
+
+A handheld clip is simulated: a rendered sign with small hand jitter, bursts
+of fast motion (shifted, motion-blurred frames), and noise. Each OCR'd frame
+is read by a simulated reader that misreads characters more often on blurrier
+frames and reports a lower confidence for them (seeded, so runs repeat);
+--ocr uses ocr.ocr_module.extract_frame() instead (needs the tesseract binary).
+
+Reported per mode:
+  every frame  OCR calls, share of frames read exactly right, text changes
+               a client would see (flicker)
+  stream       OCR calls, sampling cost per frame, updates emitted, frame of
+               the first correct update, final text
+
+Usage:
+  python bench/bench_frame_stream.py
+  python bench/bench_frame_stream.py --frames 600 --text "PLATFORM 4 TRAINS TO BOSTON" --ocr
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from bench.stats import summarize
+from ui.frame_stream import FrameSampler, FrameStream, sharpness
+
+CONFUSIONS = {'O': '0', '0': 'O', 'I': '1', '1': 'I', 'E': 'F', 'S': '5', 'B': '8', 'T': 'I', 'A': '4'}
+
+
+def make_clip(text: str, frames: int, rng: random.Random) -> list:
+    """(RGB frame, blur level) per frame of a simulated handheld clip."""
+    base = np.full((360, 640, 3), 205, dtype=np.uint8)
+    cv2.rectangle(base, (20, 100), (620, 260), (30, 90, 30), -1)
+    cv2.putText(base, text, (40, 200), cv2.FONT_HERSHEY_SIMPLEX,
+                min(2.0, 560 / (22 * max(1, len(text)))), (255, 255, 255), 3)
+    clip, moving = [], 0
+    for _ in range(frames):
+        if moving == 0 and rng.random() < 0.03:
+            moving = rng.randint(4, 12)  # a burst of fast camera motion
+        if moving:
+            moving -= 1
+            dx, dy, blur = rng.randint(-40, 40), rng.randint(-20, 20), rng.choice((9, 15, 21))
+        else:
+            dx, dy, blur = rng.randint(-2, 2), rng.randint(-1, 1), rng.choice((0, 0, 0, 3))
+        frame = np.roll(base, (dy, dx), axis=(0, 1))
+        if blur:
+            kernel = np.zeros((blur, blur), dtype=np.float32)
+            kernel[blur // 2, :] = 1.0 / blur  # horizontal motion blur
+            frame = cv2.filter2D(frame, -1, kernel)
+        noise = np.random.default_rng(rng.randrange(1 << 30)).normal(0, 4, frame.shape)
+        clip.append((np.clip(frame + noise, 0, 255).astype(np.uint8), blur))
+    return clip
+
+
+class SimulatedReader:
+    """OCR stand-in: misreads characters more on blurred frames, with matching confidence."""
+
+    def __init__(self, text: str, seed: int):
+        self.words = text.split()
+        self.rng = random.Random(seed)
+
+    def __call__(self, frame: np.ndarray, blur: int) -> tuple:
+        error = 0.03 + 0.02 * blur
+        words, conf = [], []
+        for word in self.words:
+            read = ''.join(CONFUSIONS.get(c, c) if self.rng.random() < error else c for c in word)
+            if self.rng.random() < error / 2:
+                continue  # word missed
+            words.append(read)
+            conf.append(max(5.0, self.rng.gauss(92 if read == word else 45, 8) - 2 * blur))
+        return words, conf
+
+
+def run(clip, truth, read) -> dict:
+    """Every frame vs the sampled, voted stream; read(index) -> (text, words, confidences)."""
+    per_frame = [read(i) for i in range(len(clip))]
+    texts = [t for t, _, _ in per_frame]
+    every = {
+        'ocr_calls': len(clip),
+        'frames_correct': sum(t == truth for t in texts) / len(clip),
+        'text_changes': sum(a != b for a, b in zip(texts, texts[1:])),
+    }
+
+    stream = FrameStream('bench', sampler=FrameSampler())
+    current = {}
+
+    class Layout:
+        def __init__(self, words, conf):
+            self.words, self.conf = words, conf
+
+        def __len__(self):
+            return len(self.words)
+
+    def ocr(_image):
+        text, words, conf = per_frame[current['index']]
+        return text, Layout(words, conf)
+
+    updates, first_correct, push_ms = [], None, []
+    for index, (frame, _) in enumerate(clip):
+        current['index'] = index
+        start = time.perf_counter()
+        update = stream.push(frame, ocr)
+        push_ms.append((time.perf_counter() - start) * 1e3)
+        if update is not None:
+            updates.append({'frame': update.frame, 'text': update.text})
+            if first_correct is None and update.text == truth:
+                first_correct = update.frame
+    voted = {
+        'ocr_calls': stream.ocr_frames,
+        'skipped': dict(stream.skipped),
+        'updates': updates,
+        'first_correct_frame': first_correct,
+        'final_text': stream.text,
+        'final_correct': stream.text == truth,
+        'push_ms': summarize(push_ms),
+    }
+    return {'every_frame': every, 'stream': voted}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sampled, voted OCR on a camera stream")
+    parser.add_argument('--text', default="EMERGENCY EXIT STAIRS")
+    parser.add_argument('--frames', type=int, default=300, help="Frames in the clip (~10 s at 30 fps)")
+    parser.add_argument('--ocr', action='store_true', help="Use Tesseract instead of the simulated reader")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    clip = make_clip(args.text, args.frames, rng)
+    truth = args.text
+
+    if args.ocr:
+        import pytesseract
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception as exc:
+            raise SystemExit(f"tesseract is required for --ocr: {exc}")
+        from ocr.ocr_module import extract_frame
+        cache = {}
+
+        def read(index):
+            if index not in cache:
+                text, layout = extract_frame(Image.fromarray(clip[index][0]), profile='signs')
+                words = list(layout.words) if layout is not None else []
+                conf = [float(c) for c in layout.conf] if layout is not None else []
+                cache[index] = (' '.join(words), words, conf)
+            return cache[index]
+    else:
+        reader = SimulatedReader(truth, args.seed)
+        readings = [reader(frame, blur) for frame, blur in clip]
+
+        def read(index):
+            words, conf = readings[index]
+            return ' '.join(words), words, conf
+
+    result = run(clip, truth, read)
+    every, stream = result['every_frame'], result['stream']
+    gray = cv2.cvtColor(clip[0][0], cv2.COLOR_RGB2GRAY)
+    print(f"{args.frames} frames of \"{truth}\" ({'tesseract' if args.ocr else 'simulated reader'}); "
+          f"first frame sharpness {sharpness(gray):.0f}")
+    print(f"\nevery frame: {every['ocr_calls']} OCR calls, {every['frames_correct']:.0%} of frames "
+          f"read exactly, {every['text_changes']} text changes")
+    print(f"stream:      {stream['ocr_calls']} OCR calls "
+          f"({stream['ocr_calls'] / args.frames:.0%} of frames), skipped {stream['skipped']}")
+    print(f"             {len(stream['updates'])} update(s), first correct at frame "
+          f"{stream['first_correct_frame']}, final \"{stream['final_text']}\" "
+          f"({'correct' if stream['final_correct'] else 'wrong'})")
+    print(f"             push p50 {stream['push_ms']['p50']:.2f} ms/frame without OCR time")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({'text': truth, 'frames': args.frames, **result}, indent=2))
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
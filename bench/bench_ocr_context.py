@@ -0,0 +1,155 @@
+"""
+OCR context injection benchmark: prompt tokens and VQA latency when the whole
+OCR text is appended to the question versus the relevance-filtered context
+from ui/ocr_context.py.
+
+Documents are long-text images rendered from dictionary words, with one line
+that answers the question ("needle"). The rendered lines, with seeded
+confidences, stand in for the OCR result, so no Tesseract is needed; with
+--ocr the images are OCR'd with ocr.ocr_module.extract_structured() instead.
+
+Token counts use the VQA backend's tokenizer when --backend has one, else the
+word/punctuation estimate. VQA latency is measured only with --backend.
+
+Usage:
+  python bench/bench_ocr_context.py
+  python bench/bench_ocr_context.py --lines 120 --budget 48 --backend blip2
+  python bench/bench_ocr_context.py --backend blip-base --ocr
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'ocr' / 'ocr-app' / 'src'))
+
+from bench.stats import summarize
+from ocr_app.utils import load_english_dictionary
+from ui.ocr_context import (
+    DEFAULT_TOKEN_BUDGET, ContextLine, approximate_tokens, build_ocr_context, context_lines,
+)
+
+# (question, line that answers it)
+NEEDLES = [
+    ("What is the total amount due?", "TOTAL AMOUNT DUE 84.20"),
+    ("When does the pharmacy close?", "PHARMACY CLOSES AT 9 PM"),
+    ("What is the account number?", "ACCOUNT NUMBER 5521 0938"),
+    ("Which platform does the train leave from?", "TRAIN TO BOSTON PLATFORM 4"),
+]
+
+
+def make_document(n_lines: int, needle: str, words: list, rng: random.Random) -> list:
+    """ContextLines of filler text with the needle at a random line."""
+    texts = [' '.join(rng.choice(words) for _ in range(rng.randint(4, 9))) for _ in range(n_lines)]
+    texts.insert(rng.randrange(n_lines + 1), needle)
+    return [ContextLine(text, round(rng.uniform(55, 96), 1), i) for i, text in enumerate(texts)]
+
+
+def render(lines: list, path: Path) -> Path:
+    height = 20 * len(lines) + 20
+    image = Image.new('RGB', (900, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((10, 10 + 20 * i), line.text, fill='black')
+    image.save(path)
+    return path
+
+
+def prompt_for(question: str, text: str) -> str:
+    # same template as ui/app.py run_vqa()
+    return f"{question}\n\nDetected text in image: {text}" if text else question
+
+
+def time_vqa(vqa_model, backend: str, image: str, prompt: str, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vqa_model.answer_question(image, prompt, backend=backend)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark relevance-filtered OCR context injection")
+    parser.add_argument('--documents', type=int, default=8)
+    parser.add_argument('--lines', type=int, default=80, help="Filler lines per document")
+    parser.add_argument('--budget', type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument('--backend', default=None, help="VQA backend for tokenizer and latency")
+    parser.add_argument('--repeat', type=int, default=3, help="VQA runs per prompt")
+    parser.add_argument('--ocr', action='store_true', help="OCR the rendered images instead")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    words = [w for w in load_english_dictionary() if 3 <= len(w) <= 10]
+
+    count_tokens, counter = approximate_tokens, 'approximate'
+    vqa_model = None
+    if args.backend:
+        from vqa import vqa_model
+        if vqa_model.count_tokens([''], backend=args.backend) is not None:
+            count_tokens = lambda texts: vqa_model.count_tokens(texts, backend=args.backend)
+            counter = 'tokenizer'
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for d in range(args.documents):
+            question, needle = NEEDLES[d % len(NEEDLES)]
+            lines = make_document(args.lines, needle, words, rng)
+            image = str(render(lines, Path(tmp) / f"doc{d}.png"))
+            if args.ocr:
+                from ocr.ocr_module import extract_structured, normalize_ocr
+                text, layout = extract_structured(image)
+                lines = context_lines(text, layout, normalize=normalize_ocr)
+
+            full = build_ocr_context(question, lines, budget=0, count_tokens=count_tokens)
+            start = time.perf_counter()
+            filtered = build_ocr_context(question, lines, budget=args.budget, count_tokens=count_tokens)
+            build_seconds = time.perf_counter() - start
+            row = {
+                'question': question,
+                'full_tokens': full.tokens,
+                'filtered_tokens': filtered.tokens,
+                'lines_used': filtered.lines_used,
+                'lines_total': filtered.lines_total,
+                'needle_kept': needle in filtered.text,
+                'build_ms': build_seconds * 1e3,
+            }
+            if vqa_model is not None:
+                vqa_model.answer_question(image, question, backend=args.backend)  # warm up
+                row['full_seconds'] = summarize(time_vqa(vqa_model, args.backend, image,
+                                                         prompt_for(question, full.text), args.repeat))
+                row['filtered_seconds'] = summarize(time_vqa(vqa_model, args.backend, image,
+                                                             prompt_for(question, filtered.text), args.repeat))
+            rows.append(row)
+
+    print(f"{args.documents} documents, ~{args.lines} lines each, budget {args.budget} tokens "
+          f"({counter} counts)")
+    print(f"\n{'full tok':>9} {'kept tok':>9} {'lines':>9} {'needle':>7} {'build ms':>9}"
+          + (f" {'full s':>8} {'kept s':>8}" if vqa_model is not None else ''))
+    for row in rows:
+        line = (f"{row['full_tokens']:>9} {row['filtered_tokens']:>9} "
+                f"{row['lines_used']:>4}/{row['lines_total']:<4} {str(row['needle_kept']):>7} "
+                f"{row['build_ms']:>9.2f}")
+        if vqa_model is not None:
+            line += f" {row['full_seconds']['p50']:>8.2f} {row['filtered_seconds']['p50']:>8.2f}"
+        print(line)
+
+    if args.out:
+        report = {'budget': args.budget, 'token_counter': counter, 'backend': args.backend,
+                  'documents': rows}
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
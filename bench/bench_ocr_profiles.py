@@ -0,0 +1,110 @@
+"""
+OCR profile benchmark: speed and accuracy of each ocr_app.config profile on
+the OCR cases of the evaluation set.
+
+Every profile runs the full ocr_module pipeline (its PSM passes, whitelist,
+dictionaries and spell-correction setting) on every OCR case image. "auto"
+uses the profile the API would pick for the case's question. Accuracy uses
+the evaluation's answer check (evaluate_system.check_answer_similarity) plus
+the share of expected words found. Set OCR_TESSDATA_FAST_DIR to time the
+profiles on tessdata_fast models.
+
+Needs the tesseract binary.
+
+Usage:
+  python bench/bench_ocr_profiles.py
+  python bench/bench_ocr_profiles.py --profiles default,signs,auto --repeat 3
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from bench.stats import summarize
+
+DEFAULT_CASES = project_root / 'data' / 'cases.csv'
+
+
+def load_cases(csv_path: Path) -> list:
+    """(image path, question, expected text) of every OCR case."""
+    cases = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if (row.get('expected_module') or '').strip().lower() == 'ocr':
+                cases.append((str(project_root / row['image_path']), row['question'],
+                              row.get('expected_output') or ''))
+    return cases
+
+
+def word_recall(expected: str, actual: str) -> float:
+    words = set(re.findall(r"\w+", expected.upper()))
+    return len(words & set(re.findall(r"\w+", actual.upper()))) / len(words) if words else 0.0
+
+
+def run_profile(ocr_module, profile: str, cases: list, repeat: int, is_correct) -> dict:
+    latencies, correct, recall, outputs = [], 0, 0.0, []
+    for image, question, expected in cases:
+        name = ocr_module.profile_for_question(question) if profile == 'auto' else profile
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = ocr_module.extract_text(image, detect_text_first=False, profile=name)
+            latencies.append(time.perf_counter() - start)
+        correct += bool(is_correct(expected, text))
+        recall += word_recall(expected, text)
+        outputs.append({'image': image, 'profile': name, 'expected': expected, 'output': text})
+    return {
+        'profile': profile,
+        'seconds': summarize(latencies),
+        'accuracy': correct / len(cases),
+        'word_recall': recall / len(cases),
+        'outputs': outputs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark OCR tuning profiles")
+    parser.add_argument('--cases', default=str(DEFAULT_CASES))
+    parser.add_argument('--profiles', default=None,
+                        help="Comma-separated profiles (default: all, plus 'auto')")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per image (timing only)")
+    parser.add_argument('--out', default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    import pytesseract
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as exc:
+        raise SystemExit(f"tesseract is required for this benchmark: {exc}")
+
+    from evaluate_system import check_answer_similarity
+    from ocr import ocr_module
+
+    profiles = (args.profiles.split(',') if args.profiles
+                else sorted(ocr_module.PROFILES) + ['auto'])
+    cases = load_cases(Path(args.cases))
+    if not cases:
+        raise SystemExit(f"No OCR cases in {args.cases}")
+    ocr_module.extract_text(cases[0][0], detect_text_first=False)  # warm up the dictionary
+
+    results = [run_profile(ocr_module, p, cases, args.repeat, check_answer_similarity)
+               for p in profiles]
+    print(f"{len(cases)} OCR cases, {args.repeat} run(s) each")
+    print(f"\n{'profile':<10} {'p50 s':>7} {'mean s':>7} {'accuracy':>9} {'word recall':>12}")
+    for r in results:
+        print(f"{r['profile']:<10} {r['seconds']['p50']:>7.3f} {r['seconds']['mean']:>7.3f} "
+              f"{r['accuracy']:>9.0%} {r['word_recall']:>12.0%}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({'cases': args.cases, 'results': results}, indent=2))
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Orientation benchmark: cost and accuracy of ocr_app.preprocess's skew/rotation
+correction, and what it saves in Tesseract passes.
+
+Documents are rendered lines of dictionary words, tilted by a known angle and
+optionally turned 90/180/270 degrees. The benchmark reports the skew error and
+the time to estimate (cold and cached) and apply the correction. With --ocr it
+also runs ocr_module.extract_structured() with and without correction
+(OCR_ORIENTATION and deskewing toggled) and reports seconds, Tesseract passes
+and word recall. --ocr needs the tesseract binary.
+
+Usage:
+  python bench/bench_orientation.py
+  python bench/bench_orientation.py --documents 20 --max-skew 12 --turns --ocr
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'ocr' / 'ocr-app' / 'src'))
+
+from bench.stats import summarize
+from ocr_app import preprocess
+from ocr_app.utils import load_english_dictionary
+
+
+def make_document(words: list, rng: random.Random, width: int, lines: int) -> tuple:
+    """(RGB array, text) of dark lines of words on white."""
+    arr = np.full((60 * lines + 80, width, 3), 255, dtype=np.uint8)
+    texts = []
+    for i in range(lines):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(3, 6))).upper()
+        cv2.putText(arr, text, (40, 70 + 60 * i), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3)
+        texts.append(text)
+    return arr, '\n'.join(texts)
+
+
+def distort(arr: np.ndarray, skew: float, turn: int) -> np.ndarray:
+    """Tilt counter-clockwise by skew degrees, then turn counter-clockwise by turn degrees."""
+    h, w = arr.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), skew, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_w, new_h = int(h * sin + w * cos), int(h * cos + w * sin)
+    matrix[0, 2] += new_w / 2.0 - w / 2.0
+    matrix[1, 2] += new_h / 2.0 - h / 2.0
+    arr = cv2.warpAffine(arr, matrix, (new_w, new_h), borderValue=(255, 255, 255))
+    return np.ascontiguousarray(np.rot90(arr, k=turn // 90))
+
+
+def word_recall(expected: str, actual: str) -> float:
+    words = set(re.findall(r"\w+", expected.upper()))
+    return len(words & set(re.findall(r"\w+", actual.upper()))) / len(words) if words else 0.0
+
+
+def run_ocr(ocr_module, path: str, expected: str, correct: bool) -> dict:
+    passes = []
+    original = ocr_module.OCR.perform_ocr_layout
+
+    def counting(self, image, binarized=False):
+        passes.append(1)
+        return original(self, image, binarized=binarized)
+
+    saved = (preprocess.ORIENTATION_MODE, preprocess.MIN_SKEW)
+    if not correct:
+        preprocess.ORIENTATION_MODE, preprocess.MIN_SKEW = 'off', float('inf')
+    preprocess.clear_orientation_cache()
+    ocr_module.OCR.perform_ocr_layout = counting
+    try:
+        start = time.perf_counter()
+        text, _ = ocr_module.extract_structured(path, detect_text_first=False)
+        seconds = time.perf_counter() - start
+    finally:
+        ocr_module.OCR.perform_ocr_layout = original
+        preprocess.ORIENTATION_MODE, preprocess.MIN_SKEW = saved
+    return {'seconds': seconds, 'passes': len(passes), 'recall': word_recall(expected, text)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark orientation and skew correction")
+    parser.add_argument('--documents', type=int, default=12)
+    parser.add_argument('--width', type=int, default=1600, help="Document width in pixels")
+    parser.add_argument('--lines', type=int, default=10)
+    parser.add_argument('--max-skew', type=float, default=10.0)
+    parser.add_argument('--turns', action='store_true', help="Also turn pages by 90/180/270")
+    parser.add_argument('--ocr', action='store_true', help="Compare OCR with and without correction")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    words = [w for w in load_english_dictionary() if 3 <= len(w) <= 8]
+    ocr_module = None
+    if args.ocr:
+        import pytesseract
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception as exc:
+            raise SystemExit(f"tesseract is required for --ocr: {exc}")
+        from ocr import ocr_module
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for d in range(args.documents):
+            clean, text = make_document(words, rng, args.width, args.lines)
+            skew = round(rng.uniform(-args.max_skew, args.max_skew), 1)
+            turn = rng.choice((0, 90, 180, 270)) if args.turns else 0
+            arr = distort(clean, skew, turn)
+            path = str(Path(tmp) / f"doc{d}.png")
+            Image.fromarray(arr).save(path)
+            data = Path(path).read_bytes()
+            digest = preprocess.image_digest(data)
+
+            preprocess.clear_orientation_cache()
+            start = time.perf_counter()
+            found = preprocess.cached_orientation(digest, arr)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            preprocess.cached_orientation(digest, arr)
+            cached = time.perf_counter() - start
+            start = time.perf_counter()
+            preprocess.apply_orientation(arr, found)
+            apply = time.perf_counter() - start
+
+            row = {
+                'skew': skew, 'turn': turn, 'found': found.to_dict(),
+                'skew_error': abs(found.skew - skew) if turn == found.rotate else None,
+                'estimate_ms': cold * 1e3, 'cached_ms': cached * 1e3, 'apply_ms': apply * 1e3,
+            }
+            if ocr_module is not None:
+                row['ocr_raw'] = run_ocr(ocr_module, path, text, correct=False)
+                row['ocr_corrected'] = run_ocr(ocr_module, path, text, correct=True)
+            rows.append(row)
+
+    errors = [r['skew_error'] for r in rows if r['skew_error'] is not None]
+    print(f"{len(rows)} documents, {args.width} px wide, skew within +/-{args.max_skew} deg"
+          + (", random turns" if args.turns else ""))
+    print(f"turn found: {sum(r['found']['rotate'] == r['turn'] for r in rows)}/{len(rows)}")
+    if errors:
+        print(f"skew error deg: mean {np.mean(errors):.2f}, max {max(errors):.2f}")
+    for key in ('estimate_ms', 'cached_ms', 'apply_ms'):
+        s = summarize([r[key] for r in rows])
+        print(f"{key:<12} p50 {s['p50']:8.3f}  p95 {s['p95']:8.3f}")
+    if ocr_module is not None:
+        print(f"\n{'':<10} {'p50 s':>7} {'passes':>7} {'word recall':>12}")
+        for key in ('ocr_raw', 'ocr_corrected'):
+            s = summarize([r[key]['seconds'] for r in rows])
+            passes = np.mean([r[key]['passes'] for r in rows])
+            recall = np.mean([r[key]['recall'] for r in rows])
+            print(f"{key[4:]:<10} {s['p50']:>7.3f} {passes:>7.2f} {recall:>12.0%}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({'documents': rows}, indent=2))
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
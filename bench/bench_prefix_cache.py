@@ -0,0 +1,93 @@
+"""
+Prefix KV-cache benchmark: several questions about one image, with and
+without reusing the image/prompt-prefix cache (vqa/prefix_cache.py).
+
+Needs the real BLIP-2 weights. With --max-new-tokens 1 generation is almost
+pure prefill, which isolates what the cache saves; the default keeps the
+production decoding settings.
+
+Usage:
+  python bench/bench_prefix_cache.py
+  python bench/bench_prefix_cache.py --image data/image6.jpg --questions 8 --max-new-tokens 1
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from bench.stats import summarize
+
+DEFAULT_IMAGE = project_root / 'data' / 'image5.jpg'
+QUESTIONS = [
+    "What color is the car?",
+    "What is in the background?",
+    "Is it day or night?",
+    "How many wheels are visible?",
+    "What is the road made of?",
+    "Is anyone in the car?",
+    "What brand is the car?",
+    "Describe the scene.",
+]
+
+
+def run_session(vqa_model, image: str, questions: list, reuse: bool) -> list:
+    """Per-question latencies for one session on `image`."""
+    vqa_model._prefix_cache.clear()
+    vqa_model._prefix_cache.max_entries = max(1, vqa_model._prefix_cache.max_entries)
+    vqa_model.PREFIX_CACHE_SIZE = vqa_model._prefix_cache.max_entries if reuse else 0
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        vqa_model.answer_question(image, question)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark prefix KV-cache reuse")
+    parser.add_argument('--image', default=str(DEFAULT_IMAGE))
+    parser.add_argument('--questions', type=int, default=len(QUESTIONS),
+                        help="Questions per session (cycled from a fixed list)")
+    parser.add_argument('--max-new-tokens', type=int, default=None,
+                        help="Override max_new_tokens (1 measures prefill only)")
+    parser.add_argument('--out', default=None, help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    from vqa import vqa_model
+    if args.max_new_tokens is not None:
+        vqa_model.GENERATION_KWARGS['max_new_tokens'] = args.max_new_tokens
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.questions)]
+
+    vqa_model.load_model()
+    vqa_model.answer_question(args.image, "warm up")
+
+    uncached = run_session(vqa_model, args.image, questions, reuse=False)
+    cached = run_session(vqa_model, args.image, questions, reuse=True)
+    if not vqa_model._prefix_supported:
+        raise SystemExit("Prefix reuse is not supported by the installed transformers version")
+
+    report = {
+        'image': args.image,
+        'generation_kwargs': dict(vqa_model.GENERATION_KWARGS),
+        'uncached_seconds': summarize(uncached),
+        'cached_first_seconds': cached[0],
+        'cached_followup_seconds': summarize(cached[1:]) if len(cached) > 1 else None,
+        'session_total_seconds': {'uncached': sum(uncached), 'cached': sum(cached)},
+    }
+    print(json.dumps(report, indent=2))
+    if len(cached) > 1:
+        speedup = report['uncached_seconds']['mean'] / report['cached_followup_seconds']['mean']
+        print(f"\nFollow-up question speedup: {speedup:.2f}x "
+              f"(session {sum(uncached):.2f}s -> {sum(cached):.2f}s)")
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
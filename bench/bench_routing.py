@@ -0,0 +1,110 @@
+"""
+Routing micro-benchmark: compiled keyword regex (ui.routing.route) vs the previous per-keyword
+substring scan.
+
+Reports microseconds per question (best of several passes) for the old scan,
+route() on distinct questions (cold cache) and on the repeated workload
+(warm cache), and route_batch(), plus how many of the workload questions the
+old and new routing send to different modules.
+
+Usage:
+  python bench/bench_routing.py
+  python bench/bench_routing.py --repeat 2000
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from ui.routing import route, route_batch
+
+DEFAULT_CASES = project_root / 'data' / 'cases.csv'
+
+# The keyword lists of the original ui/app.py determine_module(), copied as they were
+LEGACY_OCR_KEYWORDS = [
+    'read', 'text', 'says', 'written', 'word', 'letter',
+    'sign', 'label', 'caption', 'title', 'heading',
+    'number', 'digit', 'price', 'address', 'phone',
+    'email', 'url', 'date', 'name on', 'writing'
+]
+LEGACY_VQA_KEYWORDS = [
+    'what color', 'how many', 'where is', 'who is',
+    'what is', 'describe', 'show', 'look like',
+    'doing', 'wearing', 'holding', 'scene',
+    'background', 'object', 'person', 'animal'
+]
+
+
+def legacy_determine_module(question: str) -> str:
+    """The original routing: lowercase, then a substring test per keyword."""
+    question_lower = question.lower()
+    ocr_score = sum(1 for kw in LEGACY_OCR_KEYWORDS if kw in question_lower)
+    vqa_score = sum(1 for kw in LEGACY_VQA_KEYWORDS if kw in question_lower)
+    return 'ocr' if ocr_score > vqa_score else 'vqa'
+
+
+def load_questions(csv_path: Path) -> list:
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        questions = [(row.get('question') or '').strip() for row in csv.DictReader(f)]
+    return [q for q in questions if q]
+
+
+def time_per_call(fn, questions: list, repeat: int, rounds: int = 5) -> float:
+    """Microseconds per question: best of `rounds` timings of `repeat` passes over the workload."""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for q in questions:
+                fn(q)
+        best = min(best, time.perf_counter() - start)
+    return best / (repeat * len(questions)) * 1e6
+
+
+def distinct_questions(questions: list, repeat: int) -> list:
+    """`repeat` copies of the workload, each question made unique, so route() never hits its cache."""
+    return [f"{q} ({n})" for n in range(repeat) for q in questions]
+
+
+def time_batch(questions: list, repeat: int, rounds: int = 5) -> float:
+    """Microseconds per question for route_batch() over the whole workload."""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            route_batch(questions)
+        best = min(best, time.perf_counter() - start)
+    return best / (repeat * len(questions)) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark question routing")
+    parser.add_argument('--cases', default=str(DEFAULT_CASES), help="CSV with a question column")
+    parser.add_argument('--repeat', type=int, default=500, help="Passes over the workload")
+    args = parser.parse_args(argv)
+
+    questions = load_questions(Path(args.cases))
+    distinct = distinct_questions(questions, args.repeat)
+    legacy_us = time_per_call(legacy_determine_module, distinct, 1)
+    cold_us = time_per_call(route, distinct, 1)
+    warm_us = time_per_call(route, questions, args.repeat)
+    batch_us = time_batch(questions, args.repeat)
+    changed = [q for q in questions if legacy_determine_module(q) != route(q).module]
+
+    print(f"Questions: {len(questions)} x {args.repeat}")
+    print(f"  legacy substring scan : {legacy_us:8.2f} us/question")
+    print(f"  route(), cold cache   : {cold_us:8.2f} us/question")
+    print(f"  route(), warm cache   : {warm_us:8.2f} us/question")
+    print(f"  route_batch()         : {batch_us:8.2f} us/question")
+    print(f"  routed differently    : {len(changed)}")
+    for q in changed:
+        print(f"    - {q}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Text-presence detector evaluation: precision/recall and cost per image.
+
+Ground truth comes from the evaluation CSV: an image is labelled as containing
+text if any of its cases expects the OCR module. Scores are computed once and
+the decision threshold (min aligned character components) is swept, so the
+printed table shows the precision/recall trade-off for OCR_TEXT_MIN_ALIGNED.
+
+Usage:
+  python bench/bench_text_detect.py
+  python bench/bench_text_detect.py --thresholds 1,2,4,8,16 --repeat 5
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / 'ocr' / 'ocr-app' / 'src'))
+
+from ocr_app.textdetect import DEFAULT_MIN_ALIGNED, detect_text
+
+DEFAULT_CASES = project_root / 'data' / 'cases.csv'
+
+
+def load_labels(csv_path: Path) -> dict:
+    """image path -> True if any case for that image expects OCR."""
+    labels = {}
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            image = (row.get('image_path') or '').strip()
+            module = (row.get('expected_module') or '').strip().lower()
+            path = project_root / image
+            if image and path.exists():
+                labels[str(path)] = labels.get(str(path), False) or module == 'ocr'
+    return labels
+
+
+def precision_recall(scores: dict, labels: dict, threshold: int) -> tuple:
+    tp = sum(1 for p, s in scores.items() if s >= threshold and labels[p])
+    fp = sum(1 for p, s in scores.items() if s >= threshold and not labels[p])
+    fn = sum(1 for p, s in scores.items() if s < threshold and labels[p])
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    return precision, recall, tp, fp, fn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate the text-presence detector")
+    parser.add_argument('--cases', default=str(DEFAULT_CASES), help="CSV with image_path/expected_module")
+    parser.add_argument('--thresholds', default="1,2,3,4,6,8,12",
+                        help="Comma-separated min_aligned values to sweep")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per image")
+    args = parser.parse_args(argv)
+
+    labels = load_labels(Path(args.cases))
+    scores = {}
+    timings = []
+    print(f"{'image':<20} {'text':>5} {'score':>6} {'ms':>7}")
+    for path, label in sorted(labels.items()):
+        best = float('inf')
+        for _ in range(max(1, args.repeat)):
+            start = time.perf_counter()
+            presence = detect_text(path)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        scores[path] = presence.score
+        timings.append(best)
+        print(f"{Path(path).name:<20} {str(label):>5} {presence.score:>6} {best:>7.1f}")
+
+    print(f"\nmean {sum(timings) / len(timings):.1f} ms/image (incl. decode), "
+          f"max {max(timings):.1f} ms")
+    print(f"\n{'min_aligned':>11} {'precision':>9} {'recall':>6}  tp fp fn")
+    for threshold in (int(t) for t in args.thresholds.split(',')):
+        precision, recall, tp, fp, fn = precision_recall(scores, labels, threshold)
+        marker = "  (default)" if threshold == DEFAULT_MIN_ALIGNED else ""
+        print(f"{threshold:>11} {precision:>9.2f} {recall:>6.2f}  {tp:>2} {fp:>2} {fn:>2}{marker}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Tiled OCR benchmark: peak memory and wall time of OCR.full_ocr's whole-image
+upscaling versus ocr_app.tiling's overlapping tiles.
+
+Each mode runs in a fresh child process so its peak RSS (VmHWM, or ru_maxrss
+off Linux) is its own. The page is a white scan of --width x --height with lines of dictionary
+words, or --image. Both modes do the same work per pixel: scale, grayscale,
+fastNlMeansDenoising and adaptive threshold (OCR.binarize), then, with --ocr,
+one Tesseract image_to_data call per image or tile.
+
+  full   resize the whole image by --scale, binarize, OCR
+  tiled  tiled_layout() at --scale with --tile/--overlap/--workers
+
+Without --ocr only the preprocessing is measured; --ocr needs the tesseract
+binary and also reports the words found.
+
+Usage:
+  python bench/bench_tiled_ocr.py
+  python bench/bench_tiled_ocr.py --width 4000 --height 3000 --scale 2.0 --workers 4 --ocr
+  python bench/bench_tiled_ocr.py --image scan.jpg --ocr
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'ocr' / 'ocr-app' / 'src'))
+
+from ocr_app.layout import OcrLayout
+from ocr_app.tiling import TILE_OVERLAP, TILE_SIZE, TILE_WORKERS, tiled_layout
+
+MODES = ('full', 'tiled')
+
+
+def make_page(width: int, height: int, seed: int) -> Image.Image:
+    from ocr_app.utils import load_english_dictionary
+    rng = random.Random(seed)
+    words = [w for w in load_english_dictionary() if 3 <= len(w) <= 9]
+    arr = np.full((height, width, 3), 255, dtype=np.uint8)
+    for y in range(80, height - 40, 70):
+        text = ' '.join(rng.choice(words) for _ in range(width // 160)).upper()
+        cv2.putText(arr, text, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (0, 0, 0), 3)
+    noise = np.random.default_rng(seed).normal(0, 12, arr.shape)
+    return Image.fromarray(np.clip(arr + noise, 0, 255).astype(np.uint8))
+
+
+def binarize(image: Image.Image) -> Image.Image:
+    # same steps as OCR.binarize, without needing the tesseract binary
+    gray = cv2.cvtColor(np.asarray(image, dtype=np.uint8), cv2.COLOR_RGB2GRAY)
+    denoised = cv2.fastNlMeansDenoising(gray, h=10)
+    return Image.fromarray(cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                                 cv2.THRESH_BINARY, 11, 2))
+
+
+def recognizer(ocr: bool):
+    if not ocr:
+        return lambda image: (binarize(image), OcrLayout([], [], [], []))[1]
+    import pytesseract
+
+    def recognize(image):
+        data = pytesseract.image_to_data(binarize(image), config='--oem 3 --psm 3',
+                                         output_type=pytesseract.Output.DICT)
+        return OcrLayout.from_tesseract(data)
+    return recognize
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss keeps the parent's peak across fork/exec on Linux; VmHWM starts fresh
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker(args) -> dict:
+    """One mode in this process; reports its own peak RSS (and how much it added after loading)."""
+    image = Image.open(args.image).convert('RGB')
+    recognize = recognizer(args.ocr)
+    baseline_kb = peak_rss_kb()
+    start = time.perf_counter()
+    if args.worker == 'full':
+        w, h = image.size
+        scaled = image.resize((int(w * args.scale), int(h * args.scale)), Image.Resampling.LANCZOS)
+        layout = recognize(scaled)
+    else:
+        layout = tiled_layout(image, recognize, scale=args.scale, tile_size=args.tile,
+                              overlap=args.overlap, workers=args.workers)
+    seconds = time.perf_counter() - start
+    peak_kb = peak_rss_kb()
+    return {'mode': args.worker, 'seconds': seconds, 'peak_rss_mb': peak_kb / 1024,
+            'added_rss_mb': (peak_kb - baseline_kb) / 1024, 'words': len(layout)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tiled vs whole-image OCR preprocessing")
+    parser.add_argument('--image', default=None, help="Image to use instead of a synthetic page")
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--scale', type=float, default=2.0)
+    parser.add_argument('--tile', type=int, default=TILE_SIZE, help="Tile side in scaled pixels")
+    parser.add_argument('--overlap', type=int, default=TILE_OVERLAP)
+    parser.add_argument('--workers', type=int, default=TILE_WORKERS)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--ocr', action='store_true', help="Also run Tesseract")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Write the JSON report here")
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    forwarded = ['--scale', str(args.scale), '--tile', str(args.tile), '--overlap', str(args.overlap),
+                 '--workers', str(args.workers)] + (['--ocr'] if args.ocr else [])
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        image = args.image
+        if image is None:
+            # rendered here so the page's construction does not count toward the modes' RSS
+            image = str(Path(tmp) / 'page.png')
+            make_page(args.width, args.height, args.seed).save(image)
+        for mode in args.modes.split(','):
+            proc = subprocess.run([sys.executable, __file__, '--image', image, *forwarded, '--worker', mode],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise SystemExit(f"{mode} failed:\n{proc.stderr}")
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    source = args.image or f"synthetic {args.width}x{args.height}"
+    print(f"{source} at {args.scale}x, tiles {args.tile} px (+{args.overlap} overlap), "
+          f"{args.workers} workers, {'with' if args.ocr else 'without'} Tesseract")
+    print(f"\n{'mode':<6} {'seconds':>8} {'peak RSS MB':>12} {'added MB':>9} {'words':>6}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['seconds']:>8.2f} {r['peak_rss_mb']:>12.0f} "
+              f"{r['added_rss_mb']:>9.0f} {r['words']:>6}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({'args': vars(args), 'results': results}, indent=2))
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare two benchmark result files produced by bench/run_bench.py.
+
+Usage:
+  python bench/compare.py bench/results/before.json bench/results/after.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+
+def _index(report: dict) -> dict:
+    table = {}
+    for result in report.get('results', []):
+        for level in result.get('levels', []):
+            table[(result['scenario'], level['concurrency'])] = level
+    return table
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "   n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+def compare(before: dict, after: dict) -> list:
+    """Rows of (scenario, concurrency, metric, before, after, delta) for shared levels."""
+    rows = []
+    a, b = _index(before), _index(after)
+    for key in sorted(set(a) & set(b)):
+        old, new = a[key], b[key]
+        metrics = [('throughput_rps', old['throughput_rps'], new['throughput_rps'])]
+        for q in ('p50', 'p95', 'p99'):
+            metrics.append((q, old['latency_seconds'].get(q, 0), new['latency_seconds'].get(q, 0)))
+        metrics.append(('peak_rss_mb', old['peak_rss_bytes'] / 2**20, new['peak_rss_bytes'] / 2**20))
+        for name, x, y in metrics:
+            rows.append((key[0], key[1], name, x, y, _delta(x, y)))
+    return rows
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Compare two benchmark JSON files')
+    p.add_argument('before')
+    p.add_argument('after')
+    args = p.parse_args(argv)
+
+    before = json.loads(Path(args.before).read_text(encoding='utf-8'))
+    after = json.loads(Path(args.after).read_text(encoding='utf-8'))
+    print(f"{'scenario':<14} {'c':>3} {'metric':<15} {'before':>10} {'after':>10} {'delta':>8}")
+    for scenario, c, name, x, y, delta in compare(before, after):
+        print(f"{scenario:<14} {c:>3} {name:<15} {x:>10.4f} {y:>10.4f} {delta:>8}")
+
+
+if __name__ == '__main__':
+    main()
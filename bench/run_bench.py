@@ -0,0 +1,273 @@
+"""
+Latency/Throughput Benchmark for the Assistive-VQA pipeline
+
+Reports p50/p95/p99 latency, throughput at N concurrent clients, cold vs warm
+start and peak RSS for three scenarios:
+- ocr: ocr.ocr_module.extract_text
+- vqa: vqa.vqa_model.answer_question (once per --vqa-backends entry, as vqa:<backend>)
+- api: the full POST /api/query flow (in-process Flask test client, or --url)
+
+By default the models are replaced with stubs (bench/stub_models.py) so the
+suite runs without weights or Tesseract; pass --real to benchmark the actual
+modules. Results are written as JSON so runs can be compared with
+bench/compare.py.
+
+Usage:
+  python bench/run_bench.py
+  python bench/run_bench.py --scenarios api --concurrency 1,8,32 --requests 200
+  python bench/run_bench.py --real --scenarios ocr --out bench/results/ocr_real.json
+  python bench/run_bench.py --real --scenarios vqa --vqa-backends blip2,blip-base --concurrency 1
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from bench import stub_models
+from bench.stats import PeakRSSSampler, current_rss, summarize
+
+DEFAULT_CASES = project_root / 'data' / 'cases.csv'
+RESULTS_DIR = project_root / 'bench' / 'results'
+
+
+def load_workload(csv_path: Path) -> list:
+    """(image_path, question) pairs from the evaluation CSV, skipping missing images."""
+    workload = []
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            image = (row.get('image_path') or '').strip()
+            question = (row.get('question') or '').strip()
+            path = project_root / image
+            if image and question and path.exists():
+                workload.append((str(path), question))
+    if not workload:
+        raise SystemExit(f"No usable cases in {csv_path}")
+    return workload
+
+
+def make_ocr_call():
+    from ocr.ocr_module import extract_text
+
+    def call(image_path, question):
+        return extract_text(image_path)
+    return call
+
+
+def make_vqa_call(backend: str | None = None):
+    from vqa.vqa_model import answer_question
+
+    def call(image_path, question):
+        return answer_question(image_path, question, backend=backend)
+    return call
+
+
+def make_api_call(url: str | None = None):
+    if url:
+        import requests
+
+        def call(image_path, question):
+            with open(image_path, 'rb') as f:
+                resp = requests.post(f"{url.rstrip('/')}/api/query",
+                                     data={'question': question},
+                                     files={'image': (os.path.basename(image_path), f)},
+                                     timeout=600)
+            if resp.status_code != 200:
+                raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+            return resp.json()
+        return call
+
+    from ui.app import app
+
+    def call(image_path, question):
+        client = app.test_client()
+        with open(image_path, 'rb') as f:
+            resp = client.post('/api/query', data={
+                'question': question,
+                'image': (f, os.path.basename(image_path)),
+            }, content_type='multipart/form-data')
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+        return resp.get_json()
+    return call
+
+
+SCENARIOS = {
+    'ocr': make_ocr_call,
+    'vqa': make_vqa_call,
+    'api': make_api_call,
+}
+
+
+def run_level(call, workload: list, concurrency: int, n_requests: int) -> dict:
+    """Issue n_requests through `concurrency` client threads and time each one."""
+    latencies = []
+    errors = []
+
+    def one(i):
+        image_path, question = workload[i % len(workload)]
+        start = time.perf_counter()
+        try:
+            call(image_path, question)
+        except Exception as e:
+            errors.append(str(e))
+            return None
+        return time.perf_counter() - start
+
+    with PeakRSSSampler() as rss:
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for latency in pool.map(one, range(n_requests)):
+                if latency is not None:
+                    latencies.append(latency)
+        wall = time.perf_counter() - wall_start
+
+    return {
+        'concurrency': concurrency,
+        'requests': n_requests,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'wall_seconds': wall,
+        'throughput_rps': len(latencies) / wall if wall > 0 else 0.0,
+        'latency_seconds': summarize(latencies),
+        'peak_rss_bytes': rss.peak,
+    }
+
+
+def run_scenario(name: str, args, workload: list) -> dict:
+    """Measure cold start, warm up, then sweep the concurrency levels."""
+    if not args.real:
+        # fresh stubs so the first call pays the simulated model load again
+        stub_models.install(stub_models.StubConfig(
+            vqa_load_seconds=args.load_seconds,
+            vqa_seconds=args.vqa_seconds,
+            ocr_seconds=args.ocr_seconds,
+            cpu_bound=args.cpu_bound,
+        ))
+
+    rss_before = current_rss()
+    cold_start = time.perf_counter()
+    scenario, _, vqa_backend = name.partition(':')
+    if scenario == 'api':
+        call = SCENARIOS[scenario](args.url)
+    elif vqa_backend:
+        call = SCENARIOS[scenario](vqa_backend)
+    else:
+        call = SCENARIOS[scenario]()
+    image_path, question = workload[0]
+    call(image_path, question)
+    cold_seconds = time.perf_counter() - cold_start
+
+    warm_latencies = []
+    for i in range(args.warmup):
+        image_path, question = workload[i % len(workload)]
+        start = time.perf_counter()
+        call(image_path, question)
+        warm_latencies.append(time.perf_counter() - start)
+
+    print(f"[{name}] cold start {cold_seconds:.3f}s")
+    levels = []
+    for concurrency in args.concurrency:
+        result = run_level(call, workload, concurrency, args.requests)
+        lat = result['latency_seconds']
+        print(f"[{name}] c={concurrency:<3} {result['throughput_rps']:8.2f} req/s  "
+              f"p50={lat.get('p50', 0):.3f}s p95={lat.get('p95', 0):.3f}s "
+              f"p99={lat.get('p99', 0):.3f}s errors={result['errors']}")
+        levels.append(result)
+
+    return {
+        'scenario': name,
+        'backend': 'real' if args.real else 'stub',
+        'vqa_backend': vqa_backend or None,
+        'cold_start_seconds': cold_seconds,
+        'warm_latency_seconds': summarize(warm_latencies),
+        'rss_before_bytes': rss_before,
+        'peak_rss_bytes': max(level['peak_rss_bytes'] for level in levels) if levels else rss_before,
+        'levels': levels,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=project_root,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(description='Latency/throughput benchmark for Assistive-VQA')
+    p.add_argument('--scenarios', default='ocr,vqa,api',
+                   help='Comma-separated scenarios to run (ocr, vqa, api)')
+    p.add_argument('--vqa-backends', default='',
+                   help='Comma-separated VQA backends to compare in the vqa scenario (e.g. blip2,blip-base,stub)')
+    p.add_argument('--concurrency', default='1,4,8',
+                   help='Comma-separated client counts (default: 1,4,8)')
+    p.add_argument('--requests', type=int, default=40, help='Requests per concurrency level')
+    p.add_argument('--warmup', type=int, default=3, help='Unrecorded warm-up calls after the cold call')
+    p.add_argument('--cases', default=str(DEFAULT_CASES), help='CSV with image_path,question columns')
+    p.add_argument('--real', action='store_true', help='Use the real VQA/OCR modules instead of stubs')
+    p.add_argument('--url', help='Benchmark a running server (api scenario) instead of the in-process app')
+    p.add_argument('--vqa-seconds', type=float, default=0.15, help='Stub generate latency')
+    p.add_argument('--ocr-seconds', type=float, default=0.05, help='Stub latency per Tesseract pass')
+    p.add_argument('--load-seconds', type=float, default=2.0, help='Stub model load latency')
+    p.add_argument('--cpu-bound', action='store_true', help='Stubs burn CPU instead of sleeping')
+    p.add_argument('--label', help='Free-form label stored with the results')
+    p.add_argument('--out', help='Output JSON path (default: bench/results/bench_<timestamp>.json)')
+    return p
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    args.concurrency = [int(c) for c in args.concurrency.split(',') if c.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}")
+    vqa_backends = [b.strip() for b in args.vqa_backends.split(',') if b.strip()]
+    if vqa_backends and 'vqa' in scenarios:
+        # one vqa run per backend, keyed vqa:<backend> so compare.py lines them up
+        i = scenarios.index('vqa')
+        scenarios[i:i + 1] = [f"vqa:{b}" for b in vqa_backends]
+
+    workload = load_workload(Path(args.cases))
+    results = []
+    try:
+        for name in scenarios:
+            results.append(run_scenario(name, args, workload))
+    finally:
+        if not args.real:
+            stub_models.uninstall()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'label': args.label,
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config': {k: v for k, v in vars(args).items() if k != 'out'},
+        },
+        'results': results,
+    }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Results saved to: {out}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
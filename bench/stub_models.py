@@ -0,0 +1,117 @@
+"""
+Stub VQA and OCR modules for benchmarking without model weights or Tesseract.
+
+`install()` registers fake `vqa.vqa_model` and `ocr.ocr_module` modules in
+sys.modules, so the Flask API and the benchmark runner pick them up through
+their normal imports. Each stub decodes the image for real (so file I/O and
+decode cost are measured) and then simulates inference latency.
+"""
+
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass
+
+from PIL import Image
+
+
+@dataclass
+class StubConfig:
+    vqa_load_seconds: float = 2.0   # simulated first-call model load
+    vqa_seconds: float = 0.15       # simulated generate() latency
+    ocr_seconds: float = 0.05       # simulated latency per Tesseract pass
+    ocr_passes: int = 3             # ocr_module runs PSM 3, 11 and 6
+    cpu_bound: bool = False         # burn CPU (holds the GIL) instead of sleeping
+
+
+def _simulate(seconds: float, cpu_bound: bool):
+    if seconds <= 0:
+        return
+    if not cpu_bound:
+        time.sleep(seconds)
+        return
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _decode(image_path: str) -> Image.Image:
+    with Image.open(image_path) as img:
+        return img.convert('RGB')
+
+
+def build_vqa_module(config: StubConfig) -> types.ModuleType:
+    """Create a module exposing the vqa_model API backed by a stub."""
+    module = types.ModuleType("vqa.vqa_model")
+    state = {'loaded': False}
+    lock = threading.Lock()
+
+    def load_model():
+        with lock:
+            if not state['loaded']:
+                _simulate(config.vqa_load_seconds, config.cpu_bound)
+                state['loaded'] = True
+        return "stub-model", "stub-processor", "cpu"
+
+    def unload_model():
+        with lock:
+            state['loaded'] = False
+
+    def answer_question(image_path: str, question: str, backend: str = None) -> str:
+        # every backend shares the same simulated latency
+        if not question or not question.strip():
+            raise ValueError("Question cannot be empty")
+        load_model()
+        image = _decode(image_path)
+        _simulate(config.vqa_seconds, config.cpu_bound)
+        return f"stub answer ({image.size[0]}x{image.size[1]})"
+
+    module.load_model = load_model
+    module.unload_model = unload_model
+    module.answer_question = answer_question
+    module.is_stub = True
+    return module
+
+
+def build_ocr_module(config: StubConfig) -> types.ModuleType:
+    """Create a module exposing the ocr_module API backed by a stub."""
+    module = types.ModuleType("ocr.ocr_module")
+
+    def extract_text(image_path: str, detect_text_first: bool = False, profile: str = None) -> str:
+        # the text-presence gate is not simulated; every call pays the full passes
+        _decode(image_path)
+        for _ in range(config.ocr_passes):
+            _simulate(config.ocr_seconds, config.cpu_bound)
+        return "STUB OCR TEXT"
+
+    def extract_structured(image_path: str, detect_text_first: bool = False, profile: str = None) -> tuple:
+        return extract_text(image_path, detect_text_first), None
+
+    module.extract_text = extract_text
+    module.extract_structured = extract_structured
+    module.is_stub = True
+    return module
+
+
+_SAVED = {}
+
+
+def install(config: StubConfig | None = None) -> StubConfig:
+    """Register the stub modules, replacing any real ones already imported."""
+    config = config or StubConfig()
+    for name, builder in (("vqa.vqa_model", build_vqa_module), ("ocr.ocr_module", build_ocr_module)):
+        if name not in _SAVED:
+            _SAVED[name] = sys.modules.get(name)
+        sys.modules[name] = builder(config)
+    return config
+
+
+def uninstall():
+    """Restore whatever modules were registered before install()."""
+    for name, original in _SAVED.items():
+        if original is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = original
+    _SAVED.clear()
@@ -6,6 +6,7 @@ Measures:
 - Routing Logic Accuracy
 - Overall System Performance
 - Response Time Metrics
+- Cascade VQA escalation rate, accuracy delta and latency savings (--cascade)
 """
 
 import os
@@ -13,6 +14,7 @@ import sys
 import time
 import csv
 import json
+import argparse
 from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime
@@ -23,21 +25,26 @@ sys.path.insert(0, str(project_root))
 
 # Import modules
 try:
-    from vqa.vqa_model import answer_question as vqa_answer
+    from vqa.vqa_model import answer_question as vqa_answer, answer_with_confidence
     VQA_AVAILABLE = True
 except Exception as e:
     print(f"VQA module not available: {e}")
     VQA_AVAILABLE = False
 
 try:
-    from ocr.ocr_module import extract_text as ocr_extract
+    from ocr.ocr_module import profile_for_question
     OCR_AVAILABLE = True
 except Exception as e:
     print(f"OCR module not available: {e}")
     OCR_AVAILABLE = False
 
+from evaluation.cache import ResultCache
+from evaluation.cascade import measure_case, summarize_cascade
+from evaluation.runner import Job, execute_jobs
+from evaluation.streaming import ResultLog, StreamingMetrics, iter_cases
+
 try:
-    from ui.app import determine_module
+    from ui.routing import route_batch
     ROUTING_AVAILABLE = True
 except Exception as e:
     print(f"Routing module not available: {e}")
@@ -76,13 +83,15 @@ class EvaluationMetrics:
         })
     
     def add_routing_result(self, correct: bool, question: str, 
-                          expected_module: str, actual_module: str):
+                          expected_module: str, actual_module: str,
+                          confidence: float | None = None):
         """Add routing evaluation result"""
         self.routing_results.append({
             'correct': correct,
             'question': question,
             'expected': expected_module,
-            'actual': actual_module
+            'actual': actual_module,
+            'confidence': confidence
         })
     
     def calculate_accuracy(self, results: List[Dict]) -> float:
@@ -161,8 +170,15 @@ def check_answer_similarity(expected: str, actual: str, threshold: float = 0.6)
     return similarity >= threshold
 
 
-def evaluate_test_cases(csv_path: str, metrics: EvaluationMetrics) -> None:
-    """Evaluate all test cases from CSV file"""
+def evaluate_test_cases(csv_path: str, metrics: EvaluationMetrics, workers: int = 1,
+                        cache: ResultCache | None = None, vqa_batch_size: int = 8,
+                        cache_only: bool = False) -> None:
+    """Evaluate all test cases from CSV file
+    
+    Model outputs are computed up front by the parallel engine (OCR on a
+    process pool, VQA in batches), reusing cached outputs when a cache is
+    given, and then scored case by case.
+    """
     
     if not os.path.exists(csv_path):
         print(f"Test cases file not found: {csv_path}")
@@ -176,6 +192,23 @@ def evaluate_test_cases(csv_path: str, metrics: EvaluationMetrics) -> None:
         reader = csv.DictReader(f)
         test_cases = list(reader)
     
+    # Collect the model invocations the cases need
+    jobs = [job for job in (_case_job(i, case) for i, case in enumerate(test_cases, 1)) if job]
+    
+    # Route every question in one batch call
+    routing = {}
+    if ROUTING_AVAILABLE:
+        routed = [(i, case.get('question', '').strip()) for i, case in enumerate(test_cases, 1)]
+        routed = [(i, q) for i, q in routed if q]
+        routing = dict(zip((i for i, _ in routed), route_batch(q for _, q in routed)))
+    
+    start_time = time.perf_counter()
+    outputs = execute_jobs(jobs, cache=cache, workers=workers,
+                           vqa_batch_size=vqa_batch_size, cache_only=cache_only)
+    cached = sum(1 for r in outputs.values() if r.cached)
+    print(f"Model outputs: {len(outputs)}/{len(jobs)} resolved ({cached} from cache) "
+          f"in {time.perf_counter() - start_time:.2f}s")
+    
     for i, case in enumerate(test_cases, 1):
         image_path = case.get('image_path', '').strip()
         question = case.get('question', '').strip()
@@ -199,55 +232,190 @@ def evaluate_test_cases(csv_path: str, metrics: EvaluationMetrics) -> None:
         
         # Test 1: Routing Logic
         if ROUTING_AVAILABLE:
-            actual_module = determine_module(question)
+            decision = routing[i]
+            actual_module = decision.module
             routing_correct = (actual_module == expected_module)
-            metrics.add_routing_result(routing_correct, question, expected_module, actual_module)
+            metrics.add_routing_result(routing_correct, question, expected_module, actual_module,
+                                       decision.confidence)
             
             status = "Correct" if routing_correct else "Incorrect"
-            print(f"{status} Routing: {actual_module.upper()} (Expected: {expected_module.upper()})")
+            print(f"{status} Routing: {actual_module.upper()} (Expected: {expected_module.upper()}, "
+                  f"confidence {decision.confidence:.2f})")
         else:
             print("Routing: Not available")
         
         # Test 2: Module Execution
-        if expected_module == 'vqa' and VQA_AVAILABLE:
-            if os.path.exists(full_image_path):
-                try:
-                    start_time = time.time()
-                    actual_output = vqa_answer(full_image_path, question)
-                    response_time = time.time() - start_time
-                    
-                    correct = check_answer_similarity(expected_output, actual_output)
-                    metrics.add_vqa_result(correct, response_time, question, 
-                                          expected_output, actual_output)
-                    
-                    status = "Correct" if correct else "Incorrect"
-                    print(f"{status} VQA Output: {actual_output}")
-                    print(f"Response Time: {response_time:.2f}s")
-                except Exception as e:
-                    print(f"VQA Error: {e}")
-                    metrics.add_vqa_result(False, 0, question, expected_output, str(e))
-            else:
-                print(f"Image not found: {full_image_path}")
+        if expected_module not in ('vqa', 'ocr'):
+            continue
+        if not (VQA_AVAILABLE if expected_module == 'vqa' else OCR_AVAILABLE):
+            continue
+        add_result = metrics.add_vqa_result if expected_module == 'vqa' else metrics.add_ocr_result
+        label = expected_module.upper()
+        
+        if not os.path.exists(full_image_path):
+            print(f"Image not found: {full_image_path}")
+            continue
+        
+        result = outputs.get(i)
+        if result is None:
+            print(f"{label}: not in cache (skipped)")
+            continue
+        if result.error:
+            print(f"{label} Error: {result.output}")
+            add_result(False, 0, question, expected_output, result.output)
+            continue
+        
+        actual_output = result.output
+        correct = check_answer_similarity(expected_output, actual_output)
+        add_result(correct, result.response_time, question, expected_output, actual_output)
         
-        elif expected_module == 'ocr' and OCR_AVAILABLE:
-            if os.path.exists(full_image_path):
-                try:
-                    start_time = time.time()
-                    actual_output = ocr_extract(full_image_path)
-                    response_time = time.time() - start_time
-                    
-                    correct = check_answer_similarity(expected_output, actual_output)
-                    metrics.add_ocr_result(correct, response_time, question,
-                                          expected_output, actual_output)
-                    
-                    status = "Correct" if correct else "Incorrect"
-                    print(f"{status} OCR Output: {actual_output}")
-                    print(f"Response Time: {response_time:.2f}s")
-                except Exception as e:
-                    print(f"OCR Error: {e}")
-                    metrics.add_ocr_result(False, 0, question, expected_output, str(e))
-            else:
-                print(f"Image not found: {full_image_path}")
+        status = "Correct" if correct else "Incorrect"
+        print(f"{status} {label} Output: {actual_output}")
+        print(f"Response Time: {result.response_time:.2f}s" + (" (cached)" if result.cached else ""))
+
+
+def evaluate_cascade(csv_path: str, small: str, large: str, thresholds: List[float]) -> Dict | None:
+    """Measure both cascade stages on every VQA case and replay the cascade per threshold
+    
+    Each VQA case is answered by the small backend (with its confidence) and
+    by the large backend; escalation rate, accuracy delta and latency savings
+    then follow for any threshold without re-running the models.
+    """
+    if not VQA_AVAILABLE:
+        print("Cascade evaluation: VQA module not available")
+        return None
+    
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        test_cases = [case for case in csv.DictReader(f)
+                      if case.get('expected_module', '').strip().lower() == 'vqa']
+    
+    print(f"\n{'='*70}")
+    print(f"Cascade evaluation: {small} -> {large} on {len(test_cases)} VQA cases")
+    print(f"{'='*70}")
+    
+    cases = []
+    for case in test_cases:
+        image_path = os.path.join(project_root, case.get('image_path', '').strip())
+        question = case.get('question', '').strip()
+        if not question or not os.path.exists(image_path):
+            continue
+        measured = measure_case(
+            question, case.get('expected_output', '').strip(),
+            small=lambda q: answer_with_confidence(image_path, q, backend=small),
+            large=lambda q: vqa_answer(image_path, q, backend=large),
+            is_correct=check_answer_similarity)
+        confidence = measured.small_confidence
+        print(f"  {question[:50]:<50} small={measured.small_answer!r} "
+              f"({'n/a' if confidence is None else f'{confidence:.2f}'}) large={measured.large_answer!r}")
+        cases.append(measured)
+    
+    summary = summarize_cascade(cases, thresholds)
+    summary.update({'small_backend': small, 'large_backend': large})
+    return summary
+
+
+def _case_job(row: int, case: Dict) -> Job | None:
+    """Build the model invocation a case needs, or None if it cannot run."""
+    image_path = case.get('image_path', '').strip()
+    question = case.get('question', '').strip()
+    expected_module = case.get('expected_module', '').strip().lower()
+    full_image_path = os.path.join(project_root, image_path)
+    if not image_path or not question or not os.path.exists(full_image_path):
+        return None
+    if expected_module == 'vqa' and VQA_AVAILABLE:
+        return Job(row, expected_module, full_image_path, question)
+    if expected_module == 'ocr' and OCR_AVAILABLE:
+        # as the API runs OCR-routed questions: the question's profile, no text gate
+        return Job(row, expected_module, full_image_path, question,
+                   profile=profile_for_question(question), gated=False)
+    return None
+
+
+def _score_case(row: int, case: Dict, result, decision=None) -> Dict:
+    """Score one case into a self-contained JSONL record."""
+    question = case.get('question', '').strip()
+    expected_module = case.get('expected_module', '').strip().lower()
+    expected_output = case.get('expected_output', '').strip()
+    record = {
+        'row': row,
+        'image_path': case.get('image_path', '').strip(),
+        'question': question,
+        'expected_module': expected_module,
+        'expected': expected_output,
+        'routed_module': None,
+        'routing_confidence': None,
+        'routing_correct': None,
+        'module': expected_module,
+        'actual': None,
+        'correct': None,
+        'response_time': None,
+        'cached': False,
+    }
+    if decision is not None:
+        record['routed_module'] = decision.module
+        record['routing_confidence'] = round(decision.confidence, 4)
+        record['routing_correct'] = decision.module == expected_module
+    if result is not None:
+        record['actual'] = result.output
+        record['cached'] = result.cached
+        if result.error:
+            record['correct'] = False
+            record['response_time'] = 0
+        else:
+            record['correct'] = check_answer_similarity(expected_output, result.output)
+            record['response_time'] = result.response_time
+    return record
+
+
+def evaluate_streaming(csv_path: str, results_path: str, workers: int = 1,
+                       cache: ResultCache | None = None, vqa_batch_size: int = 8,
+                       cache_only: bool = False, chunk_size: int = 256,
+                       resume: bool = True) -> StreamingMetrics:
+    """Evaluate a large CSV with bounded memory.
+    
+    Rows are read lazily in chunks of `chunk_size`; each chunk's outputs are
+    computed by the parallel engine, scored, appended to `results_path` as
+    JSONL and folded into O(1)-memory running aggregates. With `resume`, rows
+    already present in the JSONL (e.g. before a crash) are replayed into the
+    aggregates and skipped.
+    """
+    metrics = StreamingMetrics()
+    log = ResultLog(results_path)
+    last_row = log.replay(metrics) if resume else 0
+    if last_row:
+        print(f"Resuming after row {last_row} ({metrics.rows} results replayed)")
+    
+    def process(chunk):
+        jobs = [job for job in (_case_job(row, case) for row, case in chunk) if job]
+        outputs = execute_jobs(jobs, cache=cache, workers=workers,
+                               vqa_batch_size=vqa_batch_size, cache_only=cache_only)
+        decisions = [None] * len(chunk)
+        if ROUTING_AVAILABLE:
+            questions = [case.get('question', '').strip() for _, case in chunk]
+            decisions = [d if q else None for q, d in zip(questions, route_batch(questions))]
+        for (row, case), decision in zip(chunk, decisions):
+            record = _score_case(row, case, outputs.get(row), decision)
+            log.write(record)
+            metrics.add_record(record)
+        log.checkpoint()
+    
+    log.open(resume=resume)
+    start_time = time.perf_counter()
+    try:
+        chunk = []
+        for row, case in iter_cases(csv_path, start_after=last_row):
+            chunk.append((row, case))
+            if len(chunk) >= chunk_size:
+                process(chunk)
+                chunk = []
+                print(f"  {metrics.rows} rows evaluated ({time.perf_counter() - start_time:.1f}s)")
+        if chunk:
+            process(chunk)
+    finally:
+        log.close()
+    
+    print(f"Streaming evaluation: {metrics.rows} rows, results in {results_path}")
+    return metrics
 
 
 def print_summary(metrics: EvaluationMetrics) -> None:
@@ -264,6 +432,9 @@ def print_summary(metrics: EvaluationMetrics) -> None:
           f"({summary['vqa']['correct']}/{summary['vqa']['total_tests']})")
     if summary['vqa']['avg_time'] > 0:
         print(f"   Avg Response Time: {summary['vqa']['avg_time']:.2f}s")
+    if summary['vqa'].get('p50_time'):
+        print(f"   Latency p50/p95/p99: {summary['vqa']['p50_time']:.2f}s / "
+              f"{summary['vqa']['p95_time']:.2f}s / {summary['vqa']['p99_time']:.2f}s")
     print()
     
     # OCR Metrics
@@ -272,6 +443,9 @@ def print_summary(metrics: EvaluationMetrics) -> None:
           f"({summary['ocr']['correct']}/{summary['ocr']['total_tests']})")
     if summary['ocr']['avg_time'] > 0:
         print(f"   Avg Response Time: {summary['ocr']['avg_time']:.2f}s")
+    if summary['ocr'].get('p50_time'):
+        print(f"   Latency p50/p95/p99: {summary['ocr']['p50_time']:.2f}s / "
+              f"{summary['ocr']['p95_time']:.2f}s / {summary['ocr']['p99_time']:.2f}s")
     print()
     
     # Routing Metrics
@@ -291,7 +465,23 @@ def print_summary(metrics: EvaluationMetrics) -> None:
     print(f"\n{'='*70}\n")
 
 
-def save_results(metrics: EvaluationMetrics, output_file: str = "evaluation_results.json") -> None:
+def print_cascade_summary(cascade: Dict) -> None:
+    """Print the cascade escalation/accuracy/latency table"""
+    print(f"VQA CASCADE ({cascade['small_backend']} -> {cascade['large_backend']}, "
+          f"{cascade['cases']} cases):")
+    print(f"   {cascade['small_backend']} only: {cascade['small_accuracy']:.1f}% "
+          f"in {cascade['small_avg_time']:.2f}s avg")
+    print(f"   {cascade['large_backend']} only: {cascade['large_accuracy']:.1f}% "
+          f"in {cascade['large_avg_time']:.2f}s avg")
+    print(f"   {'threshold':>9} {'escalated':>9} {'accuracy':>9} {'delta':>7} {'avg time':>9} {'saved':>7}")
+    for row in cascade['thresholds']:
+        print(f"   {row['threshold']:>9.2f} {row['escalation_rate']:>8.1f}% {row['accuracy']:>8.1f}% "
+              f"{row['accuracy_delta']:>+6.1f} {row['avg_time']:>8.2f}s {row['latency_savings']:>6.1f}%")
+    print()
+
+
+def save_results(metrics: EvaluationMetrics, output_file: str = "evaluation_results.json",
+                 cascade: Dict | None = None) -> None:
     """Save detailed results to JSON file"""
     results = {
         'timestamp': datetime.now().isoformat(),
@@ -300,6 +490,8 @@ def save_results(metrics: EvaluationMetrics, output_file: str = "evaluation_resu
         'ocr_details': metrics.ocr_results,
         'routing_details': metrics.routing_results
     }
+    if cascade is not None:
+        results['cascade'] = cascade
     
     output_path = os.path.join(project_root, output_file)
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -308,8 +500,60 @@ def save_results(metrics: EvaluationMetrics, output_file: str = "evaluation_resu
     print(f"Detailed results saved to: {output_file}")
 
 
-def main():
+def save_streaming_summary(metrics: StreamingMetrics, results_path: str,
+                           cascade: Dict | None = None) -> None:
+    """Save the aggregate summary next to the streaming JSONL results"""
+    summary_path = os.path.splitext(results_path)[0] + '.summary.json'
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'rows': metrics.rows,
+        'results_file': results_path,
+        'summary': metrics.get_summary(),
+    }
+    if cascade is not None:
+        results['cascade'] = cascade
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"Summary saved to: {summary_path}")
+
+
+def build_arg_parser():
+    p = argparse.ArgumentParser(description='Evaluate the Assistive-VQA system on a CSV of test cases')
+    p.add_argument('--cases', default=os.path.join(project_root, 'data', 'cases.csv'),
+                   help='CSV with image_path,question,expected_module,expected_output,notes')
+    p.add_argument('--workers', type=int, default=1,
+                   help='OCR worker processes (default: 1 = serial)')
+    p.add_argument('--vqa-batch-size', type=int, default=8,
+                   help='Questions per batched VQA generate() call (1 disables batching)')
+    p.add_argument('--cache-dir', default=os.path.join(project_root, '.eval_cache'),
+                   help='Directory for the model output cache')
+    p.add_argument('--no-cache', action='store_true', help='Always recompute model outputs')
+    p.add_argument('--cache-only', action='store_true',
+                   help='Only re-score cached outputs; never run the models')
+    p.add_argument('--output', default='evaluation_results.json', help='Results JSON file name')
+    p.add_argument('--stream', metavar='RESULTS_JSONL',
+                   help='Streaming mode: read rows lazily, append per-row results to this JSONL '
+                        'and keep only running aggregates in memory (resumable)')
+    p.add_argument('--chunk-size', type=int, default=256,
+                   help='Rows per chunk in streaming mode')
+    p.add_argument('--no-resume', action='store_true',
+                   help='Streaming mode: start over instead of resuming from the JSONL')
+    p.add_argument('--cascade', action='store_true',
+                   help='Also evaluate the small-model-first VQA cascade on the VQA cases')
+    p.add_argument('--cascade-small', default=os.environ.get('VQA_CASCADE_SMALL', 'blip-base'),
+                   help='Cascade first-stage backend')
+    p.add_argument('--cascade-large', default=os.environ.get('VQA_CASCADE_LARGE', 'blip2'),
+                   help='Cascade escalation backend')
+    p.add_argument('--cascade-thresholds', default='0.3,0.5,0.7,0.9',
+                   help='Comma-separated confidence thresholds to report')
+    return p
+
+
+def main(argv=None):
     """Main evaluation function"""
+    args = build_arg_parser().parse_args(argv)
+    
     print(f"\n{'='*70}")
     print(f"ASSISTIVE-VQA SYSTEM EVALUATION")
     print(f"{'='*70}\n")
@@ -327,15 +571,38 @@ def main():
     # Initialize metrics
     metrics = EvaluationMetrics()
     
+    cache = None if args.no_cache else ResultCache(os.path.join(args.cache_dir, 'outputs.sqlite'))
+    
     # Evaluate test cases
-    csv_path = os.path.join(project_root, 'data', 'cases.csv')
-    evaluate_test_cases(csv_path, metrics)
+    try:
+        if args.stream:
+            metrics = evaluate_streaming(args.cases, args.stream, workers=args.workers, cache=cache,
+                                         vqa_batch_size=args.vqa_batch_size,
+                                         cache_only=args.cache_only, chunk_size=args.chunk_size,
+                                         resume=not args.no_resume)
+        else:
+            evaluate_test_cases(args.cases, metrics, workers=args.workers, cache=cache,
+                                vqa_batch_size=args.vqa_batch_size, cache_only=args.cache_only)
+    finally:
+        if cache is not None:
+            print(f"Cache: {cache.hits} hits, {cache.misses} misses ({len(cache)} entries)")
+            cache.close()
+    
+    cascade = None
+    if args.cascade:
+        thresholds = [float(t) for t in args.cascade_thresholds.split(',') if t.strip()]
+        cascade = evaluate_cascade(args.cases, args.cascade_small, args.cascade_large, thresholds)
     
     # Print summary
     print_summary(metrics)
+    if cascade is not None:
+        print_cascade_summary(cascade)
     
     # Save results
-    save_results(metrics)
+    if args.stream:
+        save_streaming_summary(metrics, args.stream, cascade)
+    else:
+        save_results(metrics, args.output, cascade)
     
     print("Evaluation complete!\n")
 
@@ -0,0 +1,119 @@
+"""
+On-disk cache of raw model outputs for evaluation runs.
+
+Outputs are keyed by image content hash + question + module + model/config
+version, so re-running the evaluation after changing only the scorer or the
+routing logic reuses every model output, while changing the model, decoding
+parameters or OCR pipeline code invalidates exactly the affected entries.
+
+Backed by SQLite (stdlib) so it scales to VQAv2/TextVQA-sized datasets and can
+be shared by concurrent workers.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    key TEXT PRIMARY KEY,
+    module TEXT NOT NULL,
+    version TEXT NOT NULL,
+    output TEXT NOT NULL,
+    response_time REAL NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+# (path, size, mtime_ns) -> sha256 hex, so each image is hashed once per run
+_image_hash_memo = {}
+_memo_lock = threading.Lock()
+
+
+def image_hash(image_path: str) -> str:
+    """SHA-256 of the image file contents, memoized by path/size/mtime."""
+    st = os.stat(image_path)
+    memo_key = (os.path.abspath(image_path), st.st_size, st.st_mtime_ns)
+    with _memo_lock:
+        cached = _image_hash_memo.get(memo_key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _memo_lock:
+        _image_hash_memo[memo_key] = digest
+    return digest
+
+
+def source_fingerprint(paths) -> str:
+    """Short hash of source files, used as a version for pipelines without a model id."""
+    h = hashlib.sha256()
+    for path in sorted(str(p) for p in paths):
+        h.update(path.encode('utf-8'))
+        try:
+            h.update(Path(path).read_bytes())
+        except OSError:
+            h.update(b'<missing>')
+    return h.hexdigest()[:16]
+
+
+def make_key(image_digest: str, question: str, module: str, version: str) -> str:
+    raw = "\x1f".join((image_digest, question.strip(), module, version))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe SQLite store of (output, response_time) per cache key."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Return (output, response_time) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output, response_time FROM outputs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row
+
+    def put(self, key: str, module: str, version: str, output: str, response_time: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)",
+                (key, module, version, output, response_time, time.time()))
+            self._conn.commit()
+
+    def put_many(self, rows: list):
+        """Insert many (key, module, version, output, response_time) rows in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)",
+                [row + (now,) for row in rows])
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outputs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
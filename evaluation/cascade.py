@@ -0,0 +1,88 @@
+"""
+Cascade VQA evaluation.
+
+Both cascade stages are deterministic, so one pass that records the small
+model's answer, confidence and latency and the large model's answer and
+latency per case is enough to replay the cascade at any threshold:
+
+- escalation rate: share of answers the large model had to redo
+- accuracy delta: cascade accuracy minus large-model-only accuracy (points)
+- latency savings: 1 - cascade seconds / large-model-only seconds
+
+The escalation rule is vqa.backends.should_escalate, the one CascadeBackend uses.
+"""
+
+import time
+from dataclasses import dataclass
+
+try:
+    from vqa.backends import should_escalate
+except ImportError:  # same rule, for running without the vqa package on the path
+    def should_escalate(confidence, threshold: float) -> bool:
+        return confidence is None or confidence < threshold
+
+
+@dataclass
+class CascadeCase:
+    question: str
+    expected: str
+    small_answer: str
+    small_confidence: float | None
+    small_seconds: float
+    small_correct: bool
+    large_answer: str
+    large_seconds: float
+    large_correct: bool
+
+
+def measure_case(question: str, expected: str, small, large, is_correct) -> CascadeCase:
+    """
+    Time both stages on one case.
+
+    Args:
+        small: callable(question) -> (answer, confidence)
+        large: callable(question) -> answer
+        is_correct: callable(expected, actual) -> bool
+    """
+    start = time.perf_counter()
+    small_answer, confidence = small(question)
+    small_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    large_answer = large(question)
+    large_seconds = time.perf_counter() - start
+    return CascadeCase(question, expected, small_answer, confidence, small_seconds,
+                       is_correct(expected, small_answer), large_answer, large_seconds,
+                       is_correct(expected, large_answer))
+
+
+def _pct(part: float, whole: float) -> float:
+    return part / whole * 100 if whole else 0.0
+
+
+def summarize_cascade(cases: list, thresholds: list) -> dict:
+    """Replay the cascade at each threshold; accuracies and rates in percent."""
+    n = len(cases)
+    large_seconds = sum(c.large_seconds for c in cases)
+    large_correct = sum(c.large_correct for c in cases)
+    summary = {
+        'cases': n,
+        'small_accuracy': _pct(sum(c.small_correct for c in cases), n),
+        'large_accuracy': _pct(large_correct, n),
+        'small_avg_time': sum(c.small_seconds for c in cases) / n if n else 0.0,
+        'large_avg_time': large_seconds / n if n else 0.0,
+        'thresholds': [],
+    }
+    for threshold in thresholds:
+        escalated = [should_escalate(c.small_confidence, threshold) for c in cases]
+        correct = sum(c.large_correct if esc else c.small_correct for c, esc in zip(cases, escalated))
+        seconds = sum(c.small_seconds + (c.large_seconds if esc else 0.0)
+                      for c, esc in zip(cases, escalated))
+        summary['thresholds'].append({
+            'threshold': threshold,
+            'escalation_rate': _pct(sum(escalated), n),
+            'accuracy': _pct(correct, n),
+            'accuracy_delta': _pct(correct - large_correct, n),
+            'avg_time': seconds / n if n else 0.0,
+            'latency_savings': _pct(large_seconds - seconds, large_seconds),
+        })
+    return summary
@@ -0,0 +1,200 @@
+"""
+Parallel execution engine for evaluation runs.
+
+OCR cases run on a process pool (Tesseract and OpenCV are CPU-bound and each
+pass is a subprocess), VQA cases are grouped into batches for a single
+generate() call, and every raw output goes through the ResultCache so that
+re-runs only compute what is missing.
+"""
+
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from evaluation.cache import ResultCache, image_hash, make_key, source_fingerprint
+
+project_root = Path(__file__).resolve().parents[1]
+
+# Source files whose changes alter OCR output; their hash versions cached OCR results
+OCR_SOURCES = [
+    project_root / 'ocr' / 'ocr_module.py',
+    *sorted((project_root / 'ocr' / 'ocr-app' / 'src' / 'ocr_app').glob('*.py')),
+]
+# Environment settings that change what OCR reads (their defaults are in OCR_SOURCES);
+# worker counts and cache sizes only change speed and are left out
+OCR_SETTINGS = ('OCR_EARLY_EXIT_CONF', 'OCR_TEXT_MIN_ALIGNED', 'OCR_TESSDATA_FAST_DIR',
+                'OCR_ORIENTATION', 'OCR_TILE_SIZE', 'OCR_TILE_OVERLAP', 'OCR_TILE_MIN_PIXELS',
+                'OCR_PDF_DPI', 'OCR_DICTIONARY_PATH')
+# Where ocr_app.utils looks for the compact dictionary without OCR_DICTIONARY_PATH
+DEFAULT_DICTIONARY = project_root / 'ocr' / 'ocr-app' / 'models' / 'english_words.dawg'
+
+# Model outputs that report a failure instead of an answer; never cached
+ERROR_PREFIXES = ('error:', 'validation error:', 'vqa processing error:', 'ocr error:')
+# OCR outputs that say nothing was read; a failed pass can produce them, so they are not cached
+EMPTY_OUTPUTS = ('', 'no text found')
+
+
+def _is_error_output(output: str) -> bool:
+    return output.lower().startswith(ERROR_PREFIXES)
+
+
+def _is_cacheable(output: str) -> bool:
+    return not _is_error_output(output) and output.strip().lower() not in EMPTY_OUTPUTS
+
+
+@dataclass
+class Job:
+    """One model invocation needed by the evaluation."""
+    index: int
+    module: str          # 'ocr' or 'vqa'
+    image_path: str
+    question: str
+    key: str = ""
+    profile: str = None  # OCR profile (None for "default")
+    gated: bool = False  # OCR: skip Tesseract when the text detector finds no text
+
+
+@dataclass
+class JobResult:
+    output: str
+    response_time: float
+    error: bool = False
+    cached: bool = False
+
+
+def _tesseract_version() -> str:
+    try:
+        import pytesseract
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "none"
+
+
+def ocr_version() -> str:
+    """Pipeline sources, dictionary, result-changing settings and the Tesseract version."""
+    dictionary = os.environ.get('OCR_DICTIONARY_PATH') or DEFAULT_DICTIONARY
+    settings = "|".join(f"{name}={os.environ.get(name, '')}" for name in OCR_SETTINGS)
+    return (f"ocr:{source_fingerprint([*OCR_SOURCES, dictionary])}"
+            f"|tesseract={_tesseract_version()}|{settings}")
+
+
+def vqa_version() -> str:
+    vqa_model = importlib.import_module('vqa.vqa_model')
+    version = getattr(vqa_model, 'model_version', None)
+    return "vqa:" + (version() if version else "unversioned")
+
+
+def _ocr_worker(image_path: str, profile: str = None, gated: bool = False) -> tuple:
+    """Run OCR in a worker process; returns (output, response_time, error)."""
+    try:
+        from ocr.ocr_module import extract_text
+        start = time.perf_counter()
+        output = extract_text(image_path, detect_text_first=gated, profile=profile)
+        return output, time.perf_counter() - start, False
+    except Exception as e:
+        return str(e), 0.0, True
+
+
+def _ocr_variant(job: Job) -> str:
+    """Cache key part for an OCR job: the output depends on profile and gate, not the question."""
+    return f"profile={job.profile or 'default'};gated={int(job.gated)}"
+
+
+def run_ocr_jobs(jobs: list, workers: int = 1) -> dict:
+    """Execute OCR jobs, in parallel across processes when workers > 1.
+
+    OCR does not depend on the question, so each distinct (image, profile,
+    gate) runs once.
+    """
+    results = {}
+    if not jobs:
+        return results
+    tasks = list(dict.fromkeys((job.image_path, job.profile, job.gated) for job in jobs))
+    if workers <= 1:
+        per_task = {t: _ocr_worker(*t) for t in tasks}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = pool.map(_ocr_worker, *zip(*tasks), chunksize=max(1, len(tasks) // (workers * 4)))
+            per_task = dict(zip(tasks, outputs))
+    for job in jobs:
+        output, elapsed, error = per_task[(job.image_path, job.profile, job.gated)]
+        results[job.index] = JobResult(output, elapsed, error)
+    return results
+
+
+def run_vqa_jobs(jobs: list, batch_size: int = 8) -> dict:
+    """Execute VQA jobs in batches; per-item time is the batch time amortized."""
+    results = {}
+    if not jobs:
+        return results
+    vqa_model = importlib.import_module('vqa.vqa_model')
+    batch_fn = getattr(vqa_model, 'answer_questions', None)
+
+    if batch_fn is None or batch_size <= 1:
+        for job in jobs:
+            start = time.perf_counter()
+            try:
+                output = vqa_model.answer_question(job.image_path, job.question)
+                results[job.index] = JobResult(output, time.perf_counter() - start)
+            except Exception as e:
+                results[job.index] = JobResult(str(e), 0.0, error=True)
+        return results
+
+    for start_idx in range(0, len(jobs), batch_size):
+        batch = jobs[start_idx:start_idx + batch_size]
+        start = time.perf_counter()
+        try:
+            outputs = batch_fn([j.image_path for j in batch], [j.question for j in batch],
+                               batch_size=batch_size)
+            per_item = (time.perf_counter() - start) / len(batch)
+            for job, output in zip(batch, outputs):
+                results[job.index] = JobResult(output, per_item)
+        except Exception as e:
+            for job in batch:
+                results[job.index] = JobResult(str(e), 0.0, error=True)
+    return results
+
+
+def execute_jobs(jobs: list, cache: ResultCache | None = None, workers: int = 1,
+                 vqa_batch_size: int = 8, cache_only: bool = False) -> dict:
+    """Resolve every job from the cache or by running the model; returns index -> JobResult.
+
+    With cache_only=True, jobs missing from the cache are skipped (absent from
+    the result) instead of being computed.
+    """
+    versions = {}
+    results = {}
+    pending = {'ocr': [], 'vqa': []}
+
+    for job in jobs:
+        if cache is not None:
+            if job.module not in versions:
+                versions[job.module] = ocr_version() if job.module == 'ocr' else vqa_version()
+            # OCR output does not depend on the question, so share it across questions
+            question = job.question if job.module == 'vqa' else _ocr_variant(job)
+            job.key = make_key(image_hash(job.image_path), question, job.module,
+                               versions[job.module])
+            hit = cache.get(job.key)
+            if hit is not None:
+                results[job.index] = JobResult(hit[0], hit[1], cached=True)
+                continue
+        if not cache_only:
+            pending[job.module].append(job)
+
+    computed = {}
+    computed.update(run_ocr_jobs(pending['ocr'], workers))
+    computed.update(run_vqa_jobs(pending['vqa'], vqa_batch_size))
+
+    if cache is not None:
+        by_index = {job.index: job for job in pending['ocr'] + pending['vqa']}
+        rows = [(by_index[i].key, by_index[i].module, versions[by_index[i].module],
+                 r.output, r.response_time)
+                for i, r in computed.items() if not r.error and _is_cacheable(r.output)]
+        if rows:
+            cache.put_many(rows)
+
+    results.update(computed)
+    return results
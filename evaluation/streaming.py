@@ -0,0 +1,190 @@
+"""
+Memory-bounded building blocks for streaming evaluation over large datasets.
+
+- iter_cases(): lazy CSV reader that can skip already-completed rows
+- QuantileSketch: relative-error latency sketch (DDSketch-style log buckets)
+- StreamingMetrics: O(1)-memory running accuracy and latency aggregates
+- ResultLog: append-only JSONL of per-row results, replayable for resume
+"""
+
+import csv
+import json
+import math
+import os
+
+
+def iter_cases(csv_path: str, start_after: int = 0):
+    """Yield (row_number, case) lazily, skipping rows <= start_after (1-based)."""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        for row_number, case in enumerate(csv.DictReader(f), 1):
+            if row_number > start_after:
+                yield row_number, case
+
+
+class QuantileSketch:
+    """Streaming quantiles with bounded relative error.
+
+    Values are counted in logarithmic buckets of width (1 + alpha) / (1 - alpha),
+    so any quantile is reported within `alpha` relative error while memory only
+    grows with log(max / min) of the observed range, not with the sample count.
+    """
+
+    def __init__(self, alpha: float = 0.01, min_value: float = 1e-6):
+        self.alpha = alpha
+        self.min_value = min_value
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (q in [0, 1]); 0.0 when empty."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self) -> dict:
+        return {'alpha': self.alpha, 'min_value': self.min_value, 'zero_count': self.zero_count,
+                'count': self.count, 'buckets': {str(k): v for k, v in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        sketch = cls(data['alpha'], data['min_value'])
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.buckets = {int(k): v for k, v in data['buckets'].items()}
+        return sketch
+
+
+class _ModuleStats:
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.time_sum = 0.0
+        self.timed = 0
+        self.latency = QuantileSketch()
+
+    def add(self, correct: bool, response_time: float | None):
+        self.total += 1
+        self.correct += int(bool(correct))
+        if response_time:
+            self.time_sum += response_time
+            self.timed += 1
+            self.latency.add(response_time)
+
+    def summary(self) -> dict:
+        return {
+            'accuracy': (self.correct / self.total) * 100 if self.total else 0.0,
+            'avg_time': self.time_sum / self.timed if self.timed else 0.0,
+            'p50_time': self.latency.quantile(0.50),
+            'p95_time': self.latency.quantile(0.95),
+            'p99_time': self.latency.quantile(0.99),
+            'total_tests': self.total,
+            'correct': self.correct,
+        }
+
+
+class StreamingMetrics:
+    """Running aggregates with the same get_summary() shape as EvaluationMetrics."""
+
+    def __init__(self):
+        self.vqa = _ModuleStats()
+        self.ocr = _ModuleStats()
+        self.routing_total = 0
+        self.routing_correct = 0
+        self.rows = 0
+
+    def add_record(self, record: dict):
+        """Fold one JSONL result record into the aggregates."""
+        self.rows += 1
+        if record.get('routing_correct') is not None:
+            self.routing_total += 1
+            self.routing_correct += int(bool(record['routing_correct']))
+        module = record.get('module')
+        if module in ('vqa', 'ocr') and record.get('correct') is not None:
+            getattr(self, module).add(record['correct'], record.get('response_time'))
+
+    def get_summary(self) -> dict:
+        return {
+            'vqa': self.vqa.summary(),
+            'ocr': self.ocr.summary(),
+            'routing': {
+                'accuracy': (self.routing_correct / self.routing_total) * 100 if self.routing_total else 0.0,
+                'total_tests': self.routing_total,
+                'correct': self.routing_correct,
+            },
+            'overall': {
+                'total_tests': self.vqa.total + self.ocr.total,
+                'total_correct': self.vqa.correct + self.ocr.correct,
+            },
+        }
+
+
+class ResultLog:
+    """Append-only JSONL file of per-row results.
+
+    `replay()` streams existing records back (for rebuilding aggregates when
+    resuming) and drops a trailing partial line left by a crash.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def replay(self, metrics: StreamingMetrics) -> int:
+        """Fold existing records into `metrics`; return the last completed row number."""
+        if not os.path.exists(self.path):
+            return 0
+        last_row = 0
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                metrics.add_record(record)
+                last_row = max(last_row, record.get('row', 0))
+                valid_bytes += len(raw)
+        if valid_bytes != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return last_row
+
+    def open(self, resume: bool = True):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def checkpoint(self):
+        """Make everything written so far durable."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.checkpoint()
+            self._file.close()
+            self._file = None
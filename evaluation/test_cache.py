@@ -0,0 +1,122 @@
+"""
+Unit tests for the evaluation output cache and parallel runner
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from evaluation.cache import ResultCache, image_hash, make_key
+from evaluation import runner
+from evaluation.runner import Job, execute_jobs, ocr_version
+
+
+@pytest.fixture
+def stubs():
+    pytest.importorskip("PIL")
+    from bench import stub_models
+    stub_models.install(stub_models.StubConfig(vqa_load_seconds=0, vqa_seconds=0, ocr_seconds=0))
+    yield
+    stub_models.uninstall()
+
+
+@pytest.fixture
+def image(tmp_path):
+    PIL = pytest.importorskip("PIL.Image")
+    path = tmp_path / "img.png"
+    PIL.new('RGB', (16, 16), color='red').save(path)
+    return str(path)
+
+
+class TestResultCache:
+    """Test cases for cache keys and storage"""
+
+    def test_key_depends_on_version(self):
+        assert make_key("abc", "q", "vqa", "v1") != make_key("abc", "q", "vqa", "v2")
+
+    def test_image_hash_is_content_based(self, tmp_path):
+        a, b = tmp_path / "a.bin", tmp_path / "b.bin"
+        a.write_bytes(b"same")
+        b.write_bytes(b"same")
+        assert image_hash(str(a)) == image_hash(str(b))
+
+    def test_ocr_version_tracks_settings_and_tesseract(self, monkeypatch):
+        monkeypatch.delenv('OCR_EARLY_EXIT_CONF', raising=False)
+        monkeypatch.setattr(runner, '_tesseract_version', lambda: "5.3.0")
+        base = ocr_version()
+        monkeypatch.setenv('OCR_EARLY_EXIT_CONF', '0')
+        assert ocr_version() != base
+        monkeypatch.delenv('OCR_EARLY_EXIT_CONF')
+        monkeypatch.setattr(runner, '_tesseract_version', lambda: "5.4.1")
+        assert ocr_version() != base
+
+    def test_ocr_version_tracks_dictionary_contents(self, tmp_path, monkeypatch):
+        dictionary = tmp_path / "words.dawg"
+        dictionary.write_bytes(b"v1")
+        monkeypatch.setenv('OCR_DICTIONARY_PATH', str(dictionary))
+        before = ocr_version()
+        dictionary.write_bytes(b"v2")
+        assert ocr_version() != before
+
+    def test_put_and_get(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache.sqlite")
+        assert cache.get("k") is None
+        cache.put("k", "vqa", "v1", "red", 1.5)
+        assert cache.get("k") == ("red", 1.5)
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.close()
+
+
+class TestRunner:
+    """Test cases for execute_jobs with stub models"""
+
+    def test_second_run_is_served_from_cache(self, stubs, image, tmp_path):
+        cache = ResultCache(tmp_path / "cache.sqlite")
+        jobs = [Job(1, 'vqa', image, "What color?"), Job(2, 'ocr', image, "Read it")]
+        first = execute_jobs(jobs, cache=cache)
+        assert not any(r.cached for r in first.values())
+
+        again = [Job(1, 'vqa', image, "What color?"), Job(2, 'ocr', image, "What does it say?")]
+        second = execute_jobs(again, cache=cache)
+        assert all(r.cached for r in second.values())
+        assert second[1].output == first[1].output
+        cache.close()
+
+    def test_ocr_runs_with_job_profile_and_gate(self, stubs, image, monkeypatch):
+        calls = []
+        monkeypatch.setattr(sys.modules['ocr.ocr_module'], 'extract_text',
+                            lambda path, detect_text_first=True, profile=None:
+                            calls.append((profile, detect_text_first)) or "READ")
+        execute_jobs([Job(1, 'ocr', image, "Price?", profile='digits'),
+                      Job(2, 'ocr', image, "Read it", profile='digits'),
+                      Job(3, 'ocr', image, "What's written?", gated=True)])
+        assert calls == [('digits', False), (None, True)]
+
+    def test_ocr_cache_is_keyed_on_profile(self, stubs, image, tmp_path):
+        cache = ResultCache(tmp_path / "cache.sqlite")
+        execute_jobs([Job(1, 'ocr', image, "Read it", profile='signs')], cache=cache)
+        other = execute_jobs([Job(1, 'ocr', image, "Read it", profile='digits')], cache=cache)
+        same = execute_jobs([Job(1, 'ocr', image, "Read it", profile='signs')], cache=cache)
+        assert not other[1].cached and same[1].cached
+        cache.close()
+
+    def test_empty_ocr_output_is_not_cached(self, stubs, image, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys.modules['ocr.ocr_module'], 'extract_text', lambda *a, **k: "No text found")
+        cache = ResultCache(tmp_path / "cache.sqlite")
+        execute_jobs([Job(1, 'ocr', image, "Read it")], cache=cache)
+        again = execute_jobs([Job(1, 'ocr', image, "Read it")], cache=cache)
+        assert not again[1].cached
+        cache.close()
+
+    def test_cache_only_skips_missing(self, stubs, image, tmp_path):
+        cache = ResultCache(tmp_path / "cache.sqlite")
+        results = execute_jobs([Job(1, 'vqa', image, "Q?")], cache=cache, cache_only=True)
+        assert results == {}
+        cache.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+"""
+Unit tests for cascade VQA evaluation
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from evaluation.cascade import CascadeCase, measure_case, summarize_cascade
+
+
+def _case(confidence, small_correct, large_correct, small_seconds=0.1, large_seconds=1.0):
+    return CascadeCase("q", "a", "s", confidence, small_seconds, small_correct,
+                       "l", large_seconds, large_correct)
+
+
+class TestSummarizeCascade:
+    """Test cases for replaying the cascade at several thresholds"""
+
+    def test_threshold_trades_accuracy_for_latency(self):
+        cases = [
+            _case(0.9, True, True),
+            _case(0.6, False, True),
+            _case(0.2, False, True),
+            _case(None, True, False),
+        ]
+        summary = summarize_cascade(cases, [0.0, 0.5, 1.0])
+        assert summary['small_accuracy'] == 50.0
+        assert summary['large_accuracy'] == 75.0
+        never, mid, always = summary['thresholds']
+
+        # unscored answers escalate even at threshold 0
+        assert never['escalation_rate'] == 25.0
+        assert never['accuracy'] == 25.0 and never['accuracy_delta'] == -50.0
+        assert mid['escalation_rate'] == 50.0
+        assert mid['accuracy'] == 50.0 and mid['accuracy_delta'] == -25.0
+        assert always['escalation_rate'] == 100.0
+        assert always['accuracy_delta'] == 0.0
+        # escalating everything costs the small pass on top of the large one
+        assert always['latency_savings'] == pytest.approx(-10.0)
+        assert mid['avg_time'] == pytest.approx(0.6)
+        assert mid['latency_savings'] == pytest.approx(40.0)
+
+    def test_empty_cases(self):
+        summary = summarize_cascade([], [0.5])
+        assert summary['cases'] == 0
+        assert summary['thresholds'][0]['escalation_rate'] == 0.0
+
+
+class TestMeasureCase:
+    """Test cases for timing both cascade stages on one case"""
+
+    def test_records_answers_confidence_and_correctness(self):
+        case = measure_case("What color?", "red",
+                            small=lambda q: ("red", 0.8),
+                            large=lambda q: "a red car",
+                            is_correct=lambda expected, actual: actual == expected)
+        assert case.small_answer == "red" and case.small_confidence == 0.8
+        assert case.small_correct and not case.large_correct
+        assert case.small_seconds >= 0 and case.large_seconds >= 0
@@ -0,0 +1,95 @@
+"""
+Unit tests for streaming evaluation primitives
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from evaluation.cascade import summarize_cascade
+from evaluation.streaming import QuantileSketch, ResultLog, StreamingMetrics, iter_cases
+
+
+class TestQuantileSketch:
+    """Test cases for the relative-error quantile sketch"""
+
+    def test_quantiles_within_relative_error(self):
+        rng = random.Random(0)
+        values = [rng.lognormvariate(0, 1) for _ in range(20000)]
+        sketch = QuantileSketch(alpha=0.01)
+        for v in values:
+            sketch.add(v)
+        values.sort()
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert abs(sketch.quantile(q) - exact) / exact <= 0.02
+
+    def test_memory_is_bounded_by_range(self):
+        sketch = QuantileSketch(alpha=0.01)
+        for i in range(100000):
+            sketch.add(0.5 + (i % 1000) / 1000)
+        # log(1.5 / 0.5) / log(gamma) ~ 55 buckets, regardless of the sample count
+        assert len(sketch.buckets) <= 60
+
+    def test_round_trip(self):
+        sketch = QuantileSketch()
+        for v in (0.1, 0.2, 0.0, 3.0):
+            sketch.add(v)
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+class TestResultLog:
+    """Test cases for JSONL result logging and resume"""
+
+    def test_replay_drops_partial_line(self, tmp_path):
+        path = tmp_path / "results.jsonl"
+        log = ResultLog(str(path)).open(resume=False)
+        for row in (1, 2):
+            log.write({'row': row, 'module': 'ocr', 'correct': True, 'response_time': 0.1,
+                       'routing_correct': True})
+        log.close()
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"row": 3, "mod')
+
+        metrics = StreamingMetrics()
+        assert ResultLog(str(path)).replay(metrics) == 2
+        assert metrics.get_summary()['ocr']['correct'] == 2
+        assert path.read_text().count("\n") == 2
+
+    def test_iter_cases_skips_completed_rows(self, tmp_path):
+        path = tmp_path / "cases.csv"
+        path.write_text("image_path,question\na.jpg,q1\nb.jpg,q2\nc.jpg,q3\n")
+        assert [row for row, _ in iter_cases(str(path), start_after=2)] == [3]
+
+
+class TestStreamingMain:
+    """Test cases for the --stream command line path"""
+
+    def test_stream_with_cascade_saves_cascade(self, tmp_path, monkeypatch):
+        import evaluate_system
+
+        cascade = dict(summarize_cascade([], [0.5]), small_backend='blip-base', large_backend='blip2')
+        seen = {}
+        monkeypatch.setattr(evaluate_system, 'VQA_AVAILABLE', True)
+        monkeypatch.setattr(evaluate_system, 'evaluate_streaming',
+                            lambda *a, **k: StreamingMetrics())
+        monkeypatch.setattr(evaluate_system, 'evaluate_cascade',
+                            lambda *a: seen.setdefault('args', a) and cascade)
+        results = tmp_path / "results.jsonl"
+        evaluate_system.main(['--cases', str(tmp_path / "cases.csv"), '--no-cache',
+                              '--stream', str(results), '--cascade'])
+
+        summary = json.loads((tmp_path / "results.summary.json").read_text())
+        assert summary['cascade'] == cascade
+        assert 'summary' in summary
+        assert seen['args'][0] == str(tmp_path / "cases.csv")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -21,6 +21,7 @@ if __name__ == '__main__':
     print("  - GET  /api/health - Health check")
     print("  - POST /api/query  - Process image + question")
     print("  - POST /api/test   - Test module availability")
+    print("  - GET  /metrics    - Prometheus metrics")
     print("\nPress Ctrl+C to stop the server")
     print("=" * 60)
     print()
@@ -0,0 +1,196 @@
+"""
+Memory Governor - residency manager for models, caches and dictionaries
+
+Modules register what they keep resident (the BLIP-2 model, the VQA prefix
+cache, the OCR word list, ...) together with a callback that releases it.
+The governor then:
+
+- unloads models that have been idle longer than their idle timeout,
+- when process RSS exceeds the soft limit, releases caches first (least
+  recently used first) and only then idle-longest models, re-checking RSS
+  after each release,
+
+and reports RSS, limits and every resident's state for the status endpoint.
+Released residents are rebuilt by their owners on next use (load_model(),
+load_english_dictionary(), ...), so eviction is transparent to callers.
+"""
+
+import gc
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Release order under memory pressure: caches before dictionaries before models
+KIND_ORDER = {'cache': 0, 'dictionary': 1, 'model': 2}
+
+
+def _default_limit_bytes() -> int:
+    """VQA_MEMORY_LIMIT_MB, else 80% of physical memory; 0 when unknown."""
+    configured = os.environ.get('VQA_MEMORY_LIMIT_MB')
+    if configured is not None:
+        return int(float(configured) * 1024 * 1024)
+    if psutil is None:
+        return 0
+    return int(psutil.virtual_memory().total * 0.8)
+
+
+def _rss_bytes():
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+@dataclass
+class Resident:
+    name: str
+    kind: str                      # 'cache', 'dictionary' or 'model'
+    release: object                # callable freeing the resource
+    is_loaded: object              # callable -> bool
+    size: object = None            # optional callable -> estimated bytes
+    idle_timeout: float = 0.0      # seconds idle before unloading; 0 = never
+    last_used: float = 0.0
+    releases: int = 0
+
+    def to_dict(self, now: float) -> dict:
+        loaded = bool(self.is_loaded())
+        size = None
+        if loaded and self.size is not None:
+            try:
+                size = self.size()
+            except Exception:
+                size = None
+        return {
+            'kind': self.kind,
+            'loaded': loaded,
+            'estimated_bytes': size,
+            'idle_seconds': round(now - self.last_used, 1) if self.last_used else None,
+            'idle_timeout_seconds': self.idle_timeout or None,
+            'releases': self.releases,
+        }
+
+
+class MemoryGovernor:
+    """Tracks RSS and releases registered residents by idle time and memory pressure."""
+
+    def __init__(self, limit_bytes: int | None = None, interval: float = 30.0,
+                 rss=_rss_bytes, clock=time.monotonic):
+        self.limit_bytes = _default_limit_bytes() if limit_bytes is None else limit_bytes
+        self.interval = interval
+        self.rss = rss
+        self.clock = clock
+        self._residents = {}
+        self._lock = threading.RLock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_actions = []
+
+    def register(self, name: str, kind: str, release, is_loaded, size=None,
+                 idle_timeout: float = 0.0) -> Resident:
+        if kind not in KIND_ORDER:
+            raise ValueError(f"Unknown resident kind: {kind}")
+        resident = Resident(name, kind, release, is_loaded, size, idle_timeout, self.clock())
+        with self._lock:
+            self._residents[name] = resident
+        return resident
+
+    def touch(self, name: str):
+        """Mark a resident as just used."""
+        resident = self._residents.get(name)
+        if resident is not None:
+            resident.last_used = self.clock()
+
+    def release(self, name: str, reason: str) -> bool:
+        with self._lock:
+            resident = self._residents.get(name)
+            if resident is None or not resident.is_loaded():
+                return False
+            try:
+                resident.release()
+            except Exception as e:
+                print(f"[Governor] Failed to release {name}: {e}")
+                return False
+            resident.releases += 1
+            self.last_actions.append({'resident': name, 'reason': reason, 'at': time.time()})
+            del self.last_actions[:-20]
+            print(f"[Governor] Released {name} ({reason})")
+        gc.collect()
+        return True
+
+    def check(self) -> list:
+        """Run one governance pass; returns the names released."""
+        released = []
+        now = self.clock()
+        with self._lock:
+            residents = list(self._residents.values())
+
+        for resident in residents:
+            if (resident.idle_timeout and now - resident.last_used > resident.idle_timeout
+                    and self.release(resident.name, 'idle')):
+                released.append(resident.name)
+
+        if self.limit_bytes:
+            order = sorted((r for r in residents if r.name not in released),
+                           key=lambda r: (KIND_ORDER[r.kind], r.last_used))
+            for resident in order:
+                rss = self.rss()
+                if rss is None or rss <= self.limit_bytes:
+                    break
+                if self.release(resident.name, 'memory_pressure'):
+                    released.append(resident.name)
+        return released
+
+    def start(self):
+        """Start the background governance thread (idempotent; interval <= 0 disables)."""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-governor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[Governor] Check failed: {e}")
+
+    def status(self) -> dict:
+        now = self.clock()
+        with self._lock:
+            residents = {name: r.to_dict(now) for name, r in self._residents.items()}
+            actions = list(self.last_actions)
+        rss = self.rss()
+        return {
+            'rss_bytes': rss,
+            'limit_bytes': self.limit_bytes or None,
+            'over_limit': bool(self.limit_bytes and rss and rss > self.limit_bytes),
+            'check_interval_seconds': self.interval,
+            'residents': residents,
+            'recent_releases': actions,
+        }
+
+
+GOVERNOR = MemoryGovernor(interval=float(os.environ.get('VQA_GOVERNOR_INTERVAL', '30')))
+
+
+def register_resident(name: str, kind: str, release, is_loaded, size=None,
+                      idle_timeout: float = 0.0):
+    """Register a resource with the process-wide governor."""
+    return GOVERNOR.register(name, kind, release, is_loaded, size, idle_timeout)
+
+
+def touch_resident(name: str):
+    """Mark a resource as used so it is not considered idle."""
+    GOVERNOR.touch(name)
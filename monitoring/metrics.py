@@ -0,0 +1,312 @@
+"""
+Metrics Module - Prometheus-style instrumentation
+Collects request counts, per-stage latency histograms, cache hit rates and
+process statistics, and renders them in the Prometheus text exposition format.
+
+The implementation is dependency-free and lock-per-metric so it is cheap enough
+to leave enabled in production.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from monitoring.tracing import stage_span
+
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds) covering sub-millisecond routing up to slow CPU inference
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_START_TIME = time.time()
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class holding name, help text and label names."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """Yield (suffix, label_string, value) tuples for rendering."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} {self.type_name}"]
+        for suffix, label_str, value in self.samples():
+            lines.append(f"{self.name}{suffix}{label_str} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def set_function(self, fn):
+        """Compute the (unlabelled) value by calling `fn` on every scrape."""
+        self._function = fn
+
+    def samples(self):
+        if self._function is not None:
+            value = self._function()
+            if value is not None:
+                yield "", "", value
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts + overflow slot, sum, count
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def get_sum(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def samples(self):
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = ("le", _format_value(bound))
+                yield "_bucket", _format_labels(self.labelnames, key, le), cumulative
+            yield "_sum", _format_labels(self.labelnames, key), total
+            yield "_count", _format_labels(self.labelnames, key), count
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "vqa_requests_total", "API requests handled, by endpoint and HTTP status",
+    ("endpoint", "status")))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "vqa_request_duration_seconds", "End-to-end API request latency", ("endpoint",)))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "vqa_stage_duration_seconds", "Latency of individual pipeline stages", ("stage",)))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "vqa_requests_in_flight", "Requests currently being processed (queue depth)"))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "vqa_cache_lookups_total", "Cache lookups by cache name and result (hit/miss)",
+    ("cache", "result")))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "vqa_cache_hit_ratio", "Fraction of cache lookups that were hits", ("cache",)))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "vqa_model_load_seconds", "Wall-clock time of the most recent model load", ("model",)))
+MODULE_RUNS = REGISTRY.register(Counter(
+    "vqa_module_runs_total", "Model modules executed for /api/query, by module and reason "
+    "(routed: only the routed module ran, full: both ran, fallback: lazy retry)",
+    ("module", "reason")))
+MODULE_SKIPS = REGISTRY.register(Counter(
+    "vqa_module_skips_total", "Model modules not executed because routing was confident",
+    ("module",)))
+MODULE_SECONDS_SAVED = REGISTRY.register(Counter(
+    "vqa_module_seconds_saved_total", "Estimated seconds saved by skipped modules "
+    "(mean observed latency of that module's stage)", ("module",)))
+CASCADE_DECISIONS = REGISTRY.register(Counter(
+    "vqa_cascade_decisions_total", "Cascade VQA answers, by outcome (accepted: small model's "
+    "answer kept, escalated: re-answered by the large model)", ("outcome",)))
+PROCESS_RSS = REGISTRY.register(Gauge(
+    "process_resident_memory_bytes", "Resident set size of the API process"))
+PROCESS_UPTIME = REGISTRY.register(Gauge(
+    "process_uptime_seconds", "Seconds since the metrics module was imported"))
+
+
+def _rss_bytes():
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+PROCESS_RSS.set_function(_rss_bytes)
+PROCESS_UPTIME.set_function(lambda: time.time() - _START_TIME)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Record the duration of the enclosed block in the stage histogram.
+
+    When a trace is active the block is also recorded as a child span.
+    """
+    with stage_span(stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup and refresh that cache's hit ratio."""
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+    hits = CACHE_LOOKUPS.get(cache=cache, result="hit")
+    misses = CACHE_LOOKUPS.get(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+
+
+def record_model_load(model: str, seconds: float):
+    """Publish how long the last load of `model` took."""
+    MODEL_LOAD_SECONDS.set(seconds, model=model)
+
+
+def record_module_skip(module: str):
+    """Count a skipped module and credit its mean observed stage latency as saved time."""
+    MODULE_SKIPS.inc(module=module)
+    count = STAGE_SECONDS.get_count(stage=module)
+    if count:
+        MODULE_SECONDS_SAVED.inc(STAGE_SECONDS.get_sum(stage=module) / count, module=module)
+
+
+def record_cascade(escalated: bool):
+    """Count one cascade decision."""
+    CASCADE_DECISIONS.inc(outcome="escalated" if escalated else "accepted")
+
+
+def process_stats() -> dict:
+    """Small snapshot used by the health endpoint."""
+    return {
+        'uptime_seconds': round(time.time() - _START_TIME, 3),
+        'rss_bytes': _rss_bytes(),
+        'requests_in_flight': IN_FLIGHT.get(),
+    }
+
+
+def render_latest() -> str:
+    """Render every registered metric in Prometheus text format."""
+    return REGISTRY.render()
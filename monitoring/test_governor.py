@@ -0,0 +1,88 @@
+"""
+Unit tests for the memory governor
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from monitoring.governor import MemoryGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResource:
+    def __init__(self, size):
+        self.size = size
+        self.loaded = True
+
+    def release(self):
+        self.loaded = False
+
+    def is_loaded(self):
+        return self.loaded
+
+
+class TestMemoryGovernor:
+    """Test cases for idle unloading and pressure-ordered eviction"""
+
+    def _governor(self, limit, resources):
+        rss = lambda: sum(r.size for r in resources if r.loaded)
+        return MemoryGovernor(limit_bytes=limit, interval=0, rss=rss, clock=self.clock)
+
+    def setup_method(self):
+        self.clock = FakeClock()
+
+    def test_idle_model_is_unloaded(self):
+        model = FakeResource(100)
+        governor = self._governor(0, [model])
+        governor.register('model', 'model', model.release, model.is_loaded, idle_timeout=60)
+        self.clock.now += 30
+        assert governor.check() == []
+        governor.touch('model')
+        self.clock.now += 59
+        assert governor.check() == []
+        self.clock.now += 2
+        assert governor.check() == ['model']
+        assert not model.loaded
+
+    def test_pressure_releases_caches_before_models(self):
+        model, cache, words = FakeResource(500), FakeResource(300), FakeResource(100)
+        governor = self._governor(650, [model, cache, words])
+        governor.register('model', 'model', model.release, model.is_loaded)
+        governor.register('words', 'dictionary', words.release, words.is_loaded)
+        governor.register('cache', 'cache', cache.release, cache.is_loaded)
+        assert governor.check() == ['cache']
+        assert model.loaded and words.loaded
+
+    def test_pressure_unloads_model_last(self):
+        model, cache = FakeResource(500), FakeResource(300)
+        governor = self._governor(100, [model, cache])
+        governor.register('model', 'model', model.release, model.is_loaded)
+        governor.register('cache', 'cache', cache.release, cache.is_loaded)
+        assert governor.check() == ['cache', 'model']
+
+    def test_status_reports_residents(self):
+        cache = FakeResource(300)
+        governor = self._governor(1000, [cache])
+        governor.register('cache', 'cache', cache.release, cache.is_loaded, size=lambda: cache.size)
+        status = governor.status()
+        assert status['rss_bytes'] == 300 and not status['over_limit']
+        assert status['residents']['cache'] == {
+            'kind': 'cache', 'loaded': True, 'estimated_bytes': 300,
+            'idle_seconds': 0.0, 'idle_timeout_seconds': None, 'releases': 0,
+        }
+
+    def test_rejects_unknown_kind(self):
+        governor = self._governor(0, [])
+        with pytest.raises(ValueError):
+            governor.register('x', 'blob', lambda: None, lambda: True)
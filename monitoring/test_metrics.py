@@ -0,0 +1,86 @@
+"""
+Unit tests for the metrics module and the /metrics endpoint
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from monitoring.metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, STAGE_SECONDS,
+    record_cache, render_latest, time_stage,
+)
+
+
+class TestMetrics:
+    """Test cases for the Prometheus-style metric types"""
+
+    def test_counter_renders_labels(self):
+        c = Counter("test_total", "A counter", ("kind",))
+        c.inc(kind="a")
+        c.inc(2, kind="a")
+        assert c.get(kind="a") == 3
+        assert 'test_total{kind="a"} 3' in c.render()
+
+    def test_counter_rejects_wrong_labels(self):
+        c = Counter("test_total", "A counter", ("kind",))
+        with pytest.raises(ValueError):
+            c.inc(other="x")
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = Histogram("test_seconds", "A histogram", buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 5.0):
+            h.observe(v)
+        text = h.render()
+        assert 'test_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_seconds_bucket{le="1"} 2' in text
+        assert 'test_seconds_bucket{le="+Inf"} 3' in text
+        assert "test_seconds_count 3" in text
+
+    def test_gauge_function_is_evaluated_on_render(self):
+        g = Gauge("test_value", "A gauge")
+        g.set_function(lambda: 42)
+        assert "test_value 42" in g.render()
+
+    def test_registry_rejects_duplicates(self):
+        registry = MetricsRegistry()
+        registry.register(Counter("dup_total", "x"))
+        with pytest.raises(ValueError):
+            registry.register(Counter("dup_total", "x"))
+
+    def test_time_stage_records_observation(self):
+        before = STAGE_SECONDS.get_count(stage="unit_test")
+        with time_stage("unit_test"):
+            pass
+        assert STAGE_SECONDS.get_count(stage="unit_test") == before + 1
+
+    def test_cache_hit_ratio(self):
+        record_cache("unit_cache", False)
+        record_cache("unit_cache", True)
+        assert 'vqa_cache_hit_ratio{cache="unit_cache"} 0.5' in render_latest()
+
+
+class TestMetricsEndpoint:
+    """Test cases for the Flask /metrics endpoint"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip("flask")
+        from ui.app import app
+        return app.test_client()
+
+    def test_metrics_endpoint_counts_requests(self, client):
+        client.get('/api/health')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        body = response.get_data(as_text=True)
+        assert 'vqa_requests_total{endpoint="health_check",status="200"}' in body
+        assert "vqa_request_duration_seconds_bucket" in body
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
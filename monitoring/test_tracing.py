@@ -0,0 +1,91 @@
+"""
+Unit tests for the tracing module and debug trace output
+"""
+
+import base64
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from monitoring import tracing
+from monitoring.metrics import time_stage
+
+
+class TestTracing:
+    """Test cases for context-var based spans"""
+
+    def test_nested_spans_form_a_tree(self):
+        with tracing.span("root") as root:
+            with tracing.span("child"):
+                with time_stage("grandchild"):
+                    pass
+        tree = root.to_dict()
+        assert tree['name'] == "root"
+        assert tree['children'][0]['name'] == "child"
+        assert tree['children'][0]['children'][0]['name'] == "grandchild"
+        assert tracing.current_span() is None
+
+    def test_stage_without_trace_creates_no_span(self):
+        with time_stage("untraced"):
+            assert tracing.current_span() is None
+
+    def test_suspended_block_records_no_spans(self):
+        with tracing.span("root") as root:
+            with tracing.suspended():
+                with time_stage("frame"):
+                    assert tracing.current_span() is None
+            assert tracing.current_span() is root
+        assert 'children' not in root.to_dict()
+
+    def test_error_is_recorded(self):
+        with pytest.raises(RuntimeError):
+            with tracing.span("root") as root:
+                raise RuntimeError("boom")
+        assert root.to_dict()['error'] == "RuntimeError: boom"
+
+    def test_export_writes_otlp_json(self, tmp_path, monkeypatch):
+        trace_file = tmp_path / "traces.jsonl"
+        monkeypatch.setenv(tracing.TRACE_FILE_ENV, str(trace_file))
+        with tracing.span("root", question_length=5) as root:
+            with tracing.span("child"):
+                pass
+        doc = json.loads(trace_file.read_text().strip())
+        spans = doc['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert [s['name'] for s in spans] == ["root", "child"]
+        assert spans[1]['parentSpanId'] == root.span_id
+        assert all(s['traceId'] == root.trace_id for s in spans)
+        assert spans[0]['attributes'][0] == {'key': 'question_length', 'value': {'intValue': '5'}}
+
+
+class TestDebugTraceHeader:
+    """Test cases for attaching the span tree to /api/query responses"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip("flask")
+        PIL = pytest.importorskip("PIL.Image")
+        from ui.app import app
+        buf = io.BytesIO()
+        PIL.new('RGB', (32, 32), color='white').save(buf, format='PNG')
+        self.image_b64 = base64.b64encode(buf.getvalue()).decode()
+        return app.test_client()
+
+    def test_trace_only_returned_with_header(self, client):
+        form = {'question': 'What color is this?', 'image_base64': self.image_b64}
+        plain = client.post('/api/query', data=form).get_json()
+        assert 'trace' not in plain['details']
+
+        traced = client.post('/api/query', data=form, headers={'X-Debug-Trace': '1'}).get_json()
+        trace = traced['details']['trace']
+        assert trace['name'] == "POST /api/query"
+        stages = [c['name'] for c in trace['children']]
+        assert 'decode' in stages and 'routing' in stages
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,198 @@
+"""
+Tracing Module - Lightweight per-request span tracing
+Keeps the active span in a context variable so nested pipeline stages form a
+tree without passing objects around. Finished traces can be appended to a local
+file in OTLP/JSON format (one `resourceSpans` document per line), which the
+OpenTelemetry collector's file receiver and most trace viewers can import.
+
+Set VQA_TRACE_FILE to enable the file export. Spans are only created for
+pipeline stages while a trace is active, so tracing costs nothing outside a
+request.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+SERVICE_NAME = "assistive-vqa"
+TRACE_FILE_ENV = "VQA_TRACE_FILE"
+
+_current_span = contextvars.ContextVar("vqa_current_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """A timed operation with attributes and child spans."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent", "attributes",
+                 "start_ns", "end_ns", "children", "error", "_token")
+
+    def __init__(self, name: str, parent=None, attributes: dict | None = None):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.children = []
+        self.error = None
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        """Nested span tree suitable for returning in API responses."""
+        node = {
+            'name': self.name,
+            'span_id': self.span_id,
+            'duration_ms': round(self.duration_ms, 3),
+            'start_offset_ms': round((self.start_ns - self._root().start_ns) / 1e6, 3),
+        }
+        if self.attributes:
+            node['attributes'] = dict(self.attributes)
+        if self.error:
+            node['error'] = self.error
+        if self.end_ns is None:
+            node['in_progress'] = True
+        if self.children:
+            node['children'] = [c.to_dict() for c in self.children]
+        return node
+
+    def iter_spans(self):
+        yield self
+        for child in self.children:
+            yield from child.iter_spans()
+
+    def _root(self):
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+
+def current_span():
+    """Return the active span for this context, or None."""
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes) -> Span:
+    """Open a span as a child of the active one (or as a new trace root)."""
+    parent = _current_span.get()
+    span = Span(name, parent, attributes)
+    if parent is not None:
+        parent.children.append(span)
+    span._token = _current_span.set(span)
+    return span
+
+
+def end_span(span: Span, error: BaseException | None = None):
+    """Close a span, restore its parent as active and export finished traces."""
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}"
+    if span._token is not None:
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # ended from a different context (e.g. Flask teardown); fall back to the parent
+            _current_span.set(span.parent)
+        span._token = None
+    if span.parent is None:
+        export_trace(span)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Context manager wrapping start_span/end_span."""
+    s = start_span(name, **attributes)
+    try:
+        yield s
+    except BaseException as exc:
+        end_span(s, exc)
+        raise
+    else:
+        end_span(s)
+
+
+def stage_span(name: str):
+    """Child span when a trace is active, otherwise a no-op context."""
+    if _current_span.get() is None:
+        return nullcontext()
+    return span(name)
+
+
+@contextmanager
+def suspended():
+    """Record no spans in the enclosed block, e.g. per-frame work of a long stream."""
+    token = _current_span.set(None)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def set_attribute(key: str, value):
+    """Attach an attribute to the active span, if any."""
+    s = _current_span.get()
+    if s is not None:
+        s.set_attribute(key, value)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(root: Span) -> dict:
+    """Convert a finished trace into an OTLP/JSON `resourceSpans` document."""
+    spans = []
+    for s in root.iter_spans():
+        item = {
+            'traceId': s.trace_id,
+            'spanId': s.span_id,
+            'name': s.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(s.start_ns),
+            'endTimeUnixNano': str(s.end_ns if s.end_ns is not None else time.time_ns()),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in s.attributes.items()],
+            'status': {'code': 2, 'message': s.error} if s.error else {'code': 1},
+        }
+        if s.parent is not None:
+            item['parentSpanId'] = s.parent.span_id
+        spans.append(item)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}},
+            ]},
+            'scopeSpans': [{'scope': {'name': 'monitoring.tracing'}, 'spans': spans}],
+        }]
+    }
+
+
+def export_trace(root: Span, path: str | None = None):
+    """Append a finished trace to the configured trace file (no-op when unset)."""
+    path = path or os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return
+    line = json.dumps(to_otlp(root), separators=(',', ':'))
+    try:
+        with _export_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"[TRACE] Failed to export trace to {path}: {e}")
@@ -1,5 +1,6 @@
 """ocr_app package exports."""
+from .layout import OcrLayout
 from .ocr import OCR
 
-__all__ = ["OCR"]
+__all__ = ["OCR", "OcrLayout"]
 # This file is intentionally left blank.
\ No newline at end of file
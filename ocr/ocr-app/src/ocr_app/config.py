@@ -1,13 +1,102 @@
-"""Configuration container for OCR defaults."""
-from dataclasses import dataclass
+"""Configuration container for OCR defaults and named tuning profiles."""
+import os
+import re
+from dataclasses import dataclass, replace
 
+# Directory of tessdata_fast models (github.com/tesseract-ocr/tessdata_fast); the
+# "fast" profiles use it when set, else Tesseract's default tessdata
+TESSDATA_FAST_DIR = os.environ.get("OCR_TESSDATA_FAST_DIR") or None
 
-@dataclass
+
+@dataclass(frozen=True)
 class Config:
     tesseract_cmd: str | None = None
     lang: str = "eng"
     oem: int = 3
     psm: int = 3
+    # Page segmentation modes ocr_module tries in turn (longest result wins); () = psm only
+    passes: tuple = ()
+    tessdata_dir: str | None = None
+    # Only these characters are recognized (tessedit_char_whitelist); None = all
+    whitelist: str | None = None
+    # Resolution hint for images without DPI metadata (Tesseract assumes 70 otherwise)
+    dpi: int | None = None
+    # Load the word-list dictionaries; off for codes and numbers that are not words
+    dictionaries: bool = True
+    # Run normalize_ocr() spell correction on the result
+    spell_correct: bool = True
+
+    def tesseract_config(self, psm: int | None = None) -> str:
+        """The pytesseract `config` string for this profile (and an optional PSM override)."""
+        parts = [f"--oem {self.oem}", f"--psm {self.psm if psm is None else psm}"]
+        if self.tessdata_dir:
+            parts.append(f'--tessdata-dir "{self.tessdata_dir}"')
+        if self.dpi:
+            parts.append(f"--dpi {self.dpi}")
+        if self.whitelist:
+            parts.append(f"-c tessedit_char_whitelist={self.whitelist}")
+        if not self.dictionaries:
+            parts.append("-c load_system_dawg=0 -c load_freq_dawg=0")
+        return " ".join(parts)
+
+    @property
+    def psm_passes(self) -> tuple:
+        return self.passes or (self.psm,)
+
+
+# Named profiles. "default" is the historical behaviour (three PSM passes, full models).
+# Profiles with oem=1 use the LSTM engine only, which is all tessdata_fast models contain.
+PROFILES = {
+    "default": Config(passes=(3, 11, 6)),
+    # short, sparse text on signs: sparse-text and automatic segmentation
+    "signs": Config(oem=1, psm=11, passes=(11, 3), tessdata_dir=TESSDATA_FAST_DIR),
+    # letters, bills, menus: page layout at scanner resolution
+    "documents": Config(oem=1, psm=3, passes=(3, 6), tessdata_dir=TESSDATA_FAST_DIR, dpi=300),
+    # prices, phone and account numbers: digits and separators only, no word lists
+    "digits": Config(oem=1, psm=11, passes=(11, 6), tessdata_dir=TESSDATA_FAST_DIR,
+                     whitelist="0123456789$.,:-/+%()#", dictionaries=False, spell_correct=False),
+    # product and medicine labels: a uniform block of small text
+    "labels": Config(oem=1, psm=6, passes=(6, 11), tessdata_dir=TESSDATA_FAST_DIR, dpi=300),
+}
+
+# Question words -> profile, checked in order (first match wins). "digits" drops letters,
+# so it only takes unambiguous numeric cues: "how much", "total", "due" or "code" questions
+# are often answered with words ("Total Wine", "due Friday", "dress code")
+QUESTION_PROFILES = [
+    ("digits", ("price", "prices", "cost", "costs", "number", "numbers", "digit", "digits",
+                "phone")),
+    ("documents", ("document", "letter", "bill", "page", "paragraph", "receipt", "menu",
+                   "form", "invoice", "article")),
+    ("labels", ("label", "labels", "ingredient", "ingredients", "package", "bottle",
+                "medicine", "dosage", "box", "expiry", "expiration")),
+    ("signs", ("sign", "signs", "street", "store", "shop", "banner", "poster")),
+]
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def get_profile(profile=None) -> Config:
+    """A Config from a profile name, a Config (returned as is) or None ("default")."""
+    if isinstance(profile, Config):
+        return profile
+    name = (profile or "default").strip().lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown OCR profile '{profile}' (available: {', '.join(sorted(PROFILES))})")
+    return PROFILES[name]
+
+
+def profile_for_question(question: str | None) -> str:
+    """Profile name for a question's type; "default" when no keyword matches."""
+    words = set(_WORD.findall((question or "").lower()))
+    for name, keywords in QUESTION_PROFILES:
+        if words.intersection(keywords):
+            return name
+    return "default"
+
+
+def with_overrides(config: Config, **changes) -> Config:
+    """A copy of config with the given fields changed (None values are ignored)."""
+    return replace(config, **{k: v for k, v in changes.items() if v is not None})
 # Configuration settings for the OCR application
 
 # File paths
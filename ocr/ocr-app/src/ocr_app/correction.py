@@ -0,0 +1,209 @@
+"""Bounded edit-distance search for OCR word correction.
+
+Three paths, all exact Levenshtein distance capped at a small bound k:
+
+- bounded_levenshtein(): one pair; only the diagonal band |i - j| <= k of the
+  DP table is filled and the scan stops once a whole row exceeds k (Ukkonen's
+  cutoff), so a pair costs O(k * len) instead of O(len^2).
+- Corrector.candidates(): every dictionary word within k of a token, found by
+  walking the memory-mapped DAWG (ocr_app.dictionary) with one banded DP row
+  per edge. A prefix whose row is entirely above k is pruned, so the walk
+  touches a small neighbourhood of the token instead of the whole dictionary.
+- distance_matrix()/nearest(): many tokens against a vocabulary at once with
+  NumPy; each DP row is computed for all pairs with vector operations.
+
+Distances are computed over uppercased UTF-8 bytes for the dictionary walk and
+over code points elsewhere; the two agree for ASCII words.
+"""
+import numpy as np
+
+from .dictionary import CompactDictionary
+
+# Default bound: one edit, as conservative as the SymSpell path in utils
+MAX_DISTANCE = 1
+# Token x word pairs per NumPy batch in nearest(); bounds its working memory
+PAIR_BUDGET = 1_000_000
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Levenshtein distance of a and b, or max_distance + 1 if it is larger."""
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    over = max_distance + 1
+    if abs(la - lb) > max_distance:
+        return over
+    if la == 0 or lb == 0:
+        return max(la, lb)
+
+    prev = [j if j <= max_distance else over for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        ca = a[i - 1]
+        lo, hi = max(1, i - max_distance), min(lb, i + max_distance)
+        cur = [over] * (lb + 1)
+        cur[0] = i if i <= max_distance else over
+        row_min = cur[0] if lo == 1 else over
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ca != b[j - 1])
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if cur[j - 1] + 1 < v:
+                v = cur[j - 1] + 1
+            if v > over:
+                v = over
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > max_distance:
+            return over
+        prev = cur
+    return min(prev[lb], over)
+
+
+class Corrector:
+    """Nearest dictionary words for OCR tokens, by bounded search over the DAWG."""
+
+    def __init__(self, dictionary: CompactDictionary, max_distance: int = MAX_DISTANCE):
+        self.dictionary = dictionary
+        self.max_distance = max_distance
+
+    def candidates(self, word: str, max_distance: int | None = None) -> list:
+        """(WORD, distance) for every dictionary word within max_distance, closest first."""
+        k = self.max_distance if max_distance is None else max_distance
+        key = word.upper().encode("utf-8")
+        n = len(key)
+        over = k + 1
+        d = self.dictionary
+
+        found = []
+        root_row = [j if j <= k else over for j in range(n + 1)]
+        if root_row[n] <= k and d.is_final(0):
+            found.append((b"", root_row[n]))
+        stack = [(0, b"", root_row)]
+        while stack:
+            node, prefix, prev = stack.pop()
+            i = len(prefix) + 1
+            lo, hi = max(1, i - k), min(n, i + k)
+            for label, child in d.children(node):
+                cur = [over] * (n + 1)
+                cur[0] = i if i <= k else over
+                row_min = cur[0]
+                for j in range(lo, hi + 1):
+                    v = prev[j - 1] + (key[j - 1] != label)
+                    if prev[j] + 1 < v:
+                        v = prev[j] + 1
+                    if cur[j - 1] + 1 < v:
+                        v = cur[j - 1] + 1
+                    if v > over:
+                        v = over
+                    cur[j] = v
+                    if v < row_min:
+                        row_min = v
+                if row_min > k:
+                    continue  # no extension of this prefix can come back within k
+                path = prefix + bytes((label,))
+                if cur[n] <= k and d.is_final(child):
+                    found.append((path, cur[n]))
+                stack.append((child, path, cur))
+
+        found.sort(key=lambda item: (item[1], item[0]))
+        return [(w.decode("utf-8", errors="replace"), dist) for w, dist in found]
+
+    def correct(self, word: str) -> str | None:
+        """The unique closest dictionary word at distance 1..max_distance, else None.
+
+        None for known words, for tokens with no candidate, and for ties, so
+        ambiguous tokens are kept as read rather than guessed.
+        """
+        if word in self.dictionary:
+            return None
+        found = self.candidates(word)
+        if not found or (len(found) > 1 and found[1][1] == found[0][1]):
+            return None
+        return found[0][0]
+
+
+def _encode(words: list) -> tuple:
+    """Uppercased code points padded with -1, and the lengths."""
+    lengths = np.array([len(w) for w in words], dtype=np.int32)
+    codes = np.full((len(words), max(int(lengths.max(initial=0)), 1)), -1, dtype=np.int32)
+    for row, word in enumerate(words):
+        if word:
+            codes[row, :len(word)] = np.frombuffer(word.upper().encode("utf-32-le"), dtype=np.uint32)
+    return codes, lengths
+
+
+def _levenshtein_rows(a: np.ndarray, la: np.ndarray, b: np.ndarray, lb: np.ndarray) -> np.ndarray:
+    """Distance of each encoded pair (a[i], b[i]).
+
+    The DP runs one row per character of the longest a-word for all pairs at
+    once. The insertion recurrence cur[j] = min(t[j], cur[j-1] + 1) is solved
+    in closed form as j + cumulative-min(t[j] - j).
+    """
+    b = np.where(b < 0, -2, b)  # padding never matches padding
+    pairs = np.arange(len(a))
+    cols = np.arange(b.shape[1] + 1, dtype=np.int32)
+
+    prev = np.broadcast_to(cols, (len(a), cols.size)).copy()
+    out = lb.copy()  # distance for empty a-words
+    for i in range(1, int(la.max(initial=0)) + 1):
+        cost = (a[:, i - 1:i] != b).astype(np.int32)
+        best = np.empty_like(prev)
+        best[:, 0] = i
+        np.minimum(prev[:, 1:] + 1, prev[:, :-1] + cost, out=best[:, 1:])
+        prev = cols + np.minimum.accumulate(best - cols, axis=1)
+        done = la == i
+        out[done] = prev[pairs[done], lb[done]]
+    return out
+
+
+def batch_levenshtein(a_words: list, b_words: list) -> np.ndarray:
+    """Levenshtein distance of each pair (a_words[i], b_words[i]), case-insensitive."""
+    if len(a_words) != len(b_words):
+        raise ValueError("a_words and b_words must have the same length")
+    if not a_words:
+        return np.zeros(0, dtype=np.int32)
+    return _levenshtein_rows(*_encode(a_words), *_encode(b_words))
+
+
+def distance_matrix(tokens: list, vocabulary: list) -> np.ndarray:
+    """Levenshtein distances, shape (len(tokens), len(vocabulary))."""
+    if not tokens or not vocabulary:
+        return np.zeros((len(tokens), len(vocabulary)), dtype=np.int32)
+    a, la = _encode(list(tokens))
+    b, lb = _encode(list(vocabulary))
+    n, m = len(la), len(lb)
+    rows = _levenshtein_rows(np.repeat(a, m, axis=0), np.repeat(la, m),
+                             np.tile(b, (n, 1)), np.tile(lb, n))
+    return rows.reshape(n, m)
+
+
+def nearest(tokens: list, vocabulary: list, max_distance: int = MAX_DISTANCE) -> list:
+    """Per token, the unique closest vocabulary word within max_distance, else None.
+
+    Tokens are grouped by length and compared only with words whose length is
+    within max_distance of theirs; any other pair is further apart than that.
+    """
+    by_length = {}
+    for word in vocabulary:
+        by_length.setdefault(len(word), []).append(word)
+    groups = {}
+    for index, token in enumerate(tokens):
+        groups.setdefault(len(token), []).append(index)
+
+    results = [None] * len(tokens)
+    for length, indices in groups.items():
+        window = [w for n in range(length - max_distance, length + max_distance + 1)
+                  for w in by_length.get(n, ())]
+        if not window:
+            continue
+        step = max(1, PAIR_BUDGET // len(window))
+        for start in range(0, len(indices), step):
+            chunk = indices[start:start + step]
+            distances = distance_matrix([tokens[i] for i in chunk], window)
+            for index, row in zip(chunk, distances):
+                best = int(row.min())
+                hits = np.flatnonzero(row == best)
+                if best <= max_distance and len(hits) == 1:
+                    results[index] = window[hits[0]].upper()
+    return results
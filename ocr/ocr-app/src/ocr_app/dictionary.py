@@ -0,0 +1,237 @@
+"""Compact, memory-mapped word dictionary for OCR correction.
+
+The word list is built offline into a DAWG (a trie whose identical suffix
+subtrees are merged) and stored as flat little-endian arrays:
+
+    header   magic, node count, edge count, word count
+    first    uint32[nodes + 1]  edges of node i are first[i]:first[i + 1]
+    targets  uint32[edges]      child node of each edge
+    labels   uint8[edges]       byte label of each edge, sorted per node
+    final    uint8[nodes]       1 if a word ends at the node
+
+Opening the file is an mmap plus a header read, so it takes microseconds and
+the pages are shared by every process that maps it. A lookup walks one edge
+per byte of the word: O(length), independent of the dictionary size.
+
+Build the artifact (downloads the NLTK corpus if needed; never done at request time):
+
+    python -m ocr_app.dictionary --source nltk --out models/english_words.dawg
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"OCRDAWG1"
+_HEADER = struct.Struct("<8sIII")
+_BYTE = [bytes((i,)) for i in range(256)]
+
+# Where load_english_dictionary() looks for the prebuilt artifact
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / "models" / "english_words.dawg"
+
+
+class _Node:
+    __slots__ = ("final", "edges")
+
+    def __init__(self):
+        self.final = False
+        self.edges = {}
+
+
+def _build_dawg(keys: list) -> _Node:
+    """Minimal DAWG of sorted, unique byte strings (Daciuk's incremental algorithm)."""
+    root = _Node()
+    register = {}
+    unchecked = []  # (parent, label, child) along the previous word's path
+    previous = b""
+
+    def minimize(down_to: int):
+        while len(unchecked) > down_to:
+            parent, label, child = unchecked.pop()
+            # children are already canonical, so their ids identify their subtrees
+            signature = (child.final, tuple((l, id(n)) for l, n in sorted(child.edges.items())))
+            existing = register.get(signature)
+            if existing is not None:
+                parent.edges[label] = existing
+            else:
+                register[signature] = child
+
+    for key in keys:
+        common = 0
+        for a, b in zip(key, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for label in key[common:]:
+            child = _Node()
+            node.edges[label] = child
+            unchecked.append((node, label, child))
+            node = child
+        node.final = True
+        previous = key
+    minimize(0)
+    return root
+
+
+def build(words) -> bytes:
+    """Serialize words (any case; stored uppercased) into the compact format."""
+    keys = sorted({w.strip().upper().encode("utf-8") for w in words if w and w.strip()})
+    root = _build_dawg(keys)
+
+    index = {id(root): 0}
+    order = [root]
+    for node in order:  # breadth-first; `order` grows while iterating
+        for _, child in sorted(node.edges.items()):
+            if id(child) not in index:
+                index[id(child)] = len(order)
+                order.append(child)
+
+    first, targets, labels, final = array("I", [0]), array("I"), bytearray(), bytearray()
+    for node in order:
+        for label, child in sorted(node.edges.items()):
+            labels.append(label)
+            targets.append(index[id(child)])
+        first.append(len(labels))
+        final.append(1 if node.final else 0)
+    if sys.byteorder != "little":
+        first.byteswap()
+        targets.byteswap()
+
+    header = _HEADER.pack(MAGIC, len(order), len(labels), len(keys))
+    return header + first.tobytes() + targets.tobytes() + bytes(labels) + bytes(final)
+
+
+class CompactDictionary:
+    """Read-only word set over the compact format, from a file (memory-mapped) or bytes.
+
+    Supports `in` (case-insensitive), len() and iteration (uppercased, sorted).
+    """
+
+    def __init__(self, buffer, path: str | None = None):
+        self.path = path
+        self._buf = buffer
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"Not a compact dictionary: {path or 'buffer'}")
+        magic, nodes, edges, words = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a compact dictionary: {path or 'buffer'}")
+        self.nodes, self.edges, self._words = nodes, edges, words
+
+        offset = _HEADER.size
+        view = memoryview(buffer)
+        self._first = self._uint32(view, offset, nodes + 1)
+        offset += 4 * (nodes + 1)
+        self._targets = self._uint32(view, offset, edges)
+        offset += 4 * edges
+        self._labels_at = offset
+        self._final_at = offset + edges
+        if self._final_at + nodes != len(buffer):
+            raise ValueError(f"Truncated compact dictionary: {path or 'buffer'}")
+
+    @staticmethod
+    def _uint32(view, offset: int, count: int):
+        data = view[offset:offset + 4 * count]
+        if sys.byteorder == "little":
+            return data.cast("I")
+        values = array("I", data)  # big-endian hosts pay for a private copy
+        values.byteswap()
+        return values
+
+    @classmethod
+    def open(cls, path) -> "CompactDictionary":
+        """Memory-map a dictionary file read-only."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, str(path))
+
+    @classmethod
+    def from_words(cls, words) -> "CompactDictionary":
+        """Build in memory (for small lists; large ones should be built offline)."""
+        return cls(build(words))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buf)
+
+    def __len__(self) -> int:
+        return self._words
+
+    def __contains__(self, word) -> bool:
+        if not isinstance(word, str):
+            return False
+        buf, first, targets, labels_at = self._buf, self._first, self._targets, self._labels_at
+        node = 0
+        for byte in word.upper().encode("utf-8"):
+            edge = buf.find(_BYTE[byte], labels_at + first[node], labels_at + first[node + 1])
+            if edge < 0:
+                return False
+            node = targets[edge - labels_at]
+        return buf[self._final_at + node] == 1
+
+    def children(self, node: int):
+        """(byte label, child node) pairs of a node, by label; node 0 is the root."""
+        lo, hi = self._first[node], self._first[node + 1]
+        return zip(self._buf[self._labels_at + lo:self._labels_at + hi], self._targets[lo:hi])
+
+    def is_final(self, node: int) -> bool:
+        return self._buf[self._final_at + node] == 1
+
+    def __iter__(self):
+        buf, first, targets, labels_at, final_at = (self._buf, self._first, self._targets,
+                                                     self._labels_at, self._final_at)
+        # depth-first in reverse label order, so words come out sorted
+        stack = [(0, b"")]
+        while stack:
+            node, prefix = stack.pop()
+            if buf[final_at + node] == 1:
+                yield prefix.decode("utf-8")
+            for edge in range(first[node + 1] - 1, first[node] - 1, -1):
+                stack.append((targets[edge], prefix + _BYTE[buf[labels_at + edge]]))
+
+
+def nltk_words(download: bool = False) -> list:
+    """The NLTK words corpus; only downloads it when asked to (offline builds)."""
+    import nltk
+    from nltk.corpus import words
+
+    try:
+        return words.words()
+    except LookupError:
+        if not download:
+            raise
+        nltk.download("words", quiet=True)
+        return words.words()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the compact OCR correction dictionary")
+    parser.add_argument("--source", default="nltk",
+                        help="'nltk', 'builtin' or a text file with one word per line")
+    parser.add_argument("--out", default=str(DEFAULT_PATH), help="Output file")
+    args = parser.parse_args(argv)
+
+    if args.source == "nltk":
+        words = nltk_words(download=True)
+    elif args.source == "builtin":
+        from .utils import _get_comprehensive_word_list
+        words = _get_comprehensive_word_list()
+    else:
+        words = Path(args.source).read_text(encoding="utf-8").split()
+
+    data = build(words)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, out)  # workers mapping the old file keep a valid view
+    d = CompactDictionary(data)
+    print(f"Wrote {len(d)} words to {out}: {d.nbytes / 1e6:.2f} MB, {d.nodes} nodes, {d.edges} edges")
+
+
+if __name__ == "__main__":
+    main()
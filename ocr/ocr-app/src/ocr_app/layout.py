@@ -0,0 +1,101 @@
+"""Structured OCR output: the words of one Tesseract pass with their boxes.
+
+`OcrLayout` keeps the words as parallel arrays (one entry per word), so
+downstream steps can drop low-confidence words or regroup them by line with
+array operations instead of re-running OCR:
+
+    words  list[str]
+    boxes  int32 (n, 4)  left, top, width, height in image pixels
+    conf   float32 (n,)  Tesseract word confidence, 0-100
+    line   int32 (n,)    line id, in reading order
+
+`to_dict()` serializes the same columns to JSON.
+"""
+import numpy as np
+
+
+class OcrLayout:
+    """Words, boxes, confidences and line ids from one Tesseract pass."""
+
+    __slots__ = ("words", "boxes", "conf", "line")
+
+    def __init__(self, words, boxes, conf, line):
+        self.words = list(words)
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32)
+        self.line = np.asarray(line, dtype=np.int32)
+
+    @classmethod
+    def from_tesseract(cls, data: dict) -> "OcrLayout":
+        """Build from pytesseract.image_to_data(..., output_type=Output.DICT)."""
+        words, boxes, conf, line = [], [], [], []
+        line_ids = {}
+        for i, text in enumerate(data.get("text", [])):
+            text = (text or "").strip()
+            confidence = float(data["conf"][i])
+            if not text or confidence < 0:
+                continue  # page/block/paragraph/line rows and empty words
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            words.append(text)
+            boxes.append((data["left"][i], data["top"][i], data["width"][i], data["height"][i]))
+            conf.append(confidence)
+            line.append(line_ids.setdefault(key, len(line_ids)))
+        return cls(words, boxes, conf, line)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OcrLayout":
+        return cls(data["words"], data["boxes"], data["conf"], data["line"])
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def select(self, mask) -> "OcrLayout":
+        """The words where mask is True."""
+        mask = np.asarray(mask, dtype=bool)
+        return OcrLayout([w for w, keep in zip(self.words, mask) if keep],
+                         self.boxes[mask], self.conf[mask], self.line[mask])
+
+    def filter(self, min_conf: float) -> "OcrLayout":
+        """The words Tesseract is at least min_conf (0-100) confident about."""
+        return self.select(self.conf >= min_conf)
+
+    @property
+    def mean_confidence(self) -> float:
+        return float(self.conf.mean()) if len(self.conf) else 0.0
+
+    def lines(self) -> list:
+        """One dict per line, in reading order: text, mean confidence and bounding box."""
+        result = []
+        for line_id in np.unique(self.line):
+            index = np.flatnonzero(self.line == line_id)
+            boxes = self.boxes[index]
+            left, top = boxes[:, 0].min(), boxes[:, 1].min()
+            right = (boxes[:, 0] + boxes[:, 2]).max()
+            bottom = (boxes[:, 1] + boxes[:, 3]).max()
+            result.append({
+                "line": int(line_id),
+                "text": " ".join(self.words[i] for i in index),
+                "conf": round(float(self.conf[index].mean()), 1),
+                "box": [int(left), int(top), int(right - left), int(bottom - top)],
+            })
+        return result
+
+    @property
+    def text(self) -> str:
+        """The words, one line of text per OCR line."""
+        return "\n".join(line["text"] for line in self.lines())
+
+    @property
+    def nbytes(self) -> int:
+        return (sum(len(w) for w in self.words) + self.boxes.nbytes + self.conf.nbytes
+                + self.line.nbytes)
+
+    def to_dict(self) -> dict:
+        """JSON-ready columns plus the per-line summary."""
+        return {
+            "words": self.words,
+            "boxes": self.boxes.tolist(),
+            "conf": [round(float(c), 1) for c in self.conf],
+            "line": self.line.tolist(),
+            "lines": self.lines(),
+        }
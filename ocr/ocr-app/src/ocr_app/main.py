@@ -8,18 +8,24 @@ Usage examples:
   # or run the file directly (the script will try to add the src dir to PYTHONPATH):
   python ocr/ocr-app/src/ocr_app/main.py path/to/image.jpg
 
+  # multi-page PDF or TIFF: pages OCR'd in parallel, one .txt per page
+  python -m ocr_app.main letter.pdf --out-dir out/ --workers 4
+
 The CLI accepts multiple image paths and optional tesseract path overrides.
 """
 
 import argparse
 import sys
 import pathlib
+from functools import lru_cache, partial
 from typing import List
 
 # Robust import: allow running as module (`-m ocr_app.main`) or as a script by fixing sys.path.
 try:
+    from ocr_app.config import PROFILES, get_profile, with_overrides
     from ocr_app.ocr import OCR
-    from ocr_app.preprocess import preprocess_image
+    from ocr_app.pages import PAGE_DPI, PAGE_WORKERS, is_document, map_pages, render_page
+    from ocr_app.preprocess import preprocess_image, straighten
     from ocr_app.utils import normalize_ocr
 except Exception:
     # find nearest parent named 'src' and add it to sys.path
@@ -34,50 +40,84 @@ except Exception:
         # fallback: use parent two levels up (ocr_app -> src)
         src_dir = here.parents[1]
     sys.path.insert(0, str(src_dir))
+    from ocr_app.config import PROFILES, get_profile, with_overrides
     from ocr_app.ocr import OCR
-    from ocr_app.preprocess import preprocess_image
+    from ocr_app.pages import PAGE_DPI, PAGE_WORKERS, is_document, map_pages, render_page
+    from ocr_app.preprocess import preprocess_image, straighten
     from ocr_app.utils import normalize_ocr
 
 
-def process_images(paths: List[str], tesseract_path: str | None, lang: str, oem: int, psm: int, out_dir: str | None):
-    ocr_engine = OCR(tesseract_cmd=tesseract_path, lang=lang, oem=oem, psm=psm)
+def ocr_image(ocr_engine: OCR, config, image) -> str:
+    """Multi-scale OCR with PSM and MSER fallbacks, then normalization, on one PIL image."""
+    # Run full OCR with multi-scale processing
+    raw_text = ocr_engine.full_ocr(image, scales=(1.0, 1.5, 2.0))
+
+    # Try PSM trials if initial result has low confidence or is short
+    if len(raw_text.strip()) < 10 or ocr_engine.last_confidence < 50:
+        psm_text, psm_conf = ocr_engine._ocr_with_psm_trials(image)
+        if psm_conf > 50 and len(psm_text) >= len(raw_text):
+            raw_text = psm_text
+
+    # Try MSER detection if result is still short
+    if len(raw_text.strip()) < 5:
+        boxes = ocr_engine._detect_text_regions_mser(image)
+        if boxes:
+            mser_text = ocr_engine._ocr_regions_and_merge(image, boxes)
+            if len(mser_text) > len(raw_text):
+                raw_text = mser_text
+
+    # Apply spell correction and normalization
+    return normalize_ocr(raw_text) if config.spell_correct else ' '.join(raw_text.split())
+
+
+@lru_cache(maxsize=4)
+def _page_engine(config) -> OCR:
+    return OCR.from_config(config)
+
+
+def ocr_page(config, path: str, index: int, dpi: int) -> str:
+    """Render, straighten and OCR one document page (runs in a worker process)."""
+    image, _ = straighten(render_page(path, index, dpi))
+    return ocr_image(_page_engine(config), config, image)
+
+
+def _write_text(out_dir: str | None, name: str, text: str):
+    if out_dir:
+        out_path = pathlib.Path(out_dir) / (name + ".txt")
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(text, encoding='utf-8')
+
+
+def process_images(paths: List[str], tesseract_path: str | None, lang: str | None, oem: int | None,
+                   psm: int | None, out_dir: str | None, profile: str | None = None,
+                   workers: int = PAGE_WORKERS, dpi: int = PAGE_DPI):
+    """OCR images and documents; document pages are keyed "<path>#<page>" (1-based)."""
+    config = with_overrides(get_profile(profile), tesseract_cmd=tesseract_path, lang=lang, oem=oem, psm=psm)
+    ocr_engine = OCR.from_config(config)
     results = {}
     for p in paths:
         try:
+            if is_document(p):
+                # pages arrive in order as they finish; each is printed and written right away
+                for index, text in map_pages(p, partial(ocr_page, config), workers=workers, dpi=dpi):
+                    results[f"{p}#{index + 1}"] = text
+                    print(f"--- {p} [page {index + 1}] ---")
+                    print(text or "(no text found)")
+                    _write_text(out_dir, f"{pathlib.Path(p).stem}_p{index + 1:03d}", text)
+                continue
+
             # Preprocess the image
             try:
                 preprocessed = preprocess_image(p)
             except Exception as e:
                 print(f"[OCR] Preprocessing failed, using direct load: {e}")
                 preprocessed = ocr_engine.load_image(p)
-            
-            # Run full OCR with multi-scale processing
-            raw_text = ocr_engine.full_ocr(preprocessed, scales=(1.0, 1.5, 2.0))
-            
-            # Try PSM trials if initial result has low confidence or is short
-            if len(raw_text.strip()) < 10 or ocr_engine.last_confidence < 50:
-                psm_text, psm_conf = ocr_engine._ocr_with_psm_trials(preprocessed)
-                if psm_conf > 50 and len(psm_text) >= len(raw_text):
-                    raw_text = psm_text
-            
-            # Try MSER detection if result is still short
-            if len(raw_text.strip()) < 5:
-                boxes = ocr_engine._detect_text_regions_mser(preprocessed)
-                if boxes:
-                    mser_text = ocr_engine._ocr_regions_and_merge(preprocessed, boxes)
-                    if len(mser_text) > len(raw_text):
-                        raw_text = mser_text
-            
-            # Apply spell correction and normalization
-            text = normalize_ocr(raw_text)
-            
+
+            text = ocr_image(ocr_engine, config, preprocessed)
             results[p] = text
             print(f"--- {p} ---")
             print(text or "(no text found)")
-            if out_dir:
-                out_path = pathlib.Path(out_dir) / (pathlib.Path(p).stem + ".txt")
-                out_path.parent.mkdir(parents=True, exist_ok=True)
-                out_path.write_text(text, encoding='utf-8')
+            _write_text(out_dir, pathlib.Path(p).stem, text)
         except Exception as e:
             print(f"Error processing {p}: {e}")
     return results
@@ -85,19 +125,26 @@ def process_images(paths: List[str], tesseract_path: str | None, lang: str, oem:
 
 def build_arg_parser():
     p = argparse.ArgumentParser(description='OCR CLI for Assistive-VQA (ocr_app)')
-    p.add_argument('images', nargs='+', help='One or more image files to run OCR on')
+    p.add_argument('images', nargs='+', help='One or more image files, PDFs or multi-page TIFFs to run OCR on')
     p.add_argument('--tesseract-path', dest='tesseract_path', help='Full path to tesseract executable')
-    p.add_argument('--lang', default='eng', help='Tesseract language code (default: eng)')
-    p.add_argument('--oem', type=int, default=3, help='Tesseract OEM flag (default: 3)')
-    p.add_argument('--psm', type=int, default=3, help='Tesseract PSM flag (default: 3)')
-    p.add_argument('--out-dir', dest='out_dir', help='Optional directory to write extracted .txt files')
+    p.add_argument('--profile', choices=sorted(PROFILES), default='default',
+                   help='OCR tuning profile (see ocr_app.config.PROFILES; default: default)')
+    p.add_argument('--lang', default=None, help="Tesseract language code (default: the profile's, eng)")
+    p.add_argument('--oem', type=int, default=None, help="Tesseract OEM flag (default: the profile's)")
+    p.add_argument('--psm', type=int, default=None, help="Tesseract PSM flag (default: the profile's)")
+    p.add_argument('--out-dir', dest='out_dir',
+                   help='Optional directory to write extracted .txt files (<name>_p001.txt per document page)')
+    p.add_argument('--workers', type=int, default=PAGE_WORKERS,
+                   help=f'Document pages OCR\'d in parallel (default: {PAGE_WORKERS})')
+    p.add_argument('--dpi', type=int, default=PAGE_DPI, help=f'PDF render resolution (default: {PAGE_DPI})')
     return p
 
 
 def main(argv: List[str] | None = None):
     parser = build_arg_parser()
     args = parser.parse_args(argv)
-    process_images(args.images, args.tesseract_path, args.lang, args.oem, args.psm, args.out_dir)
+    process_images(args.images, args.tesseract_path, args.lang, args.oem, args.psm, args.out_dir,
+                   profile=args.profile, workers=args.workers, dpi=args.dpi)
 
 
 if __name__ == '__main__':
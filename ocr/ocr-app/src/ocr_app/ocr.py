@@ -7,6 +7,15 @@ import os
 import shutil
 import platform
 
+from .config import Config, with_overrides
+from .layout import OcrLayout
+from .tiling import needs_tiling, tiled_layout
+
+try:
+    from monitoring.metrics import time_stage
+except ImportError:  # monitoring lives at the Assistive-VQA root; absent for standalone CLI use
+    from contextlib import nullcontext as time_stage
+
 
 _COMMON_WINDOWS_TESSERACT_PATHS = [
     r"C:\Program Files\Tesseract-OCR\tesseract.exe",
@@ -14,11 +23,14 @@ _COMMON_WINDOWS_TESSERACT_PATHS = [
 ]
 
 class OCR:
-    def __init__(self, tesseract_cmd: str = None, lang: str = "eng", oem: int = 3, psm: int = 3):
+    def __init__(self, tesseract_cmd: str = None, lang: str = "eng", oem: int = 3, psm: int = 3,
+                 profile: Config = None):
         """
         tesseract_cmd: full path to tesseract.exe on Windows (optional).
         lang: language code for Tesseract.
         oem, psm: Tesseract engine/mode config.
+        profile: ocr_app.config.Config supplying the other Tesseract options
+            (tessdata dir, character whitelist, DPI, dictionaries); see OCR.from_config().
         """
         # allow explicit override
         if tesseract_cmd:
@@ -48,7 +60,15 @@ class OCR:
             )
             raise RuntimeError(msg) from exc
         self.lang = lang
-        self.config = f"--oem {oem} --psm {psm}"
+        self.profile = with_overrides(profile or Config(), tesseract_cmd=tesseract_cmd,
+                                      lang=lang, oem=oem, psm=psm)
+        self.config = self.profile.tesseract_config()
+
+    @classmethod
+    def from_config(cls, config: Config, psm: int = None) -> "OCR":
+        """An engine for a profile (see ocr_app.config.PROFILES), optionally at another PSM."""
+        return cls(tesseract_cmd=config.tesseract_cmd, lang=config.lang, oem=config.oem,
+                   psm=config.psm if psm is None else psm, profile=config)
 
     def load_image(self, image_path: str) -> Image.Image:
         """Load an image from the specified path and return a PIL Image (RGB)."""
@@ -58,48 +78,78 @@ class OCR:
         print(f"[DEBUG] Loaded image type: {type(img)}, size: {img.size}, mode: {img.mode}")
         return img
 
-    def perform_ocr(self, image: Image.Image) -> str:
-        """Perform OCR on the given PIL Image and return extracted text."""
+    def binarize(self, image: Image.Image) -> Image.Image:
+        """Grayscale, denoise and adaptive-threshold an image for Tesseract."""
         # Ensure image is PIL Image
         if not isinstance(image, Image.Image):
             raise ValueError(f"Expected PIL Image, got {type(image)}")
         
-        # Convert to numpy array with explicit dtype for NumPy 2.x compatibility
-        arr = np.asarray(image, dtype=np.uint8)
-        
-        # Convert to grayscale
-        if len(arr.shape) == 3 and arr.shape[2] == 3:
-            # Ensure contiguous array for OpenCV
-            arr = np.ascontiguousarray(arr)
-            gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
-        elif len(arr.shape) == 2:
-            gray = arr
-        else:
-            # Fallback to PIL conversion
-            gray = np.array(image.convert('L'), dtype=np.uint8)
+        with time_stage('ocr_preprocess'):
+            # Convert to numpy array with explicit dtype for NumPy 2.x compatibility
+            arr = np.asarray(image, dtype=np.uint8)
+            
+            # Convert to grayscale
+            if len(arr.shape) == 3 and arr.shape[2] == 3:
+                # Ensure contiguous array for OpenCV
+                arr = np.ascontiguousarray(arr)
+                gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+            elif len(arr.shape) == 2:
+                gray = arr
+            else:
+                # Fallback to PIL conversion
+                gray = np.array(image.convert('L'), dtype=np.uint8)
 
-        # Ensure gray is contiguous
-        gray = np.ascontiguousarray(gray, dtype=np.uint8)
-        
-        # Denoise and enhance
-        denoised = cv2.fastNlMeansDenoising(gray, h=10)
-        # Adaptive threshold to improve contrast for OCR
-        th = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                   cv2.THRESH_BINARY, 11, 2)
+            # Ensure gray is contiguous
+            gray = np.ascontiguousarray(gray, dtype=np.uint8)
+            
+            # Denoise and enhance
+            denoised = cv2.fastNlMeansDenoising(gray, h=10)
+            # Adaptive threshold to improve contrast for OCR
+            th = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY, 11, 2)
 
-        pil_for_ocr = Image.fromarray(th)
+            return Image.fromarray(th)
 
-        text = pytesseract.image_to_string(pil_for_ocr, lang=self.lang, config=self.config)
+    def perform_ocr(self, image: Image.Image) -> str:
+        """Perform OCR on the given PIL Image and return extracted text."""
+        pil_for_ocr = self.binarize(image)
+        with time_stage('ocr_tesseract'):
+            text = pytesseract.image_to_string(pil_for_ocr, lang=self.lang, config=self.config)
         return text.strip()
 
+    def perform_ocr_layout(self, image: Image.Image, binarized: bool = False) -> OcrLayout:
+        """Perform OCR on the given PIL Image and return its words with boxes and confidences.
+
+        One image_to_data call; OcrLayout.text gives the same lines as perform_ocr().
+        Pass binarized=True with the output of binarize() to share it across passes.
+        """
+        pil_for_ocr = image if binarized else self.binarize(image)
+        with time_stage('ocr_tesseract'):
+            data = pytesseract.image_to_data(pil_for_ocr, lang=self.lang, config=self.config,
+                                             output_type=pytesseract.Output.DICT)
+        return OcrLayout.from_tesseract(data)
+
     def extract_text(self, image_path: str) -> str:
         """Load an image and extract text from it."""
         image = self.load_image(image_path)
         return self.perform_ocr(image)
+
+    def extract_layout(self, image_path: str) -> OcrLayout:
+        """Load an image and extract its words with boxes and confidences."""
+        image = self.load_image(image_path)
+        return self.perform_ocr_layout(image)
     
+    def tiled_ocr(self, image: Image.Image, scale: float = 1.0) -> OcrLayout:
+        """OCR a large image in overlapping tiles (see ocr_app.tiling); boxes in image pixels."""
+        with time_stage('ocr_tiled'):
+            return tiled_layout(image, self.perform_ocr_layout, scale=scale)
+
     def full_ocr(self, image: Image.Image, scales: tuple = (1.0, 1.5, 2.0)) -> str:
         """Perform multi-scale OCR with confidence tracking.
         
+        Scales at which the image would exceed OCR_TILE_MIN_PIXELS are OCR'd
+        tile by tile (tiled_ocr) instead of upscaling the whole image.
+
         Args:
             image: PIL Image to process
             scales: tuple of scaling factors to try
@@ -112,6 +162,13 @@ class OCR:
         best_conf = 0
         
         for scale in scales:
+            if needs_tiling(image.size, scale):
+                layout = self.tiled_ocr(image, scale)
+                text, avg_conf = layout.text, layout.mean_confidence
+                if avg_conf > best_conf and len(text) > len(best_text) * 0.5:
+                    best_conf = avg_conf
+                    best_text = text
+                continue
             if scale != 1.0:
                 w, h = image.size
                 scaled = image.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
@@ -119,24 +176,26 @@ class OCR:
                 scaled = image
             
             # Get text with confidence
-            arr = np.array(scaled)
-            gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
-            denoised = cv2.fastNlMeansDenoising(gray, h=10)
-            th = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                      cv2.THRESH_BINARY, 11, 2)
+            with time_stage('ocr_preprocess'):
+                arr = np.array(scaled)
+                gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+                denoised = cv2.fastNlMeansDenoising(gray, h=10)
+                th = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                          cv2.THRESH_BINARY, 11, 2)
             
-            # Get detailed data with confidence
-            data = pytesseract.image_to_data(Image.fromarray(th), lang=self.lang, 
-                                            config=self.config, output_type=pytesseract.Output.DICT)
-            
-            # Calculate average confidence for valid text
-            confidences = [int(conf) for conf, text in zip(data['conf'], data['text']) 
-                          if conf != '-1' and text.strip()]
-            avg_conf = sum(confidences) / len(confidences) if confidences else 0
-            
-            # Get text
-            text = pytesseract.image_to_string(Image.fromarray(th), lang=self.lang, config=self.config)
-            text = text.strip()
+            with time_stage('ocr_tesseract'):
+                # Get detailed data with confidence
+                data = pytesseract.image_to_data(Image.fromarray(th), lang=self.lang, 
+                                                config=self.config, output_type=pytesseract.Output.DICT)
+                
+                # Calculate average confidence for valid text
+                confidences = [int(conf) for conf, text in zip(data['conf'], data['text']) 
+                              if conf != '-1' and text.strip()]
+                avg_conf = sum(confidences) / len(confidences) if confidences else 0
+                
+                # Get text
+                text = pytesseract.image_to_string(Image.fromarray(th), lang=self.lang, config=self.config)
+                text = text.strip()
             
             if avg_conf > best_conf and len(text) > len(best_text) * 0.5:
                 best_conf = avg_conf
@@ -166,7 +225,7 @@ class OCR:
         pil_img = Image.fromarray(th)
         
         for psm in psm_modes:
-            config = f"--oem 3 --psm {psm}"
+            config = self.profile.tesseract_config(psm)
             try:
                 data = pytesseract.image_to_data(pil_img, lang=self.lang, 
                                                 config=config, output_type=pytesseract.Output.DICT)
@@ -0,0 +1,134 @@
+"""Multi-page documents: PDF and multi-frame TIFF, one page at a time.
+
+A document is never rendered whole. iter_pages() yields one page image at a
+time, and map_pages() sends only (path, page index) to a process pool, where
+each worker renders and OCRs its own page. At most `workers` pages are
+rendered at once, and results come back in page order as soon as they are
+ready, so callers can stream them (the CLI writes one file per page, the API
+sends one JSON line per page).
+
+PDF pages are rendered locally with pypdfium2 (optional dependency, only
+needed for PDFs) at PAGE_DPI. TIFF frames are read with Pillow.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from PIL import Image
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Resolution PDF pages are rendered at
+PAGE_DPI = int(os.environ.get("OCR_PDF_DPI", "300"))
+# Pages OCR'd in parallel (worker processes)
+PAGE_WORKERS = int(os.environ.get("OCR_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_PDF_MAGIC = b"%PDF-"
+
+
+def _is_pdf(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(_PDF_MAGIC)) == _PDF_MAGIC
+
+
+def _pdf(path: str):
+    if pdfium is None:
+        raise ImportError("pypdfium2 is required for PDF input: pip install pypdfium2")
+    return pdfium.PdfDocument(path)
+
+
+def page_count(path: str) -> int:
+    """Pages of a PDF, frames of a TIFF (1 for other images)."""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Document not found: {path}")
+    if _is_pdf(path):
+        pdf = _pdf(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with Image.open(path) as im:
+        return getattr(im, "n_frames", 1)
+
+
+def is_document(path: str) -> bool:
+    """Whether path is a PDF or a TIFF with more than one frame."""
+    try:
+        if _is_pdf(path):
+            return True
+        with Image.open(path) as im:
+            return im.format == "TIFF" and getattr(im, "n_frames", 1) > 1
+    except (OSError, ValueError):
+        return False
+
+
+def render_page(path: str, index: int, dpi: int = PAGE_DPI) -> Image.Image:
+    """One page as an RGB PIL Image (PDF pages rendered at dpi)."""
+    if _is_pdf(path):
+        pdf = _pdf(path)
+        try:
+            page = pdf[index]
+            try:
+                return page.render(scale=dpi / 72.0).to_pil().convert("RGB")
+            finally:
+                page.close()
+        finally:
+            pdf.close()
+    with Image.open(path) as im:
+        im.seek(index)  # raises EOFError past the last frame
+        return im.convert("RGB")
+
+
+def iter_pages(path: str, dpi: int = PAGE_DPI):
+    """Yield (page index, RGB image) one page at a time."""
+    for index in range(page_count(path)):
+        yield index, render_page(path, index, dpi)
+
+
+def page_executor(workers: int = PAGE_WORKERS) -> ProcessPoolExecutor:
+    """A process pool for map_pages(); spawned, so it is safe from threaded servers."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def map_pages(path: str, fn, workers: int = PAGE_WORKERS, dpi: int = PAGE_DPI, executor=None):
+    """
+    Run fn(path, index, dpi) for every page and yield (index, result) in page order.
+
+    Args:
+        path: PDF, TIFF or image file
+        fn: Picklable (module-level) function that renders and processes one page,
+            e.g. with render_page()
+        workers: Pages processed at once; 1 runs in this process
+        dpi: Resolution passed to fn
+        executor: Process pool to reuse (see page_executor()); a new one is
+            created and shut down otherwise
+
+    Only `workers` pages are submitted ahead of the one being yielded, so a
+    slow consumer never piles up results.
+    """
+    count = page_count(path)
+    if workers <= 1 or count == 1:
+        for index in range(count):
+            yield index, fn(path, index, dpi)
+        return
+
+    pool = executor or page_executor(workers)
+    pending = deque()
+    try:
+        for index in range(count):
+            pending.append((index, pool.submit(fn, path, index, dpi)))
+            if len(pending) > workers:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -1,21 +1,51 @@
 """Simple preprocessing helpers for OCR.
 
 Keep these lightweight so they can be used by the CLI or tests.
+
+correct_orientation() straightens rotated and skewed photos once, before any
+Tesseract pass, so the first pass can succeed instead of relying on extra
+scales, PSMs and region fallbacks. On a copy downscaled to ESTIMATE_SIDE:
+
+- skew: text lines are merged into blobs and the median angle of their
+  minimum-area rectangles is taken (small angles only, |skew| <= MAX_SKEW);
+- orientation: one Tesseract OSD pass reports 0/90/180/270 degrees
+  (OCR_ORIENTATION=off skips it; it also needs osd.traineddata).
+
+Estimates are cached per image content hash, so later questions about the
+same image (or later passes) reuse them.
 """
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
 from PIL import Image
 import cv2
 import numpy as np
-import os
 
+# Longest side of the copy the estimates run on
+ESTIMATE_SIDE = 1000
+# Skew angles (degrees) below MIN_SKEW are left alone; above MAX_SKEW they are not skew
+MIN_SKEW = 0.5
+MAX_SKEW = 20.0
+# "osd" runs one Tesseract orientation pass per new image; "off" only corrects skew
+ORIENTATION_MODE = os.environ.get("OCR_ORIENTATION", "osd").lower()
+# OSD results below this orientation confidence are ignored
+MIN_OSD_CONFIDENCE = 2.0
+# Images whose estimates are remembered
+ORIENTATION_CACHE_SIZE = int(os.environ.get("OCR_ORIENTATION_CACHE_SIZE", "256"))
 
-def preprocess_image(image_path: str, target_width: int = 800) -> Image.Image:
+
+def preprocess_image(image_path: str, target_width: int = 800, upright: bool = True) -> Image.Image:
     """Load and apply gentle preprocessing, returning a PIL Image suitable for pytesseract.
 
     This uses a lighter touch than before - only CLAHE for contrast enhancement,
     no aggressive thresholding or morphological operations.
     
     Steps:
-    - load -> convert to RGB
+    - load -> convert to RGB (rotated upright and deskewed, see correct_orientation())
     - resize (keep aspect ratio if image is smaller than target)
     - convert to grayscale
     - apply gentle CLAHE (contrast limited adaptive histogram equalization)
@@ -23,13 +53,17 @@ def preprocess_image(image_path: str, target_width: int = 800) -> Image.Image:
     Args:
         image_path: path to input image
         target_width: target width for resizing (default 800)
+        upright: correct orientation and skew while loading
     
     Returns:
         PIL Image ready for OCR
     """
     if not os.path.isfile(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
-    img = Image.open(image_path).convert("RGB")
+    if upright:
+        img, _ = correct_orientation(image_path)
+    else:
+        img = Image.open(image_path).convert("RGB")
     arr = np.array(img)
 
     # Only resize if image is significantly smaller than target
@@ -43,4 +77,161 @@ def preprocess_image(image_path: str, target_width: int = 800) -> Image.Image:
         return Image.fromarray(arr)
     
     # Return original image if it's already large enough
-    return img
\ No newline at end of file
+    return img
+
+
+@dataclass(frozen=True)
+class Orientation:
+    rotate: int = 0  # clockwise degrees (0, 90, 180, 270) that make the text upright
+    skew: float = 0.0  # counter-clockwise tilt of the text lines in degrees, undone after rotate
+    source: str = "none"  # what found the rotation: "osd" or "none"
+
+    @property
+    def is_identity(self) -> bool:
+        return self.rotate == 0 and self.skew == 0.0
+
+    def to_dict(self) -> dict:
+        return {"rotate": self.rotate, "skew": round(self.skew, 2), "source": self.source}
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_osd_unavailable = False
+
+
+def image_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _downscaled_gray(arr: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY) if arr.ndim == 3 else arr
+    h, w = gray.shape[:2]
+    scale = ESTIMATE_SIDE / float(max(h, w))
+    if scale < 1.0:
+        gray = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))),
+                          interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(gray)
+
+
+def estimate_skew(gray: np.ndarray) -> float:
+    """Counter-clockwise tilt of the text lines in degrees (0.0 if small or unsure)."""
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(ink) > ink.size // 2:
+        ink = cv2.bitwise_not(ink)  # light text on a dark background
+    # merge the characters of a line into one elongated blob
+    kernel_w = max(9, gray.shape[1] // 50)
+    lines = cv2.morphologyEx(ink, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, 3)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    angles, weights = [], []
+    for contour in contours:
+        (_, _), (w, h), angle = cv2.minAreaRect(contour)
+        if w < h:
+            w, h, angle = h, w, angle - 90
+        if w < 3 * h or w < gray.shape[1] * 0.05:
+            continue  # not line-shaped
+        # minAreaRect angles are clockwise (y points down); fold into [-45, 45)
+        angle = (angle + 45) % 90 - 45
+        angles.append(-angle)
+        weights.append(w)
+    if not angles:
+        return 0.0
+    order = np.argsort(angles)
+    cumulative = np.cumsum(np.asarray(weights)[order])
+    skew = float(np.asarray(angles)[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+    return skew if MIN_SKEW <= abs(skew) <= MAX_SKEW else 0.0
+
+
+def detect_rotation(gray: np.ndarray) -> int:
+    """Clockwise rotation (0/90/180/270) from one Tesseract OSD pass; 0 if unavailable."""
+    global _osd_unavailable
+    if ORIENTATION_MODE != "osd" or _osd_unavailable:
+        return 0
+    import pytesseract
+
+    try:
+        osd = pytesseract.image_to_osd(Image.fromarray(gray), output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractNotFoundError:
+        _osd_unavailable = True
+        return 0
+    except Exception as e:
+        # too little text for OSD, or osd.traineddata missing
+        if "osd.traineddata" in str(e):
+            _osd_unavailable = True
+        return 0
+    if float(osd.get("orientation_conf", 0)) < MIN_OSD_CONFIDENCE:
+        return 0
+    return int(osd.get("rotate", 0)) % 360
+
+
+def estimate_orientation(arr: np.ndarray) -> Orientation:
+    """Rotation and skew of an RGB or grayscale array (uncached)."""
+    gray = _downscaled_gray(arr)
+    rotate = detect_rotation(gray)
+    if rotate:
+        gray = np.ascontiguousarray(np.rot90(gray, k=-rotate // 90))
+    return Orientation(rotate=rotate, skew=estimate_skew(gray), source="osd" if rotate else "none")
+
+
+def apply_orientation(arr: np.ndarray, orientation: Orientation) -> np.ndarray:
+    """Rotate an array upright and level it; returns arr itself when nothing changes."""
+    if orientation.rotate:
+        arr = np.ascontiguousarray(np.rot90(arr, k=-orientation.rotate // 90))
+    if orientation.skew:
+        h, w = arr.shape[:2]
+        # rotate by the opposite angle, growing the canvas so no corner is cut off
+        matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), -orientation.skew, 1.0)
+        cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+        new_w, new_h = int(h * sin + w * cos), int(h * cos + w * sin)
+        matrix[0, 2] += new_w / 2.0 - w / 2.0
+        matrix[1, 2] += new_h / 2.0 - h / 2.0
+        arr = cv2.warpAffine(arr, matrix, (new_w, new_h), flags=cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_REPLICATE)
+    return arr
+
+
+def cached_orientation(digest: str, arr: np.ndarray) -> Orientation:
+    """estimate_orientation(), remembered per image digest."""
+    with _cache_lock:
+        if digest in _cache:
+            _cache.move_to_end(digest)
+            return _cache[digest]
+    orientation = estimate_orientation(arr)
+    with _cache_lock:
+        _cache[digest] = orientation
+        while len(_cache) > ORIENTATION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return orientation
+
+
+def clear_orientation_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def straighten(image: Image.Image) -> tuple:
+    """Rotate and deskew an in-memory image (uncached; e.g. a rendered PDF page).
+
+    Returns:
+        (PIL RGB image, Orientation applied)
+    """
+    arr = np.asarray(image.convert("RGB"))
+    orientation = estimate_orientation(arr)
+    if orientation.is_identity:
+        return image.convert("RGB"), orientation
+    return Image.fromarray(apply_orientation(arr, orientation)), orientation
+
+
+def correct_orientation(image_path: str) -> tuple:
+    """Load an image upright and deskewed.
+
+    Returns:
+        (PIL RGB image, Orientation applied)
+    """
+    if not os.path.isfile(image_path):
+        raise FileNotFoundError(f"Image not found: {image_path}")
+    with open(image_path, "rb") as f:
+        data = f.read()
+    arr = np.array(Image.open(io.BytesIO(data)).convert("RGB"))
+    orientation = cached_orientation(image_digest(data), arr)
+    return Image.fromarray(apply_orientation(arr, orientation)), orientation
@@ -0,0 +1,168 @@
+"""Fast text-presence detection.
+
+Decides in a few milliseconds whether an image is likely to contain text, so
+callers can skip the multi-pass Tesseract pipeline on photos without any.
+
+The image is downscaled and Otsu-binarised in both polarities (dark-on-light
+and light-on-dark text). Connected components with character-like geometry
+(height, aspect ratio, fill ratio) are kept and chained with horizontally
+aligned neighbours of similar height; a chain of three or more is a text line.
+The score is the number of components in text lines for the better polarity.
+Texture such as foliage, water or clouds produces many components but
+scarcely any aligned runs.
+
+Downscaling a page shrinks its print: body text on a 300 dpi scan is a few
+pixels tall at DEFAULT_MAX_SIDE, below MIN_GLYPH_HEIGHT. When the first pass
+finds no text lines but the components that are too short mostly form lines,
+the glyph height is estimated from them and the image is examined once more at
+the resolution that brings it to TARGET_GLYPH_HEIGHT.
+"""
+import time
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Longest side the detector works at; larger images are downscaled on decode
+DEFAULT_MAX_SIDE = 640
+# Character-like components in text lines needed to report text
+DEFAULT_MIN_ALIGNED = 4
+# Components past this many are texture, not text; bounds the O(n^2) alignment pass
+MAX_COMPONENTS = 1500
+# Shortest component (pixels) counted as a character; shorter ones are mostly noise
+MIN_GLYPH_HEIGHT = 8
+# Shortest component considered when estimating the glyph height of small print
+MIN_SMALL_GLYPH_HEIGHT = 3
+# Share of the too-short components that must form text lines to re-examine the
+# image; noise and fine texture leave most of theirs unaligned
+MIN_SMALL_ALIGNED_SHARE = 0.3
+# Glyph height small print is brought to when the image is examined again
+TARGET_GLYPH_HEIGHT = 14
+# Longest side the second, small-print pass may work at
+MAX_SIDE_LIMIT = 3072
+
+
+@dataclass
+class TextPresence:
+    has_text: bool
+    score: int
+    candidates: int
+    elapsed_ms: float
+
+
+def _load_gray(image, max_side: int) -> tuple:
+    """(grayscale uint8 array no larger than max_side, longest side of the source)
+    from a path, PIL image or array."""
+    if isinstance(image, np.ndarray):
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        source_side = max(gray.shape)
+    else:
+        if not isinstance(image, Image.Image):
+            image = Image.open(image)
+            source_side = max(image.size)
+            # let the JPEG decoder do most of the downscaling
+            image.draft('L', (max_side, max_side))
+        else:
+            source_side = max(image.size)
+        gray = np.asarray(image.convert('L'), dtype=np.uint8)
+    h, w = gray.shape
+    scale = max_side / float(max(h, w))
+    if scale < 1:
+        gray = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))),
+                          interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(gray), source_side
+
+
+def _character_boxes(binary: np.ndarray, min_height: int = MIN_GLYPH_HEIGHT) -> np.ndarray:
+    """Bounding boxes (x, y, w, h) of foreground components shaped like characters."""
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    x, y, w, h, area = stats[1:].T
+    fill = area / np.maximum(w * h, 1)
+    keep = ((h >= min_height) & (h <= 0.5 * binary.shape[0])
+            & (w >= 2) & (w >= 0.08 * h) & (w <= 2.0 * h)
+            & (fill >= 0.15) & (fill <= 0.95))
+    return stats[1:, :4][keep]
+
+
+def _aligned_count(boxes: np.ndarray, min_line: int = 3) -> int:
+    """Number of boxes in text lines: chains of at least `min_line` same-line
+    neighbours of similar height."""
+    n = len(boxes)
+    if n < min_line:
+        return 0
+    b = boxes.astype(np.float32)
+    left, h = b[:, 0], b[:, 3]
+    right = left + b[:, 2]
+    cy = b[:, 1] + h / 2
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(n):
+        height_ratio = np.minimum(h, h[i]) / np.maximum(h, h[i])
+        gap = np.maximum(left - right[i], left[i] - right)
+        neighbours = ((height_ratio >= 0.6) & (np.abs(cy - cy[i]) <= 0.35 * h[i])
+                      & (gap <= 1.2 * h[i]) & (gap >= -0.2 * h[i]))
+        for j in np.flatnonzero(neighbours[i + 1:]) + i + 1:
+            parent[find(j)] = find(i)
+    sizes = {}
+    for i in range(n):
+        root = find(i)
+        sizes[root] = sizes.get(root, 0) + 1
+    return sum(size for size in sizes.values() if size >= min_line)
+
+
+def _score(gray: np.ndarray) -> tuple:
+    """(score, candidates, height of glyphs too short to count or 0) for the better polarity."""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    score = 0
+    candidates = 0
+    small_score, small_height = 0, 0
+    for polarity in (binary, cv2.bitwise_not(binary)):
+        boxes = _character_boxes(polarity, MIN_SMALL_GLYPH_HEIGHT)
+        tall = boxes[:, 3] >= MIN_GLYPH_HEIGHT
+        candidates += int(tall.sum())
+        if tall.sum() <= MAX_COMPONENTS:
+            score = max(score, _aligned_count(boxes[tall]))
+        small = boxes[~tall]
+        if len(small) <= MAX_COMPONENTS:
+            aligned = _aligned_count(small)
+            if aligned > small_score and aligned >= MIN_SMALL_ALIGNED_SHARE * len(small):
+                small_score, small_height = aligned, float(np.median(small[:, 3]))
+    return score, candidates, (small_height if small_score > score else 0)
+
+
+def detect_text(image, min_aligned: int = DEFAULT_MIN_ALIGNED,
+                max_side: int = DEFAULT_MAX_SIDE) -> TextPresence:
+    """Estimate whether `image` (path, PIL image or numpy array) contains text.
+
+    Args:
+        image: image path, PIL Image or RGB/grayscale numpy array
+        min_aligned: score threshold; lower favours recall, higher precision
+        max_side: working resolution; small print is re-examined at up to
+            MAX_SIDE_LIMIT
+
+    Returns:
+        TextPresence with the decision, score and timing
+    """
+    start = time.perf_counter()
+    gray, source_side = _load_gray(image, max_side)
+    score, candidates, glyph_height = _score(gray)
+    if score < min_aligned and glyph_height:
+        side = min(source_side, MAX_SIDE_LIMIT,
+                   int(max(gray.shape) * TARGET_GLYPH_HEIGHT / glyph_height))
+        if side > max(gray.shape):
+            gray, _ = _load_gray(image, side)
+            score, candidates, _ = _score(gray)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return TextPresence(score >= min_aligned, score, candidates, elapsed_ms)
+
+
+def has_text(image, min_aligned: int = DEFAULT_MIN_ALIGNED) -> bool:
+    """Shorthand for detect_text(image, min_aligned).has_text."""
+    return detect_text(image, min_aligned).has_text
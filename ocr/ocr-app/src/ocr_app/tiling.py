@@ -0,0 +1,162 @@
+"""Tiled OCR for large images with bounded memory.
+
+Upscaling and denoising a whole scan at once (OCR.full_ocr at 2.0x turns a
+4000x3000 photo into a 48 MP buffer for fastNlMeansDenoising) costs seconds
+and hundreds of megabytes. Instead the image is cut into overlapping tiles
+of TILE_SIZE OCR pixels; each tile is cropped, scaled, binarized and OCR'd
+on its own, at most TILE_WORKERS at a time, so peak memory follows the tile
+size rather than the image size.
+
+Every tile owns the middle of its overlaps (its "core"). A word is kept only
+from the tile whose core contains the word's center, so words in an overlap
+are reported once, from the tile that saw them whole (as long as words are
+shorter than TILE_OVERLAP). Words are then regrouped into lines across tile
+boundaries and returned as one OcrLayout in the source image's coordinates.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from PIL import Image
+import numpy as np
+
+from .layout import OcrLayout
+
+# Tile side in OCR pixels (after scaling)
+TILE_SIZE = int(os.environ.get("OCR_TILE_SIZE", "1600"))
+# Overlap between neighbouring tiles in OCR pixels; should exceed the widest word
+TILE_OVERLAP = int(os.environ.get("OCR_TILE_OVERLAP", "200"))
+# Tiles preprocessed and OCR'd at the same time
+TILE_WORKERS = int(os.environ.get("OCR_TILE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Images above this many OCR pixels (after scaling) are tiled; 0 never tiles
+TILE_MIN_PIXELS = int(os.environ.get("OCR_TILE_MIN_PIXELS", "4000000"))
+
+
+@dataclass(frozen=True)
+class Tile:
+    box: tuple  # (left, top, right, bottom) in source pixels
+    core: tuple  # (left, top, right, bottom) of the words this tile reports
+    row: int
+    col: int
+
+
+def needs_tiling(size: tuple, scale: float = 1.0) -> bool:
+    """Whether an image of size (width, height) OCR'd at scale should be tiled."""
+    width, height = size
+    return TILE_MIN_PIXELS > 0 and width * height * scale * scale > TILE_MIN_PIXELS
+
+
+def _spans(length: int, tile: int, overlap: int) -> list:
+    """(start, end, core start, core end) along one axis."""
+    if length <= tile:
+        return [(0, length, 0, length)]
+    step = max(1, tile - overlap)
+    starts = list(range(0, length - tile, step)) + [length - tile]
+    # each cut is the middle of the overlap between two neighbours
+    cuts = [0] + [(nxt + start + tile) // 2 for start, nxt in zip(starts, starts[1:])] + [length]
+    return [(start, start + tile, cuts[i], cuts[i + 1]) for i, start in enumerate(starts)]
+
+
+def tile_grid(width: int, height: int, tile: int = TILE_SIZE, overlap: int = TILE_OVERLAP) -> list:
+    """Overlapping tiles covering a width x height image, row by row; cores partition it."""
+    if overlap >= tile:
+        raise ValueError(f"Tile overlap ({overlap}) must be smaller than the tile ({tile})")
+    tiles = []
+    for row, (top, bottom, core_top, core_bottom) in enumerate(_spans(height, tile, overlap)):
+        for col, (left, right, core_left, core_right) in enumerate(_spans(width, tile, overlap)):
+            tiles.append(Tile((left, top, right, bottom),
+                              (core_left, core_top, core_right, core_bottom), row, col))
+    return tiles
+
+
+def _ocr_tile(image: Image.Image, tile: Tile, recognize, scale: float) -> OcrLayout:
+    """OCR one tile; boxes come back in source pixels, only words centered in the core."""
+    left, top, right, bottom = tile.box
+    crop = image.crop(tile.box)
+    if scale != 1.0:
+        crop = crop.resize((max(1, round((right - left) * scale)), max(1, round((bottom - top) * scale))),
+                           Image.Resampling.LANCZOS)
+    layout = recognize(crop)
+    del crop
+    if not len(layout):
+        return layout
+    boxes = layout.boxes / scale
+    boxes[:, 0] += left
+    boxes[:, 1] += top
+    center_x = boxes[:, 0] + boxes[:, 2] / 2
+    center_y = boxes[:, 1] + boxes[:, 3] / 2
+    core_left, core_top, core_right, core_bottom = tile.core
+    owned = ((center_x >= core_left) & (center_x < core_right)
+             & (center_y >= core_top) & (center_y < core_bottom))
+    return OcrLayout(layout.words, np.rint(boxes), layout.conf, layout.line).select(owned)
+
+
+def merge_tiles(layouts: list) -> OcrLayout:
+    """Join per-tile layouts (from _ocr_tile, tile order) into one layout with shared lines.
+
+    A tile's lines are joined with lines of other tiles that share most of their
+    height; lines are ordered top to bottom and words left to right.
+    """
+    groups = []  # (tile index, indices into the merged arrays)
+    words, boxes, conf = [], [], []
+    for t, layout in enumerate(layouts):
+        for line_id in np.unique(layout.line):
+            index = np.flatnonzero(layout.line == line_id)
+            groups.append((t, np.arange(len(words), len(words) + len(index))))
+            words.extend(layout.words[i] for i in index)
+            boxes.append(layout.boxes[index])
+            conf.append(layout.conf[index])
+    if not words:
+        return OcrLayout([], np.zeros((0, 4)), [], [])
+    boxes = np.concatenate(boxes)
+    conf = np.concatenate(conf)
+
+    def span(index):
+        return boxes[index, 1].min(), (boxes[index, 1] + boxes[index, 3]).max()
+
+    rows = []  # [top, bottom, set of tiles, list of word indices]
+    for t, index in sorted(groups, key=lambda g: sum(span(g[1])) / 2):
+        top, bottom = span(index)
+        for row in rows:
+            shared = min(bottom, row[1]) - max(top, row[0])
+            if t not in row[2] and shared > 0.5 * min(bottom - top, row[1] - row[0]):
+                row[0], row[1] = min(top, row[0]), max(bottom, row[1])
+                row[2].add(t)
+                row[3].extend(index)
+                break
+        else:
+            rows.append([top, bottom, {t}, list(index)])
+
+    order, line = [], []
+    for line_id, row in enumerate(sorted(rows, key=lambda r: r[0])):
+        index = sorted(row[3], key=lambda i: boxes[i, 0])
+        order.extend(index)
+        line.extend([line_id] * len(index))
+    return OcrLayout([words[i] for i in order], boxes[order], conf[order], line)
+
+
+def tiled_layout(image: Image.Image, recognize, scale: float = 1.0, tile_size: int = TILE_SIZE,
+                 overlap: int = TILE_OVERLAP, workers: int = TILE_WORKERS) -> OcrLayout:
+    """
+    OCR a large image tile by tile.
+
+    Args:
+        image: PIL Image to OCR
+        recognize: Function OCR'ing one PIL tile into an OcrLayout
+            (e.g. OCR.perform_ocr_layout, which also binarizes it)
+        scale: Scale applied to each tile before recognize (like full_ocr's scales)
+        tile_size, overlap: Tile side and overlap in scaled pixels
+        workers: Tiles processed at once; peak memory grows with this
+
+    Returns:
+        OcrLayout of the whole image, boxes in the source image's pixels
+    """
+    image.load()  # decode once; the workers only crop
+    width, height = image.size
+    tiles = tile_grid(width, height, max(1, round(tile_size / scale)), round(overlap / scale))
+    if workers <= 1 or len(tiles) == 1:
+        layouts = [_ocr_tile(image, tile, recognize, scale) for tile in tiles]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            layouts = list(pool.map(lambda tile: _ocr_tile(image, tile, recognize, scale), tiles))
+    return merge_tiles(layouts)
@@ -1,68 +1,129 @@
 """Utility helpers for OCR post-processing and small corrections."""
+from functools import lru_cache
 from typing import Iterable
 import os
+import re
+
+from .correction import Corrector
+from .dictionary import DEFAULT_PATH, CompactDictionary, nltk_words
 
 try:
     from symspellpy import Verbosity
 except ImportError:
     Verbosity = None
 
+try:
+    from monitoring.metrics import record_cache, time_stage
+except ImportError:  # monitoring lives at the Assistive-VQA root; absent for standalone CLI use
+    from contextlib import nullcontext as time_stage
+
+    def record_cache(cache: str, hit: bool):
+        pass
+
+try:
+    from monitoring.governor import register_resident, touch_resident
+except ImportError:
+    def register_resident(*args, **kwargs):
+        pass
+
+    def touch_resident(name: str):
+        pass
+
+
+# Prebuilt compact dictionary (see ocr_app.dictionary); memory-mapped on first use
+DICTIONARY_PATH = os.environ.get('OCR_DICTIONARY_PATH', str(DEFAULT_PATH))
 
 # Cache for English dictionary
 _ENGLISH_DICT = None
+# Whether it is a full word list (artifact or NLTK) rather than the built-in fallback;
+# edit-distance corrections are only made against a full list
+_ENGLISH_DICT_FULL = False
+
+
+def release_english_dictionary():
+    """Drop the cached dictionary; the next lookup reopens it."""
+    global _ENGLISH_DICT, _ENGLISH_DICT_FULL
+    _ENGLISH_DICT = None
+    _ENGLISH_DICT_FULL = False
+    _correct_token.cache_clear()
 
 
-def load_english_dictionary() -> set:
-    """Load a comprehensive English dictionary for OCR correction.
+def _english_dictionary_bytes() -> int:
+    words = _ENGLISH_DICT
+    return words.nbytes if words is not None else 0
+
+
+register_resident('english_dictionary', 'dictionary', release=release_english_dictionary,
+                  is_loaded=lambda: _ENGLISH_DICT is not None, size=_english_dictionary_bytes)
+
+
+def load_english_dictionary() -> CompactDictionary:
+    """Load the English dictionary for OCR correction.
     
-    Uses PyEnchant (if available) which provides comprehensive spell-checking
-    dictionaries. Falls back to NLTK, then to a built-in common words list.
+    Memory-maps the prebuilt compact dictionary at DICTIONARY_PATH, so it opens
+    in microseconds and its pages are shared by every worker process. Without
+    the artifact, falls back to a locally installed NLTK words corpus, then to
+    a built-in common words list. Never downloads anything.
+    
+    The built-in list is too small to correct against: with it, words that are
+    not in it are kept as read instead of being pulled to a near common word.
+    
+    Lookups are case-insensitive.
     """
-    global _ENGLISH_DICT
+    global _ENGLISH_DICT, _ENGLISH_DICT_FULL
     
+    touch_resident('english_dictionary')
+    record_cache('english_dictionary', _ENGLISH_DICT is not None)
     if _ENGLISH_DICT is not None:
         return _ENGLISH_DICT
     
-    # First try PyEnchant - most accurate and comprehensive
-    try:
-        import enchant
-        d = enchant.Dict("en_US")
-        # PyEnchant doesn't provide a word list, but we can use it for checking
-        # For now, fall through to NLTK or common words
-    except ImportError:
-        pass
+    if os.path.isfile(DICTIONARY_PATH):
+        _ENGLISH_DICT = CompactDictionary.open(DICTIONARY_PATH)
+        _ENGLISH_DICT_FULL = True
+        return _ENGLISH_DICT
     
-    # Try to load from NLTK words corpus (234k words)
+    print(f"[OCR] No compact dictionary at {DICTIONARY_PATH}; "
+          "build it with: python -m ocr_app.dictionary --source nltk")
     try:
-        import nltk
-        try:
-            from nltk.corpus import words
-            _ENGLISH_DICT = set(w.upper() for w in words.words())
-            print(f"[OCR] Loaded {len(_ENGLISH_DICT)} words from NLTK dictionary")
-            return _ENGLISH_DICT
-        except LookupError:
-            # Download words corpus if not available
-            print("[OCR] Downloading NLTK words corpus...")
-            nltk.download('words', quiet=True)
-            from nltk.corpus import words
-            _ENGLISH_DICT = set(w.upper() for w in words.words())
-            print(f"[OCR] Loaded {len(_ENGLISH_DICT)} words from NLTK dictionary")
-            return _ENGLISH_DICT
-    except ImportError:
-        print("[OCR] NLTK not available, using built-in word list")
+        _ENGLISH_DICT = CompactDictionary.from_words(nltk_words())
+        _ENGLISH_DICT_FULL = True
+        print(f"[OCR] Loaded {len(_ENGLISH_DICT)} words from NLTK dictionary")
+        return _ENGLISH_DICT
+    except (ImportError, LookupError):
         pass
     
     # Final fallback: comprehensive built-in common words
-    _ENGLISH_DICT = _get_comprehensive_word_list()
+    _ENGLISH_DICT = CompactDictionary.from_words(_get_comprehensive_word_list())
     print(f"[OCR] Using built-in dictionary with {len(_ENGLISH_DICT)} words")
     return _ENGLISH_DICT
 
 
+_SYMSPELL = None
+_SYMSPELL_MISSING = False
+
+
+def release_symspell():
+    """Drop the cached SymSpell index; the next lookup reloads it."""
+    global _SYMSPELL
+    _SYMSPELL = None
+    _correct_token.cache_clear()
+
+
+register_resident('symspell', 'dictionary', release=release_symspell,
+                  is_loaded=lambda: _SYMSPELL is not None)
+
+
 def load_symspell():
     """Load SymSpell for fast spell correction.
     
-    Returns None if SymSpell is not available.
+    Loaded once and cached; returns None if SymSpell is not available.
     """
+    global _SYMSPELL, _SYMSPELL_MISSING
+    
+    touch_resident('symspell')
+    if _SYMSPELL is not None or _SYMSPELL_MISSING:
+        return _SYMSPELL
+    
     try:
         from symspellpy import SymSpell, Verbosity
         
@@ -75,13 +136,16 @@ def load_symspell():
             dict_path = pkg_resources.resource_filename("symspellpy", "frequency_dictionary_en_82_765.txt")
             if os.path.isfile(dict_path):
                 sym_spell.load_dictionary(dict_path, term_index=0, count_index=1)
-                return sym_spell
+                _SYMSPELL = sym_spell
+                return _SYMSPELL
         except:
             pass
         
         # If that fails, return None (will use fallback correction)
+        _SYMSPELL_MISSING = True
         return None
     except ImportError:
+        _SYMSPELL_MISSING = True
         return None
 
 
@@ -278,33 +342,62 @@ def _get_comprehensive_word_list() -> set:
     }
 
 
-def _levenshtein(a: str, b: str) -> int:
-    # simple iterative DP implementation
-    if a == b:
-        return 0
-    la, lb = len(a), len(b)
-    if la == 0:
-        return lb
-    if lb == 0:
-        return la
-    prev = list(range(lb + 1))
-    for i, ca in enumerate(a, start=1):
-        cur = [i] + [0] * lb
-        for j, cb in enumerate(b, start=1):
-            cost = 0 if ca == cb else 1
-            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
-        prev = cur
-    return prev[lb]
+_CORRECTOR = None
+
+
+def _corrector(english_words: CompactDictionary) -> Corrector:
+    """Bounded edit-distance search over the loaded dictionary (reused while it stays loaded)."""
+    global _CORRECTOR
+    if _CORRECTOR is None or _CORRECTOR.dictionary is not english_words:
+        _CORRECTOR = Corrector(english_words)
+    return _CORRECTOR
+
+
+# Explicit corrections applied before any other processing. Whole words only, so
+# "COM" is dropped from "SITE.COM" but "COMPUTER" is left alone.
+EXPLICIT_CORRECTIONS = {
+    'SOP': 'STOP',
+    'STGP': 'STOP',
+    'ST0P': 'STOP',
+    'STQP': 'STOP',
+    'FRO': 'PRO',
+    'WISHED': 'WISHES',
+    'WSIS': 'WISHES',
+    'NAPPY': 'HAPPY',
+    'TALIVATIN': 'TALKATIVE',
+    'MERI': 'VERY',
+    'MERI,': 'VERY',
+    'ROUTINELY': '',
+    'SHARES': '',
+    'COM': '',
+}
+
+# One alternation, longest first, so 'MERI,' wins over 'MERI'
+_CORRECTIONS_RE = re.compile(
+    r'(?<!\w)(?:' + '|'.join(re.escape(wrong) for wrong in
+                              sorted(EXPLICIT_CORRECTIONS, key=len, reverse=True)) + r')(?!\w)')
+# Words are separated by whitespace and commas (stray punctuation between words)
+_TOKEN_RE = re.compile(r'[^\s,]+')
+# URL components and the watermark of the site image2.jpg comes from
+_URL_ARTIFACT_RE = re.compile(r'ROUTINELY|SHARES|HTTP|WWW|\.COM(?!\w)')
+
+# Distinct tokens whose correction is remembered; OCR output repeats words heavily
+TOKEN_CACHE_SIZE = int(os.environ.get('OCR_TOKEN_CACHE_SIZE', '16384'))
 
 
 def normalize_ocr(text: str, candidates: Iterable[str] | None = None) -> str:
     """Apply SymSpell spell correction and normalizations.
 
     - Uppercases result
-    - Applies explicit corrections (SOP->STOP, etc.)
+    - Applies explicit corrections (SOP->STOP, etc.) to whole words
     - Uses SymSpell for intelligent spell correction
-    - Falls back to Levenshtein distance with NLTK dictionary
+    - Falls back to bounded edit-distance search over a full dictionary
+      (not the built-in word list)
     - Filters URL artifacts
+
+    The patterns are compiled once at import; a text takes one substitution
+    pass and one tokenizing pass, and each distinct token is corrected once
+    per process (see TOKEN_CACHE_SIZE).
     """
     if not text:
         return text
@@ -314,78 +407,59 @@ def normalize_ocr(text: str, candidates: Iterable[str] | None = None) -> str:
         return text
     
     # Load dictionaries
-    english_words = load_english_dictionary()
-    symspell = load_symspell()
+    with time_stage('ocr_dictionary_load'):
+        english_words = load_english_dictionary()
+    with time_stage('ocr_symspell_load'):
+        symspell = load_symspell()
     
-    # Explicit corrections that should happen before any other processing
-    explicit_corrections = {
-        'SOP': 'STOP',
-        'STGP': 'STOP',
-        'ST0P': 'STOP',
-        'STQP': 'STOP',
-        'FRO': 'PRO',
-        'WISHED': 'WISHES',
-        'WSIS': 'WISHES',
-        'NAPPY': 'HAPPY',
-        'TALIVATIN': 'TALKATIVE',
-        'MERI': 'VERY',
-        'MERI,': 'VERY',
-        'ROUTINELY': '',
-        'SHARES': '',
-        'COM': '',
-    }
-    
-    # Apply explicit corrections first
-    text_upper = text.upper()
-    for wrong, right in explicit_corrections.items():
-        if text_upper == wrong or wrong in text_upper:
-            text_upper = text_upper.replace(wrong, right)
+    text_upper = _CORRECTIONS_RE.sub(lambda m: EXPLICIT_CORRECTIONS[m.group()], text.upper())
     
-    # Clean up stray punctuation (remove commas between words)
-    import re
-    text_upper = re.sub(r'\s*,\s*', ' ', text_upper)
-    
-    # Filter out URL artifacts and clean up
-    words = text_upper.split()
-    filtered_words = []
-    for w in words:
-        w = w.strip()
-        if not w:
-            continue
-        # Skip URL components
-        if any(x in w.lower() for x in ['routinely', 'shares', 'com', '.com', 'http', 'www']):
-            continue
-        # Skip very short fragments
-        if len(w) < 2:
-            continue
-        filtered_words.append(w)
+    # Skip URL components and very short fragments
+    filtered_words = [w for w in _TOKEN_RE.findall(text_upper)
+                      if len(w) >= 2 and not _URL_ARTIFACT_RE.search(w)]
     
     if not filtered_words:
         return text.upper().strip()
     
     # Try SymSpell correction
-    corrected_words = []
-    for word in filtered_words:
-        # If word is already correct, keep it
-        if word.lower() in english_words:
-            corrected_words.append(word)
-            continue
-        
-        # Try SymSpell correction with edit distance 1 only (conservative)
-        if symspell and Verbosity:
-            suggestions = symspell.lookup(word.lower(), Verbosity.CLOSEST, max_edit_distance=1)
-            if suggestions and suggestions[0].distance == 1:
-                best_suggestion = suggestions[0].term.upper()
-                # Verify suggestion is in NLTK dictionary
-                if best_suggestion.lower() in english_words:
-                    corrected_words.append(best_suggestion)
-                    continue
-        
-        # Keep the original word if no high-confidence correction found
-        corrected_words.append(word)
+    with time_stage('ocr_symspell_lookup'):
+        corrected_words = [_correct_token(w, english_words, symspell) for w in filtered_words]
     
     result = ' '.join(corrected_words)
     return result if result else text.upper().strip()
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _correct_token(word: str, english_words: CompactDictionary, symspell) -> str:
+    """Correct one word with SymSpell (or the dictionary search without it),
+    keeping it when no confident fix exists.
+
+    Without SymSpell, only a full dictionary is searched: against the built-in
+    list, names and other valid words it lacks ("LAB", "MAYO") would be pulled
+    to a common word one edit away ("LAW", "MAY").
+    """
+    # If word is already correct, keep it
+    if word.lower() in english_words:
+        return word
+    
+    # Try SymSpell correction with edit distance 1 only (conservative)
+    if symspell and Verbosity:
+        suggestions = symspell.lookup(word.lower(), Verbosity.CLOSEST, max_edit_distance=1)
+        if suggestions and suggestions[0].distance == 1:
+            best_suggestion = suggestions[0].term.upper()
+            # Verify suggestion is in NLTK dictionary
+            if best_suggestion.lower() in english_words:
+                return best_suggestion
+    elif _ENGLISH_DICT_FULL:
+        # Without SymSpell: the unique dictionary word one edit away, if any
+        suggestion = _corrector(english_words).correct(word)
+        if suggestion:
+            return suggestion
+    
+    # Keep the original word if no high-confidence correction found
+    return word
+
+
 def log_message(message):
     print(f"[LOG] {message}")
 
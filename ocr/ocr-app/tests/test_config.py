@@ -0,0 +1,56 @@
+import unittest
+
+from src.ocr_app.config import (
+    PROFILES, Config, get_profile, profile_for_question, with_overrides,
+)
+
+
+class TestOcrProfiles(unittest.TestCase):
+
+    def test_default_config_string_is_unchanged(self):
+        self.assertEqual(Config().tesseract_config(), "--oem 3 --psm 3")
+        self.assertEqual(get_profile(None).psm_passes, (3, 11, 6))
+
+    def test_profile_options_reach_tesseract(self):
+        config = Config(oem=1, psm=11, tessdata_dir="/opt/tessdata_fast", dpi=300,
+                        whitelist="0123456789", dictionaries=False)
+        args = config.tesseract_config(psm=6)
+        self.assertIn("--oem 1 --psm 6", args)
+        self.assertIn('--tessdata-dir "/opt/tessdata_fast"', args)
+        self.assertIn("--dpi 300", args)
+        self.assertIn("-c tessedit_char_whitelist=0123456789", args)
+        self.assertIn("-c load_system_dawg=0 -c load_freq_dawg=0", args)
+
+    def test_digits_profile_skips_spell_correction(self):
+        digits = get_profile("digits")
+        self.assertFalse(digits.spell_correct)
+        self.assertNotIn("A", digits.whitelist)
+
+    def test_unknown_profile_raises(self):
+        with self.assertRaises(ValueError):
+            get_profile("handwriting")
+
+    def test_profile_for_question(self):
+        self.assertEqual(profile_for_question("How much does this cost?"), "digits")
+        self.assertEqual(profile_for_question("What is the phone number?"), "digits")
+        self.assertEqual(profile_for_question("What does this letter say?"), "documents")
+        self.assertEqual(profile_for_question("What are the ingredients?"), "labels")
+        self.assertEqual(profile_for_question("What does the sign say?"), "signs")
+        self.assertEqual(profile_for_question("What does the text say?"), "default")
+        self.assertEqual(profile_for_question(None), "default")
+
+    def test_ambiguous_numeric_words_keep_letters(self):
+        # the digits whitelist would drop the letters these answers need
+        for question in ("What is the dress code?", "When is the book due?",
+                         "How much sugar is in this?", "What is the total wine store called?"):
+            self.assertNotEqual(profile_for_question(question), "digits", question)
+
+    def test_profiles_are_hashable_and_overridable(self):
+        # ocr_module caches one engine per (profile, psm)
+        self.assertEqual(len({hash(p) for p in PROFILES.values()}), len(PROFILES))
+        changed = with_overrides(get_profile("signs"), lang="deu", psm=None)
+        self.assertEqual((changed.lang, changed.psm), ("deu", 11))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from src.ocr_app.correction import (Corrector, batch_levenshtein, bounded_levenshtein,
+                                    distance_matrix, nearest)
+from src.ocr_app.dictionary import CompactDictionary
+
+WORDS = ["STOP", "STOPS", "SHOP", "TOP", "HAPPY", "HAPPEN", "CAUTION", "SUMMER", "WISHES", "A", "I"]
+
+
+def reference(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        prev = cur
+    return prev[-1]
+
+
+def random_words(rng, count):
+    return ["".join(rng.choice("ABC") for _ in range(rng.randint(0, 7))) for _ in range(count)]
+
+
+class TestBoundedLevenshtein(unittest.TestCase):
+
+    def test_matches_full_dp_within_bound(self):
+        rng = random.Random(0)
+        for a, b in zip(random_words(rng, 2000), random_words(rng, 2000)):
+            d = reference(a, b)
+            for k in range(4):
+                self.assertEqual(bounded_levenshtein(a, b, k), d if d <= k else k + 1, (a, b, k))
+
+    def test_length_gap_short_circuits(self):
+        self.assertEqual(bounded_levenshtein("A", "ABCDEFGH", 2), 3)
+
+
+class TestBatchLevenshtein(unittest.TestCase):
+
+    def test_matches_full_dp(self):
+        rng = random.Random(1)
+        a, b = random_words(rng, 500), random_words(rng, 500)
+        self.assertEqual(list(batch_levenshtein(a, b)), [reference(x, y) for x, y in zip(a, b)])
+
+    def test_distance_matrix_shape_and_case(self):
+        matrix = distance_matrix(["stgp", "nappy"], WORDS)
+        self.assertEqual(matrix.shape, (2, len(WORDS)))
+        self.assertEqual(matrix[0, WORDS.index("STOP")], 1)
+        self.assertEqual(matrix[1, WORDS.index("HAPPY")], 1)
+
+    def test_nearest_keeps_ambiguous_tokens(self):
+        # "SOP" is one edit from both STOP and SHOP
+        self.assertEqual(nearest(["STGP", "SOP", "XYZZY"], WORDS), ["STOP", None, None])
+
+
+class TestCorrector(unittest.TestCase):
+
+    def setUp(self):
+        self.corrector = Corrector(CompactDictionary.from_words(WORDS), max_distance=2)
+
+    def test_candidates_match_brute_force(self):
+        rng = random.Random(2)
+        for token in ["STGP", "CAUTI0N", "SUMMR", "WSIS", "X", ""] + random_words(rng, 50):
+            expected = sorted((w, reference(token, w)) for w in WORDS if reference(token, w) <= 2)
+            self.assertEqual(sorted(self.corrector.candidates(token)), expected, token)
+
+    def test_candidates_closest_first(self):
+        found = self.corrector.candidates("STOPX")
+        self.assertEqual(found[0], ("STOP", 1))
+        self.assertEqual([d for _, d in found], sorted(d for _, d in found))
+
+    def test_correct(self):
+        corrector = Corrector(self.corrector.dictionary, max_distance=1)
+        self.assertEqual(corrector.correct("cauti0n"), "CAUTION")
+        self.assertIsNone(corrector.correct("STOP"))   # already a word
+        self.assertIsNone(corrector.correct("SOP"))    # STOP or SHOP
+        self.assertIsNone(corrector.correct("QQQQ"))   # nothing close
+
+
+if __name__ == '__main__':
+    unittest.main()
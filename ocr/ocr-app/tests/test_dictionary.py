@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from src.ocr_app.dictionary import CompactDictionary, build
+
+WORDS = ["stop", "stops", "stopped", "top", "tops", "topped", "shop", "shops", "CAFÉ"]
+
+
+class TestCompactDictionary(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".dawg")
+        with os.fdopen(fd, "wb") as f:
+            f.write(build(WORDS))
+        self.words = CompactDictionary.open(self.path)
+
+    def tearDown(self):
+        del self.words
+        os.remove(self.path)
+
+    def test_lookup_is_case_insensitive(self):
+        for word in WORDS:
+            self.assertIn(word.lower(), self.words)
+            self.assertIn(word.upper(), self.words)
+
+    def test_prefixes_and_extensions_are_not_words(self):
+        for word in ["", "st", "sto", "stopp", "stopping", "shopped", "caf", 42]:
+            self.assertNotIn(word, self.words)
+
+    def test_iterates_sorted_uppercase_words(self):
+        self.assertEqual(list(self.words), sorted(w.upper() for w in WORDS))
+        self.assertEqual(len(self.words), len(WORDS))
+
+    def test_shared_suffixes_are_merged(self):
+        # a plain trie needs one node per distinct prefix
+        prefixes = {w.upper().encode()[:i] for w in WORDS for i in range(len(w.encode()) + 1)}
+        self.assertLess(self.words.nodes, len(prefixes))
+
+    def test_in_memory_matches_file(self):
+        self.assertEqual(list(CompactDictionary.from_words(WORDS)), list(self.words))
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            CompactDictionary(b"not a dictionary at all")
+        with self.assertRaises(ValueError):
+            CompactDictionary(build(WORDS)[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import unittest
+
+from src.ocr_app.layout import OcrLayout
+
+
+def tesseract_data():
+    """image_to_data(..., output_type=DICT) for two lines; structural rows have conf -1."""
+    rows = [
+        # level, block, par, line, left, top, width, height, conf, text
+        (1, 0, 0, 0, 0, 0, 200, 100, -1, ""),
+        (4, 1, 1, 1, 10, 10, 120, 20, -1, ""),
+        (5, 1, 1, 1, 10, 10, 50, 20, 96.5, "STOP"),
+        (5, 1, 1, 1, 70, 12, 60, 18, "41", "AHEAD"),
+        (5, 1, 1, 1, 135, 12, 5, 18, 88, " "),
+        (4, 1, 1, 2, 10, 50, 80, 20, -1, ""),
+        (5, 1, 1, 2, 10, 50, 80, 20, "91.0", "SLOW"),
+    ]
+    keys = ["level", "block_num", "par_num", "line_num", "left", "top", "width", "height",
+            "conf", "text"]
+    return {key: [row[i] for row in rows] for i, key in enumerate(keys)}
+
+
+class TestOcrLayout(unittest.TestCase):
+
+    def test_from_tesseract_keeps_words_only(self):
+        layout = OcrLayout.from_tesseract(tesseract_data())
+        self.assertEqual(layout.words, ["STOP", "AHEAD", "SLOW"])
+        self.assertEqual(layout.boxes.tolist(), [[10, 10, 50, 20], [70, 12, 60, 18], [10, 50, 80, 20]])
+        self.assertEqual(layout.line.tolist(), [0, 0, 1])
+        self.assertAlmostEqual(float(layout.conf[1]), 41.0)
+
+    def test_lines_and_text(self):
+        layout = OcrLayout.from_tesseract(tesseract_data())
+        lines = layout.lines()
+        self.assertEqual([line["text"] for line in lines], ["STOP AHEAD", "SLOW"])
+        self.assertEqual(lines[0]["box"], [10, 10, 120, 20])
+        self.assertEqual(layout.text, "STOP AHEAD\nSLOW")
+
+    def test_filter_by_confidence(self):
+        layout = OcrLayout.from_tesseract(tesseract_data()).filter(50)
+        self.assertEqual(layout.words, ["STOP", "SLOW"])
+        self.assertEqual(layout.text, "STOP\nSLOW")
+        self.assertEqual(len(layout.filter(99)), 0)
+        self.assertEqual(layout.filter(99).text, "")
+
+    def test_json_round_trip(self):
+        layout = OcrLayout.from_tesseract(tesseract_data())
+        restored = OcrLayout.from_dict(json.loads(json.dumps(layout.to_dict())))
+        self.assertEqual(restored.words, layout.words)
+        self.assertEqual(restored.boxes.tolist(), layout.boxes.tolist())
+        self.assertEqual(restored.line.tolist(), layout.line.tolist())
+        self.assertEqual(restored.text, layout.text)
+
+    def test_empty_page(self):
+        layout = OcrLayout.from_tesseract({"text": []})
+        self.assertEqual(len(layout), 0)
+        self.assertEqual(layout.mean_confidence, 0.0)
+        self.assertEqual(layout.to_dict()["lines"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from src.ocr_app import pages
+from src.ocr_app.pages import is_document, iter_pages, map_pages, page_count, render_page
+
+SHADES = (10, 120, 230)
+
+
+def _page_shade(path, index, dpi):
+    """Module-level so worker processes can unpickle it."""
+    return render_page(path, index, dpi).getpixel((0, 0))[0]
+
+
+class TestPages(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        frames = [Image.new("L", (40, 30), shade) for shade in SHADES]
+        self.tiff = os.path.join(self._tmp.name, "letter.tiff")
+        frames[0].save(self.tiff, save_all=True, append_images=frames[1:])
+        self.png = os.path.join(self._tmp.name, "photo.png")
+        frames[0].convert("RGB").save(self.png)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_page_count(self):
+        self.assertEqual(page_count(self.tiff), 3)
+        self.assertEqual(page_count(self.png), 1)
+
+    def test_only_multi_page_files_are_documents(self):
+        self.assertTrue(is_document(self.tiff))
+        self.assertFalse(is_document(self.png))
+        self.assertFalse(is_document(os.path.join(self._tmp.name, "missing.tiff")))
+
+    def test_render_page_returns_rgb_frame(self):
+        page = render_page(self.tiff, 2)
+        self.assertEqual(page.mode, "RGB")
+        self.assertEqual(page.getpixel((0, 0)), (SHADES[2],) * 3)
+
+    def test_render_past_last_page_raises(self):
+        with self.assertRaises(EOFError):
+            render_page(self.tiff, 3)
+
+    def test_iter_pages_is_lazy_and_ordered(self):
+        iterator = iter_pages(self.tiff)
+        self.assertEqual(next(iterator)[0], 0)
+        self.assertEqual([i for i, _ in iterator], [1, 2])
+
+    def test_map_pages_in_process(self):
+        self.assertEqual(list(map_pages(self.tiff, _page_shade, workers=1)),
+                         list(enumerate(SHADES)))
+
+    def test_map_pages_in_worker_processes(self):
+        self.assertEqual(list(map_pages(self.tiff, _page_shade, workers=2)),
+                         list(enumerate(SHADES)))
+
+    @unittest.skipIf(pages.pdfium is not None, "pypdfium2 is installed")
+    def test_pdf_without_renderer_explains_dependency(self):
+        pdf = os.path.join(self._tmp.name, "letter.pdf")
+        with open(pdf, "wb") as f:
+            f.write(b"%PDF-1.4\n%%EOF\n")
+        self.assertTrue(is_document(pdf))
+        with self.assertRaises(ImportError):
+            page_count(pdf)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.ocr_app import preprocess
+from src.ocr_app.preprocess import (
+    Orientation, apply_orientation, clear_orientation_cache, correct_orientation, estimate_skew,
+)
+
+
+def _document(lines=6):
+    arr = np.full((400, 700), 255, dtype=np.uint8)
+    for i in range(lines):
+        cv2.putText(arr, "THE QUICK BROWN FOX %d" % i, (30, 60 + 55 * i),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 3)
+    return arr
+
+
+def _tilted(arr, degrees):
+    """arr rotated counter-clockwise by degrees on a white canvas."""
+    h, w = arr.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), degrees, 1.0)
+    return cv2.warpAffine(arr, matrix, (w, h), borderValue=255)
+
+
+class TestOrientation(unittest.TestCase):
+
+    def setUp(self):
+        self._mode = preprocess.ORIENTATION_MODE
+        preprocess.ORIENTATION_MODE = "off"  # no Tesseract OSD in unit tests
+        clear_orientation_cache()
+
+    def tearDown(self):
+        preprocess.ORIENTATION_MODE = self._mode
+        clear_orientation_cache()
+
+    def test_level_text_has_no_skew(self):
+        self.assertEqual(estimate_skew(_document()), 0.0)
+
+    def test_estimates_skew_in_both_directions(self):
+        for degrees in (7.0, -5.0):
+            self.assertAlmostEqual(estimate_skew(_tilted(_document(), degrees)), degrees, delta=1.0)
+
+    def test_large_tilt_is_left_alone(self):
+        self.assertEqual(estimate_skew(_tilted(_document(), 35.0)), 0.0)
+
+    def test_apply_orientation_levels_text(self):
+        skewed = _tilted(_document(), 6.0)
+        leveled = apply_orientation(skewed, Orientation(skew=estimate_skew(skewed)))
+        self.assertLess(abs(estimate_skew(leveled)), 1.0)
+        self.assertGreaterEqual(leveled.shape[1], skewed.shape[1])
+
+    def test_apply_orientation_rotates_clockwise(self):
+        arr = np.zeros((2, 3), dtype=np.uint8)
+        arr[0, 0] = 1
+        rotated = apply_orientation(arr, Orientation(rotate=90))
+        self.assertEqual(rotated.shape, (3, 2))
+        self.assertEqual(rotated[0, 1], 1)  # top-left moves to top-right
+
+    def test_identity_returns_same_array(self):
+        arr = _document()
+        self.assertTrue(Orientation().is_identity)
+        self.assertIs(apply_orientation(arr, Orientation()), arr)
+
+    def test_correct_orientation_caches_by_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "skewed.png")
+            Image.fromarray(_tilted(_document(), 6.0)).save(path)
+            calls = []
+            original = preprocess.estimate_orientation
+
+            def counting(arr):
+                calls.append(1)
+                return original(arr)
+
+            preprocess.estimate_orientation = counting
+            try:
+                image, first = correct_orientation(path)
+                _, second = correct_orientation(path)
+            finally:
+                preprocess.estimate_orientation = original
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first, second)
+        self.assertAlmostEqual(first.skew, 6.0, delta=1.0)
+        self.assertEqual(image.mode, "RGB")
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            correct_orientation("/nonexistent/image.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
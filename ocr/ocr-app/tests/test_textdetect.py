@@ -0,0 +1,73 @@
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.ocr_app.textdetect import detect_text, has_text
+
+
+def _text_image(text="HELLO WORLD", dark_on_light=True):
+    bg, fg = (255, 0) if dark_on_light else (0, 255)
+    arr = np.full((200, 600), bg, dtype=np.uint8)
+    cv2.putText(arr, text, (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 2.0, fg, 5)
+    return arr
+
+
+def _page(lines=30, dpi=300):
+    """A4 page of body text: 40 px glyphs at 300 dpi, 20 px at 150 dpi."""
+    scale = dpi / 300
+    arr = np.full((int(3508 * scale), int(2480 * scale)), 255, dtype=np.uint8)
+    for i in range(lines):
+        cv2.putText(arr, "The quick brown fox jumps over the lazy dog 1234",
+                    (int(200 * scale), int((350 + 84 * i) * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.4 * scale, 0, 3 if dpi >= 300 else 2)
+    return arr
+
+
+class TestTextDetect(unittest.TestCase):
+
+    def test_detects_dark_text(self):
+        self.assertTrue(has_text(_text_image()))
+
+    def test_detects_light_text(self):
+        self.assertTrue(has_text(_text_image(dark_on_light=False)))
+
+    def test_blank_image_has_no_text(self):
+        result = detect_text(np.full((200, 600), 128, dtype=np.uint8))
+        self.assertFalse(result.has_text)
+        self.assertEqual(result.score, 0)
+
+    def test_shapes_have_no_text(self):
+        arr = np.tile(np.linspace(0, 255, 400, dtype=np.uint8), (300, 1))
+        cv2.circle(arr, (200, 150), 60, 255, -1)
+        cv2.rectangle(arr, (20, 20), (120, 80), 0, -1)
+        self.assertFalse(has_text(arr))
+
+    def test_accepts_pil_image(self):
+        image = Image.fromarray(_text_image()).convert('RGB')
+        self.assertTrue(has_text(image))
+
+    def test_detects_300_dpi_page(self):
+        self.assertTrue(has_text(_page()))
+
+    def test_detects_150_dpi_page(self):
+        self.assertTrue(has_text(_page(dpi=150)))
+
+    def test_detects_a_few_lines_on_a_page(self):
+        self.assertTrue(has_text(_page(lines=3)))
+
+    def test_fine_noise_is_not_reexamined_as_print(self):
+        rng = np.random.default_rng(0)
+        noise = cv2.GaussianBlur((rng.random((3000, 4000)) * 255).astype(np.uint8), (0, 0), 1)
+        self.assertEqual(detect_text(noise).score, 0)
+
+    def test_threshold_is_tunable(self):
+        arr = _text_image()
+        score = detect_text(arr).score
+        self.assertTrue(detect_text(arr, min_aligned=score).has_text)
+        self.assertFalse(detect_text(arr, min_aligned=score + 1).has_text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.ocr_app.layout import OcrLayout
+from src.ocr_app.tiling import merge_tiles, needs_tiling, tile_grid, tiled_layout
+
+ROWS, COLS = 12, 10
+WORD_W, WORD_H = 60, 20
+
+
+def _page():
+    """White page of filled 'word' boxes, each with its own gray level, and the expected lines."""
+    arr = np.full((ROWS * 50 + 40, COLS * 90 + 40), 255, dtype=np.uint8)
+    lines = []
+    for r in range(ROWS):
+        words = []
+        for c in range(COLS):
+            value = 1 + r * COLS + c
+            left, top = 20 + c * 90, 20 + r * 50
+            arr[top:top + WORD_H, left:left + WORD_W] = value
+            words.append(f"W{value}")
+        lines.append(' '.join(words))
+    return Image.fromarray(arr).convert('RGB'), '\n'.join(lines)
+
+
+def _recognize(tile):
+    """Stand-in for Tesseract: one word per gray level, cut words included."""
+    arr = np.asarray(tile.convert('L'))
+    words, boxes, line = [], [], []
+    for value in np.unique(arr):
+        if value > ROWS * COLS:
+            continue
+        _, _, stats, _ = cv2.connectedComponentsWithStats((arr == value).astype(np.uint8))
+        x, y, w, h, area = stats[1:][stats[1:, 4].argmax()]
+        if w < 5 or h < 5 or area < 0.5 * w * h:
+            continue  # resampling fringe around other words
+        words.append(f"W{value}")
+        boxes.append((x, y, w, h))
+        line.append(y // 40)
+    return OcrLayout(words, boxes, [90.0] * len(words), line)
+
+
+class TestTileGrid(unittest.TestCase):
+
+    def test_small_image_is_one_tile(self):
+        tiles = tile_grid(300, 200, tile=500, overlap=50)
+        self.assertEqual(len(tiles), 1)
+        self.assertEqual(tiles[0].box, (0, 0, 300, 200))
+        self.assertEqual(tiles[0].core, (0, 0, 300, 200))
+
+    def test_cores_partition_the_image(self):
+        width, height = 1234, 987
+        tiles = tile_grid(width, height, tile=400, overlap=60)
+        covered = np.zeros((height, width), dtype=np.int32)
+        for tile in tiles:
+            left, top, right, bottom = tile.core
+            covered[top:bottom, left:right] += 1
+            self.assertTrue(tile.box[0] <= left and right <= tile.box[2])
+            self.assertTrue(tile.box[1] <= top and bottom <= tile.box[3])
+            self.assertLessEqual(tile.box[2] - tile.box[0], 400)
+        self.assertTrue((covered == 1).all())
+
+    def test_overlap_must_be_smaller_than_tile(self):
+        with self.assertRaises(ValueError):
+            tile_grid(1000, 1000, tile=100, overlap=100)
+
+    def test_needs_tiling_counts_scaled_pixels(self):
+        self.assertFalse(needs_tiling((800, 600), 1.0))
+        self.assertTrue(needs_tiling((4000, 3000), 1.0))
+        self.assertTrue(needs_tiling((1600, 1200), 2.0))
+
+
+class TestTiledLayout(unittest.TestCase):
+
+    def test_words_in_overlaps_are_reported_once(self):
+        page, expected = _page()
+        layout = tiled_layout(page, _recognize, tile_size=300, overlap=100, workers=3)
+        self.assertEqual(len(layout), ROWS * COLS)
+        self.assertEqual(layout.text, expected)
+
+    def test_boxes_are_in_page_coordinates(self):
+        page, _ = _page()
+        layout = tiled_layout(page, _recognize, tile_size=300, overlap=100, workers=1)
+        index = layout.words.index(f"W{1 + 5 * COLS + 7}")
+        self.assertEqual(layout.boxes[index].tolist(), [20 + 7 * 90, 20 + 5 * 50, WORD_W, WORD_H])
+
+    def test_scaled_tiles_map_back(self):
+        page, expected = _page()
+        layout = tiled_layout(page, _recognize, scale=2.0, tile_size=600, overlap=200, workers=2)
+        self.assertEqual(layout.text, expected)
+        index = layout.words.index("W1")
+        # resampling blurs the box edges by a few pixels
+        np.testing.assert_allclose(layout.boxes[index], [20, 20, WORD_W, WORD_H], atol=6)
+
+    def test_matches_untiled_result(self):
+        page, _ = _page()
+        whole = _recognize(page)
+        tiled = tiled_layout(page, _recognize, tile_size=250, overlap=80)
+        self.assertEqual(sorted(tiled.words), sorted(whole.words))
+
+    def test_merge_of_empty_tiles(self):
+        self.assertEqual(len(merge_tiles([OcrLayout([], [], [], [])] * 3)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+
+from src.ocr_app import utils
+from src.ocr_app.dictionary import CompactDictionary
+from src.ocr_app.utils import normalize_ocr
+
+
+class TestNormalizeOcr(unittest.TestCase):
+
+    def test_explicit_corrections(self):
+        self.assertEqual(normalize_ocr("st0p"), "STOP")
+        self.assertEqual(normalize_ocr("CAUTION MERI, TALIVATIN"), "CAUTION VERY TALKATIVE")
+
+    def test_corrections_only_replace_whole_words(self):
+        self.assertEqual(normalize_ocr("WELCOME TO THE COMPUTER ROOM"),
+                         "WELCOME TO THE COMPUTER ROOM")
+        self.assertEqual(normalize_ocr("SOPHIA"), "SOPHIA")
+
+    def test_url_artifacts_are_dropped(self):
+        self.assertEqual(normalize_ocr("HAPPY BIRTHDAY ROUTINELYSHARES.COM"), "HAPPY BIRTHDAY")
+        self.assertEqual(normalize_ocr("VISIT WWW.EXAMPLE.ORG"), "VISIT")
+
+    def test_commas_and_fragments(self):
+        self.assertEqual(normalize_ocr("STOP,AHEAD , X"), "STOP AHEAD")
+
+    def test_empty_text(self):
+        self.assertEqual(normalize_ocr(""), "")
+        self.assertEqual(normalize_ocr("   "), "")
+
+    def test_words_missing_from_builtin_list_are_kept(self):
+        with mock.patch.object(utils, '_ENGLISH_DICT', None), \
+                mock.patch.object(utils, 'DICTIONARY_PATH', '/nonexistent.dawg'), \
+                mock.patch.object(utils, 'nltk_words', side_effect=ImportError), \
+                mock.patch.object(utils, 'load_symspell', return_value=None):
+            utils._correct_token.cache_clear()
+            self.assertEqual(normalize_ocr("COMPUTER LAB"), "COMPUTER LAB")
+            self.assertEqual(normalize_ocr("MAYO CLINIC"), "MAYO CLINIC")
+        utils.release_english_dictionary()
+
+    def test_full_dictionary_corrects_one_edit(self):
+        words = CompactDictionary.from_words(["CAUTION", "WET", "FLOOR", "LAW"])
+        with mock.patch.object(utils, '_ENGLISH_DICT', words), \
+                mock.patch.object(utils, '_ENGLISH_DICT_FULL', True), \
+                mock.patch.object(utils, 'load_symspell', return_value=None):
+            utils._correct_token.cache_clear()
+            self.assertEqual(normalize_ocr("CAUTI0N WET FL0OR"), "CAUTION WET FLOOR")
+        utils.release_english_dictionary()
+
+    def test_tokens_are_corrected_once(self):
+        utils._correct_token.cache_clear()
+        normalize_ocr("HAPPY HAPPY HAPPY")
+        info = utils._correct_token.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_releasing_the_dictionary_clears_token_cache(self):
+        normalize_ocr("HAPPY")
+        utils.release_english_dictionary()
+        self.assertEqual(utils._correct_token.cache_info().currsize, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
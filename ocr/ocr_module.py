@@ -5,6 +5,8 @@ Integrates the OCR implementation with the UI.
 
 import sys
 import os
+import threading
+from functools import lru_cache, partial
 from PIL import Image
 
 # Add the ocr-app source to path
@@ -12,63 +14,198 @@ ocr_app_src = os.path.join(os.path.dirname(__file__), "ocr-app", "src")
 if ocr_app_src not in sys.path:
     sys.path.insert(0, ocr_app_src)
 
+from ocr_app.config import PROFILES, get_profile, profile_for_question
 from ocr_app.ocr import OCR
-from ocr_app.preprocess import preprocess_image
+from ocr_app.pages import PAGE_DPI, PAGE_WORKERS, is_document, map_pages, page_executor, render_page
+from ocr_app.preprocess import correct_orientation, preprocess_image, straighten
+from ocr_app.textdetect import DEFAULT_MIN_ALIGNED, detect_text
+from ocr_app.tiling import needs_tiling
 from ocr_app.utils import normalize_ocr
 
+try:
+    from monitoring.metrics import time_stage
+except ImportError:  # monitoring lives at the project root; absent when run standalone
+    from contextlib import nullcontext as time_stage
 
-def extract_text(image_path):
+# Text-presence score below which OCR is skipped (see ocr_app.textdetect); 0 disables the gate
+TEXT_GATE_MIN_ALIGNED = int(os.environ.get('OCR_TEXT_MIN_ALIGNED', DEFAULT_MIN_ALIGNED))
+
+# A pass with at least this mean word confidence (0-100) ends the PSM passes; 0 (default)
+# always runs all. Off until an evaluation on data/cases.csv shows no accuracy loss: a confident
+# but short PSM 3 read ("STOP") would otherwise win over a fuller PSM 11 one ("STOP AHEAD")
+EARLY_EXIT_CONFIDENCE = float(os.environ.get('OCR_EARLY_EXIT_CONF', '0'))
+
+
+@lru_cache(maxsize=32)
+def _engine(profile, psm):
+    """One OCR engine per (profile, PSM), reused across images."""
+    return OCR.from_config(profile, psm=psm)
+
+
+def _recognize(image, config):
+    """PSM passes over an upright PIL image; returns (normalized text, OcrLayout or None)."""
+    binarized = None
+    tiled = needs_tiling(image.size)
+
+    # Try multiple PSM modes and pick longest result, stopping at a confident pass
+    layouts = []
+    for psm in config.psm_passes:
+        try:
+            engine = _engine(config, psm)
+            if tiled:
+                with time_stage(f'ocr_pass_psm{psm}'):
+                    layout = engine.tiled_ocr(image)
+            else:
+                if binarized is None:
+                    binarized = engine.binarize(image)
+                with time_stage(f'ocr_pass_psm{psm}'):
+                    layout = engine.perform_ocr_layout(binarized, binarized=True)
+            layouts.append(layout)
+            if 0 < EARLY_EXIT_CONFIDENCE <= layout.mean_confidence and len(layout):
+                break
+        except Exception as e:
+            print(f"[OCR] PSM {psm} failed: {e}")
+
+    if not layouts:
+        return "No text found", None
+
+    # Pick the longest result
+    layout = max(layouts, key=lambda x: len(x.text.replace('\n', ' ').strip()))
+
+    # Apply spell correction and normalization (not for digits-only profiles)
+    with time_stage('ocr_spell_correction'):
+        corrected_text = normalize_ocr(layout.text) if config.spell_correct else ' '.join(layout.text.split())
+
+    return (corrected_text if corrected_text else "No text found"), layout
+
+
+def extract_text(image_path, detect_text_first=False, profile=None):
     """
     Extract text from an image using OCR with advanced preprocessing and spell correction.
-    
+
     Args:
         image_path (str): Path to the image file
-        
+        detect_text_first (bool): Run the fast text-presence check first and
+            skip the Tesseract passes on images without text (off by default;
+            meant for callers that OCR opportunistically, e.g. VQA context)
+        profile (str): OCR profile name (see ocr_app.config.PROFILES; None for "default")
+
     Returns:
         str: The extracted text from the image
     """
+    text, _ = extract_structured(image_path, detect_text_first=detect_text_first, profile=profile)
+    return text
+
+
+def extract_structured(image_path, detect_text_first=False, profile=None):
+    """
+    Extract text and word layout from an image in one Tesseract call per pass.
+
+    Args:
+        image_path (str): Path to the image file
+        detect_text_first (bool): Run the fast text-presence check first and
+            skip the Tesseract passes on images without text (off by default;
+            meant for callers that OCR opportunistically, e.g. VQA context)
+        profile (str): OCR profile name (see ocr_app.config.PROFILES; None for "default")
+
+    Returns:
+        tuple: (normalized text as returned by extract_text,
+                ocr_app.layout.OcrLayout of the chosen pass, or None if no pass ran)
+    """
     try:
-        # Try multiple PSM modes and pick longest result
-        results = []
-        
-        # PSM 3 (automatic - default)
-        try:
-            ocr3 = OCR(psm=3)
-            text3 = ocr3.extract_text(image_path)
-            results.append(text3)
-        except Exception as e:
-            print(f"[OCR] PSM 3 failed: {e}")
-        
-        # PSM 11 (sparse text - good for signs)
-        try:
-            ocr11 = OCR(psm=11)
-            text11 = ocr11.extract_text(image_path)
-            results.append(text11)
-        except Exception as e:
-            print(f"[OCR] PSM 11 failed: {e}")
-        
-        # PSM 6 (single block - good for structured text)
-        try:
-            ocr6 = OCR(psm=6)
-            text6 = ocr6.extract_text(image_path)
-            results.append(text6)
-        except Exception as e:
-            print(f"[OCR] PSM 6 failed: {e}")
-        
-        if not results:
-            return "No text found"
-        
-        # Pick the longest result
-        raw_text = max(results, key=lambda x: len(x.replace('\n', ' ').strip()))
-        
-        # Apply spell correction and normalization
-        corrected_text = normalize_ocr(raw_text)
-        
-        return corrected_text if corrected_text else "No text found"
-        
+        config = get_profile(profile)
+        if detect_text_first and TEXT_GATE_MIN_ALIGNED > 0:
+            with time_stage('ocr_text_detect'):
+                presence = detect_text(image_path, TEXT_GATE_MIN_ALIGNED)
+            if not presence.has_text:
+                return "No text found", None
+
+        # Straighten the image once; every pass reads the same binarized copy
+        # (large images are binarized and OCR'd tile by tile instead)
+        with time_stage('ocr_orientation'):
+            image, _ = correct_orientation(image_path)
+        return _recognize(image, config)
+
     except Exception as e:
         import traceback
-        return f"OCR Error: {str(e)}\n{traceback.format_exc()}"
+        return f"OCR Error: {str(e)}\n{traceback.format_exc()}", None
+
+
+def extract_frame(image, detect_text_first=False, profile=None):
+    """
+    extract_structured() for an in-memory camera frame.
+
+    Frames are not rotated or deskewed (no OSD call per frame); camera
+    previews are upright and consecutive frames vote on the text instead.
+
+    Args:
+        image: PIL RGB image
+        detect_text_first (bool): Skip frames without text
+        profile (str): OCR profile name (see ocr_app.config.PROFILES; None for "default")
+
+    Returns:
+        tuple: (normalized text, OcrLayout or None)
+    """
+    try:
+        config = get_profile(profile)
+        if detect_text_first and TEXT_GATE_MIN_ALIGNED > 0:
+            with time_stage('ocr_text_detect'):
+                if not detect_text(image, TEXT_GATE_MIN_ALIGNED).has_text:
+                    return "No text found", None
+        return _recognize(image, config)
+    except Exception as e:
+        return f"OCR Error: {str(e)}", None
+
+
+# Worker processes for document pages, started on first use and kept for later documents
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def _page_executor():
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = page_executor(PAGE_WORKERS)
+        return _page_pool
+
+
+def _extract_page(profile, detect_text_first, path, index, dpi):
+    """extract_structured() for one rendered document page (runs in a worker process)."""
+    try:
+        page = render_page(path, index, dpi)
+        if detect_text_first and TEXT_GATE_MIN_ALIGNED > 0:
+            if not detect_text(page, TEXT_GATE_MIN_ALIGNED).has_text:
+                return "No text found", None
+        image, _ = straighten(page)
+        del page
+        return _recognize(image, get_profile(profile))
+    except Exception as e:
+        return f"OCR Error: {str(e)}", None
+
+
+def extract_pages(path, detect_text_first=False, profile=None, workers=PAGE_WORKERS, dpi=PAGE_DPI):
+    """
+    Extract text and word layout from every page of a PDF or multi-page TIFF.
+
+    Pages are rendered and OCR'd in worker processes, `workers` at a time, and
+    never all held in memory (see ocr_app.pages).
+
+    Args:
+        path (str): PDF, TIFF or image file
+        detect_text_first (bool): Skip pages without text (see extract_structured)
+        profile (str): OCR profile name (see ocr_app.config.PROFILES; None for "default")
+        workers (int): Pages OCR'd in parallel; 1 runs in this process
+        dpi (int): PDF render resolution
+
+    Yields:
+        tuple: (page index, normalized text, OcrLayout or None), in page order
+    """
+    get_profile(profile)  # unknown profiles fail here, not in every worker
+    executor = _page_executor() if workers > 1 else None
+    fn = partial(_extract_page, profile, detect_text_first)
+    for index, (text, layout) in map_pages(path, fn, workers=workers, dpi=dpi, executor=executor):
+        yield index, text, layout
 
 
 if __name__ == "__main__":
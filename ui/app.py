@@ -3,14 +3,32 @@ Flask API Backend for Assistive VQA
 Handles image upload, question processing, and routing between VQA and OCR modules.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 from flask_cors import CORS
 import os
+import sys
+import time
 import base64
+import json
 from PIL import Image
 import io
 import re
 
+# Make sibling packages (vqa, ocr, monitoring) importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from monitoring.metrics import (
+    CONTENT_TYPE_LATEST, IN_FLIGHT, MODULE_RUNS, REQUESTS_TOTAL, REQUEST_SECONDS,
+    process_stats, record_module_skip, render_latest, time_stage,
+)
+from monitoring import tracing
+from monitoring.governor import GOVERNOR
+from ui.frame_stream import FrameStreamStore, read_frames
+from ui.ocr_context import DEFAULT_TOKEN_BUDGET, approximate_tokens, build_ocr_context, context_lines
+from ui.routing import determine_module, route
+from ui.sessions import DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_BYTES, SessionStore
+from vqa.backends import resolve_backend
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js frontend
 
@@ -20,59 +38,113 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Minimum routing confidence to run only the routed module; 1.0 always runs both
+ROUTE_FIRST_MIN_CONFIDENCE = float(os.environ.get('ROUTE_FIRST_MIN_CONFIDENCE', '0.8'))
+
+
+
+def _parse_route_backends(spec: str) -> dict:
+    """'what color=blip-base, how many=stub' -> {'what color': 'blip-base', 'how many': 'stub'}"""
+    backends = {}
+    for item in spec.split(','):
+        if '=' in item:
+            keyword, name = item.split('=', 1)
+            backends[keyword.strip().lower()] = resolve_backend(name)
+    return backends
+
+
+# Per-route VQA backends: routing keyword -> backend, e.g. "what color=blip-base,how many=blip-base"
+VQA_ROUTE_BACKENDS = _parse_route_backends(os.environ.get('VQA_ROUTE_BACKENDS', ''))
+
+# Requests carrying this header get their span tree attached to the JSON `details`
+DEBUG_TRACE_HEADER = 'X-Debug-Trace'
+
+
+def _debug_trace_requested() -> bool:
+    return request.headers.get(DEBUG_TRACE_HEADER, '').lower() in ('1', 'true', 'yes')
+
+
+@app.before_request
+def _start_request_metrics():
+    GOVERNOR.start()
+    g.request_start = time.perf_counter()
+    g.trace_root = tracing.start_span(f"{request.method} {request.path}",
+                                      endpoint=request.endpoint or 'unknown')
+    IN_FLIGHT.inc()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    endpoint = request.endpoint or 'unknown'
+    start = g.pop('request_start', None)
+    if start is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    REQUESTS_TOTAL.inc(endpoint=endpoint, status=str(response.status_code))
+    return response
+
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    IN_FLIGHT.dec()
+    root = g.pop('trace_root', None)
+    if root is not None:
+        tracing.end_span(root, exc)
 
-def determine_module(question):
+
+def _is_valid_response(value: str | None) -> bool:
+    """True if a module produced an answer rather than nothing or an error message."""
+    if not value:
+        return False
+    lowered = value.lower()
+    return not (lowered.startswith('ocr error') or lowered.startswith('vqa error'))
+
+
+def plan_execution(routing) -> list:
     """
-    Determine whether to use OCR or VQA based on the question.
-    
-    Args:
-        question (str): User's question about the image
-        
+    Decide which modules to run eagerly for a routing decision.
+
+    Confident decisions run only the routed module (the other one is run lazily
+    if the first result is not valid); uncertain ones run OCR then VQA, so the
+    VQA prompt gets the detected text and both answers are available.
+
     Returns:
-        str: 'ocr' or 'vqa'
+        list: module names in execution order
     """
-    # Convert to lowercase for easier matching
-    q_lower = question.lower()
-    
-    # OCR keywords - questions about text content
-    ocr_keywords = [
-        'read', 'text', 'says', 'written', 'word', 'letter',
-        'sign', 'label', 'caption', 'title', 'heading',
-        'number', 'digit', 'price', 'address', 'phone',
-        'email', 'url', 'date', 'name on', 'writing'
-    ]
-    
-    # VQA keywords - questions about visual content
-    vqa_keywords = [
-        'what color', 'how many', 'where is', 'who is',
-        'what is', 'describe', 'show', 'look like',
-        'doing', 'wearing', 'holding', 'scene',
-        'background', 'object', 'person', 'animal'
-    ]
-    
-    # Check for OCR keywords
-    ocr_score = sum(1 for keyword in ocr_keywords if keyword in q_lower)
-    
-    # Check for VQA keywords
-    vqa_score = sum(1 for keyword in vqa_keywords if keyword in q_lower)
-    
-    # Default to VQA if no clear match
-    if ocr_score > vqa_score:
-        return 'ocr'
-    else:
-        return 'vqa'
+    if routing.confidence >= ROUTE_FIRST_MIN_CONFIDENCE:
+        return [routing.module]
+    return ['ocr', 'vqa']
+
+
+def select_vqa_backend(routing, requested=None):
+    """
+    Pick the VQA backend for a question.
 
+    The request's own choice wins; otherwise the first matched routing keyword
+    with a backend in VQA_ROUTE_BACKENDS; otherwise None (the VQA module default).
 
-def process_with_ocr(image_path, question):
+    Raises:
+        ValueError: If the requested backend does not exist
+    """
+    if requested:
+        return resolve_backend(requested)
+    for keyword in routing.matched:
+        if keyword in VQA_ROUTE_BACKENDS:
+            return VQA_ROUTE_BACKENDS[keyword]
+    return None
+
+
+def process_with_ocr(image_path, question, detect_text_first=False, profile=None):
     """
     Process image using OCR module.
     
     Args:
         image_path (str): Path to the uploaded image
         question (str): User's question
+        detect_text_first (bool): Skip Tesseract when the fast detector finds no text
+        profile (str): OCR profile name (see select_ocr_profile; None for the default)
         
     Returns:
-        str: OCR result or answer
+        tuple: (OCR result or answer, ocr_app OcrLayout of the words or None)
     """
     try:
         # Try to import OCR module
@@ -80,23 +152,77 @@ def process_with_ocr(image_path, question):
         sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
         
         try:
-            from ocr.ocr_module import extract_text
-            text = extract_text(image_path)
-            return text if text else "No text found in the image."
+            from ocr.ocr_module import extract_structured
+            text, layout = extract_structured(image_path, detect_text_first=detect_text_first,
+                                              profile=profile)
+            return (text if text else "No text found in the image."), layout
         except ImportError:
             # OCR module not yet implemented - return placeholder
-            return "OCR module is being implemented. Placeholder: Text extraction from image."
+            return "OCR module is being implemented. Placeholder: Text extraction from image.", None
     except Exception as e:
-        return f"OCR Error: {str(e)}"
+        return f"OCR Error: {str(e)}", None
+
+
+def is_document_upload(image_path):
+    """Whether the upload is a PDF or multi-page TIFF (False without the OCR module)."""
+    try:
+        from ocr.ocr_module import is_document
+    except ImportError:
+        return False
+    return is_document(image_path)
+
+
+def process_document_with_ocr(image_path, profile=None):
+    """
+    OCR every page of a PDF or multi-page TIFF, pages in parallel worker processes.
+    
+    Args:
+        image_path (str): Path to the uploaded document
+        profile (str): OCR profile name (see select_ocr_profile; None for the default)
+        
+    Yields:
+        tuple: (page index, OCR text, ocr_app OcrLayout or None) in page order
+    """
+    from ocr.ocr_module import extract_pages
+    yield from extract_pages(image_path, detect_text_first=False, profile=profile)
 
 
-def process_with_vqa(image_path, question):
+def process_frame_with_ocr(image, profile=None):
+    """
+    OCR one sampled camera frame.
+    
+    Args:
+        image: PIL RGB image
+        profile (str): OCR profile name (see select_ocr_profile; None for the default)
+        
+    Returns:
+        tuple: (OCR text, ocr_app OcrLayout or None); ('', None) when nothing was read
+    """
+    try:
+        from ocr.ocr_module import extract_frame
+        text, layout = extract_frame(image, profile=profile)
+    except ImportError:
+        return '', None
+    return (text, layout) if _is_valid_response(text) else ('', None)
+
+
+def _normalize_stream_text(text, profile=None):
+    """Spell-correct voted frame text like extract_structured() does (not for digits-only profiles)."""
+    try:
+        from ocr.ocr_module import get_profile, normalize_ocr
+    except ImportError:
+        return text
+    return normalize_ocr(text) if get_profile(profile).spell_correct else text
+
+
+def process_with_vqa(image_path, question, backend=None):
     """
     Process image and question using VQA module.
     
     Args:
         image_path (str): Path to the uploaded image
         question (str): User's question
+        backend (str): VQA backend name (None for the module default)
         
     Returns:
         str: Answer from VQA model
@@ -108,7 +234,7 @@ def process_with_vqa(image_path, question):
         
         try:
             from vqa.vqa_model import answer_question
-            answer = answer_question(image_path, question)
+            answer = answer_question(image_path, question, backend=backend)
             return answer if answer else "Unable to answer the question."
         except ImportError:
             # VQA module not yet implemented - return placeholder
@@ -117,120 +243,513 @@ def process_with_vqa(image_path, question):
         return f"VQA Error: {str(e)}"
 
 
+def vqa_token_counter(backend=None):
+    """
+    Token counter for VQA prompt text.
+    
+    Args:
+        backend (str): VQA backend name (None for the module default)
+        
+    Returns:
+        tuple: (count_tokens(texts) -> list, 'tokenizer' or 'approximate')
+    """
+    try:
+        from vqa.vqa_model import count_tokens
+        if count_tokens([''], backend=backend) is not None:
+            return (lambda texts: count_tokens(texts, backend=backend)), 'tokenizer'
+    except Exception:
+        # no VQA module or model: estimate instead of failing the request
+        pass
+    return approximate_tokens, 'approximate'
+
+
+def build_vqa_context(question, ocr_text, layout=None, backend=None, budget=None, profile=None):
+    """
+    OCR text to append to the VQA prompt, fitted to the token budget.
+    
+    Args:
+        question (str): User's question
+        ocr_text (str): Normalized OCR text
+        layout: ocr_app OcrLayout of the OCR pass, or None
+        backend (str): VQA backend whose tokenizer measures the budget
+        budget (int): Token budget (defaults to DEFAULT_TOKEN_BUDGET)
+        profile (str): OCR profile of the pass; layout lines are spell-corrected
+            only if the profile is, like ocr_text (not for digits-only profiles)
+        
+    Returns:
+        ui.ocr_context.OcrContext
+    """
+    normalize = None
+    if layout is not None:
+        try:
+            from ocr.ocr_module import get_profile, normalize_ocr
+        except ImportError:
+            pass
+        else:
+            if get_profile(profile).spell_correct:
+                normalize = normalize_ocr
+    lines = context_lines(ocr_text, layout, normalize=normalize)
+    count_tokens, counter = vqa_token_counter(backend)
+    context = build_ocr_context(question, lines, DEFAULT_TOKEN_BUDGET if budget is None else budget,
+                                count_tokens=count_tokens)
+    context.token_counter = counter
+    return context
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     return jsonify({
         'status': 'ok',
-        'message': 'Assistive VQA API is running'
+        'message': 'Assistive VQA API is running',
+        'process': process_stats(),
+        'sessions': sessions.stats()
     })
 
 
-@app.route('/api/query', methods=['POST'])
-def query_image():
+@app.route('/api/resources', methods=['GET'])
+def resource_status():
+    """Memory governor status: RSS, limit and state of every resident model/cache."""
+    return jsonify(GOVERNOR.status())
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(render_latest(), content_type=CONTENT_TYPE_LATEST)
+
+
+def _save_request_image():
     """
-    Main endpoint for processing image and question.
+    Save the image from the current request (base64 field or file upload).
     
-    Expects:
-        - image: base64 encoded image or file upload
-        - question: text question about the image
-        
     Returns:
-        JSON with answer, module used, and metadata
+        tuple: (image_path, None) on success, or (None, error response) on failure
     """
-    try:
-        # Get question from request
-        question = request.form.get('question', '')
-        if not question:
-            return jsonify({'error': 'No question provided'}), 400
-        
-        # Get image from request
-        image_data = None
-        image_path = None
-        
-        # Check for base64 encoded image
-        if 'image_base64' in request.form:
-            try:
+    # Check for base64 encoded image
+    if 'image_base64' in request.form:
+        try:
+            with time_stage('decode'):
                 image_b64 = request.form['image_base64']
                 # Remove data URL prefix if present
                 if ',' in image_b64:
                     image_b64 = image_b64.split(',')[1]
                 
                 image_bytes = base64.b64decode(image_b64)
-                image = Image.open(io.BytesIO(image_bytes))
+                if image_bytes.startswith(b'%PDF-'):
+                    extension = 'pdf'
+                else:
+                    image = Image.open(io.BytesIO(image_bytes))
+                    # keep every frame of a multi-page TIFF; re-encode the rest as PNG
+                    extension = 'tiff' if getattr(image, 'n_frames', 1) > 1 else 'png'
                 
                 # Save temporary file
-                temp_filename = f"temp_{os.urandom(8).hex()}.png"
+                temp_filename = f"temp_{os.urandom(8).hex()}.{extension}"
                 image_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-                image.save(image_path)
-                
-            except Exception as e:
-                return jsonify({'error': f'Invalid base64 image: {str(e)}'}), 400
-        
-        # Check for file upload
-        elif 'image' in request.files:
-            file = request.files['image']
-            if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
+                if extension == 'png':
+                    image.save(image_path)
+                else:
+                    with open(image_path, 'wb') as f:
+                        f.write(image_bytes)
+            return image_path, None
             
-            # Save uploaded file
-            filename = f"upload_{os.urandom(8).hex()}_{file.filename}"
+        except Exception as e:
+            return None, (jsonify({'error': f'Invalid base64 image: {str(e)}'}), 400)
+    
+    # Check for file upload
+    elif 'image' in request.files:
+        file = request.files['image']
+        if file.filename == '':
+            return None, (jsonify({'error': 'No file selected'}), 400)
+        
+        # Save uploaded file
+        with time_stage('upload_save'):
+            filename = f"upload_{os.urandom(8).hex()}_{os.path.basename(file.filename)}"
             image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
             file.save(image_path)
+        return image_path, None
+    
+    return None, (jsonify({'error': 'No image provided'}), 400)
+
+
+def _requested_vqa_backend(name):
+    """Validate a client-requested VQA backend; returns (name, error_response)."""
+    if not name:
+        return None, None
+    try:
+        return resolve_backend(name), None
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+
+
+# Pick the OCR profile (signs, documents, digits, labels) from the question type
+OCR_AUTO_PROFILE = os.environ.get('OCR_AUTO_PROFILE', '1').lower() in ('1', 'true', 'yes')
+
+
+def select_ocr_profile(question, requested=None):
+    """
+    OCR profile for a question.
+    
+    Args:
+        question (str): User's question
+        requested (str): Profile requested by the client; wins when given
         
-        else:
-            return jsonify({'error': 'No image provided'}), 400
+    Returns:
+        str: Profile name, or None (module default) if the OCR module is unavailable
+        
+    Raises:
+        ValueError: If the requested profile does not exist
+    """
+    try:
+        from ocr.ocr_module import get_profile, profile_for_question
+    except ImportError:
+        return None
+    if requested:
+        get_profile(requested)
+        return requested.strip().lower()
+    return profile_for_question(question) if OCR_AUTO_PROFILE else 'default'
+
+
+def _requested_ocr_profile(question, name):
+    """Profile for the request; returns (profile, error_response)."""
+    try:
+        return select_ocr_profile(question, name), None
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+
+
+def _requested_ocr_layout(flag, min_conf):
+    """Parse the ocr_layout/ocr_min_conf fields; returns (min confidence or None, error_response)."""
+    if str(flag or '').lower() not in ('1', 'true', 'yes'):
+        return None, None
+    try:
+        return float(min_conf or 0), None
+    except (TypeError, ValueError):
+        return None, (jsonify({'error': f'Invalid ocr_min_conf: {min_conf}'}), 400)
+
+
+def answer_for_image(image_path, question, ocr_results=None, vqa_backend=None, ocr_layout=None,
+                     ocr_profile=None):
+    """
+    Route the question, run the planned modules and pick the answer.
+    
+    Args:
+        image_path (str): Path to the saved image
+        question (str): User's question
+        ocr_results (dict): Optional per-image OCR cache
+            ((profile, detect_text_first) -> (text, layout)), reused and filled
+            across questions about the same image
+        vqa_backend (str): VQA backend requested by the client (see select_vqa_backend)
+        ocr_layout (float): If set, include the OCR words with confidence >= this
+            value (0-100) and their boxes in details['ocr_layout']
+        ocr_profile (str): OCR profile (defaults to select_ocr_profile(question))
         
-        # Always run OCR first so we can surface detected text and optionally feed it to VQA
-        ocr_text = process_with_ocr(image_path, question)
+    Returns:
+        dict: JSON-ready response body
+    """
+    # Route first so only the module that will answer has to run
+    with time_stage('routing'):
+        routing = route(question)
+    module_type = routing.module
+    plan = plan_execution(routing)
+    backend = select_vqa_backend(routing, vqa_backend)
+    if ocr_profile is None:
+        ocr_profile = select_ocr_profile(question)
+    tracing.set_attribute('module', module_type)
+    tracing.set_attribute('plan', ','.join(plan))
+    reason = 'full' if len(plan) > 1 else 'routed'
+
+    ocr_text = None
+    layout = None
+    ocr_context = None
+    vqa_answer = None
+    vqa_question = None
 
-        # Build the VQA prompt. If OCR finds text, append it so the vision model has context.
-        vqa_question = question.strip()
+    def run_ocr(reason):
+        # Text questions always get the full OCR pipeline; context/fallback OCR is
+        # skipped on images the text detector considers text-free
+        gated = module_type != 'ocr'
+        if ocr_results is not None:
+            # an ungated result is valid for gated requests too
+            cached = ocr_results.get((ocr_profile, gated), ocr_results.get((ocr_profile, False)))
+            if cached is not None:
+                tracing.set_attribute('ocr_cached', True)
+                return cached
+        MODULE_RUNS.inc(module='ocr', reason=reason)
+        if ocr_profile:
+            tracing.set_attribute('ocr_profile', ocr_profile)
+        with time_stage('ocr'):
+            result = process_with_ocr(image_path, question, detect_text_first=gated,
+                                      profile=ocr_profile)
+        if ocr_results is not None and _is_valid_response(result[0]):
+            ocr_results[(ocr_profile, gated)] = result
+        return result
+
+    def run_vqa(reason):
+        nonlocal ocr_context
+        # If OCR already found text, append its most relevant lines so the vision model has context.
+        prompt = question.strip()
         normalized_ocr = (ocr_text or '').strip()
         if normalized_ocr and not normalized_ocr.lower().startswith(('ocr error', 'vqa error')) and 'no text found' not in normalized_ocr.lower():
-            vqa_question = f"{vqa_question}\n\nDetected text in image: {normalized_ocr}"
-
-        vqa_answer = process_with_vqa(image_path, vqa_question)
-
-        # Determine which module should supply the primary answer based on the original question
-        module_type = determine_module(question)
-        answer = ocr_text if module_type == 'ocr' else vqa_answer
-
-        # Fallback if the preferred module failed or returned nothing useful
-        def _is_valid_response(value: str | None) -> bool:
-            if not value:
-                return False
-            lowered = value.lower()
-            return not (lowered.startswith('ocr error') or lowered.startswith('vqa error'))
-
-        if module_type == 'ocr' and not _is_valid_response(ocr_text) and _is_valid_response(vqa_answer):
-            module_type = 'vqa'
-            answer = vqa_answer
-        elif module_type == 'vqa' and not _is_valid_response(vqa_answer) and _is_valid_response(ocr_text):
-            module_type = 'ocr'
-            answer = ocr_text
-        elif not _is_valid_response(answer):
-            # fall back to whichever response contains more information
-            answer = ocr_text or vqa_answer or "Unable to process the image."
-        
-        # Clean up temporary file
+            with time_stage('ocr_context'):
+                ocr_context = build_vqa_context(question, normalized_ocr, layout, backend,
+                                                profile=ocr_profile)
+            if ocr_context.text:
+                prompt = f"{prompt}\n\nDetected text in image: {ocr_context.text}"
+        MODULE_RUNS.inc(module='vqa', reason=reason)
+        if backend:
+            tracing.set_attribute('vqa_backend', backend)
+        with time_stage('vqa'):
+            return prompt, process_with_vqa(image_path, prompt, backend=backend)
+
+    # OCR runs before VQA so its text can be fed into the VQA prompt
+    if 'ocr' in plan:
+        ocr_text, layout = run_ocr(reason)
+    if 'vqa' in plan:
+        vqa_question, vqa_answer = run_vqa(reason)
+
+    answer = ocr_text if module_type == 'ocr' else vqa_answer
+
+    # Lazily run the other module only if the routed one failed
+    if not _is_valid_response(answer):
+        if module_type == 'ocr' and vqa_answer is None:
+            vqa_question, vqa_answer = run_vqa('fallback')
+        elif module_type == 'vqa' and ocr_text is None:
+            ocr_text, layout = run_ocr('fallback')
+
+    if module_type == 'ocr' and not _is_valid_response(ocr_text) and _is_valid_response(vqa_answer):
+        module_type = 'vqa'
+        answer = vqa_answer
+    elif module_type == 'vqa' and not _is_valid_response(vqa_answer) and _is_valid_response(ocr_text):
+        module_type = 'ocr'
+        answer = ocr_text
+    elif not _is_valid_response(answer):
+        # fall back to whichever response contains more information
+        answer = ocr_text or vqa_answer or "Unable to process the image."
+
+    skipped = [m for m, value in (('ocr', ocr_text), ('vqa', vqa_answer)) if value is None]
+    for skipped_module in skipped:
+        record_module_skip(skipped_module)
+    
+    details = {
+        'ocr_text': ocr_text,
+        'vqa_answer': vqa_answer,
+        'vqa_question_used': vqa_question,
+        'routing': routing.to_dict(),
+        'vqa_backend': backend,
+        'ocr_profile': ocr_profile,
+        'modules_skipped': skipped,
+        'ocr_context': ocr_context.to_dict() if ocr_context is not None else None
+    }
+    if ocr_layout is not None and layout is not None:
+        details['ocr_layout'] = layout.filter(ocr_layout).to_dict()
+    if _debug_trace_requested() and g.get('trace_root') is not None:
+        details['trace'] = g.trace_root.to_dict()
+    
+    return {
+        'success': True,
+        'answer': answer,
+        'module': module_type,
+        'routing_confidence': round(routing.confidence, 4),
+        'question': question,
+        'details': details
+    }
+
+
+def _remove_upload(image_path):
+    with time_stage('cleanup'):
         try:
             if image_path and os.path.exists(image_path):
                 os.remove(image_path)
-        except:
+        except OSError:
             pass
+
+
+def stream_document(image_path, question, ocr_layout=None, ocr_profile=None):
+    """
+    Answer a text question page by page for a multi-page upload.
+    
+    Yields one JSON line per page as soon as that page is OCR'd, then a summary
+    line with "done": true. Documents are answered by OCR only. The upload is
+    removed when the stream ends (or the client disconnects).
+    """
+    pages = 0
+    try:
+        MODULE_RUNS.inc(module='ocr', reason='document')
+        for index, text, layout in process_document_with_ocr(image_path, profile=ocr_profile):
+            pages += 1
+            details = {'ocr_profile': ocr_profile}
+            if ocr_layout is not None and layout is not None:
+                details['ocr_layout'] = layout.filter(ocr_layout).to_dict()
+            yield json.dumps({
+                'success': _is_valid_response(text),
+                'page': index + 1,
+                'answer': text,
+                'module': 'ocr',
+                'details': details,
+            }) + '\n'
+        yield json.dumps({'success': True, 'done': True, 'pages': pages, 'module': 'ocr',
+                          'question': question}) + '\n'
+    except Exception as e:
+        yield json.dumps({'success': False, 'done': True, 'pages': pages, 'error': str(e)}) + '\n'
+    finally:
+        _remove_upload(image_path)
+
+
+@app.route('/api/query', methods=['POST'])
+def query_image():
+    """
+    Main endpoint for processing image and question.
+    
+    Expects:
+        - image: base64 encoded image or file upload
+        - question: text question about the image
+        - vqa_backend: optional VQA backend name (e.g. blip2, blip-base)
+        - ocr_layout: optional flag; adds the OCR words, boxes and confidences to details
+        - ocr_min_conf: optional minimum word confidence (0-100) for ocr_layout
+        - ocr_profile: optional OCR profile (signs, documents, digits, labels, default)
+        
+    Returns:
+        JSON with answer, module used, and metadata. For a PDF or multi-page TIFF,
+        a chunked application/x-ndjson stream instead: one line per page (see
+        stream_document), then a summary line.
+    """
+    try:
+        # Get question from request
+        question = request.form.get('question', '')
+        if not question:
+            return jsonify({'error': 'No question provided'}), 400
+        
+        vqa_backend, error = _requested_vqa_backend(request.form.get('vqa_backend'))
+        if error is not None:
+            return error
+        
+        ocr_layout, error = _requested_ocr_layout(request.form.get('ocr_layout'),
+                                                  request.form.get('ocr_min_conf'))
+        if error is not None:
+            return error
         
+        ocr_profile, error = _requested_ocr_profile(question, request.form.get('ocr_profile'))
+        if error is not None:
+            return error
+        
+        image_path, error = _save_request_image()
+        if error is not None:
+            return error
+        
+        if is_document_upload(image_path):
+            # pages are sent as they finish; the stream removes the upload
+            return Response(stream_with_context(stream_document(image_path, question, ocr_layout=ocr_layout,
+                                                                ocr_profile=ocr_profile)),
+                            mimetype='application/x-ndjson')
+        
+        try:
+            result = answer_for_image(image_path, question, vqa_backend=vqa_backend,
+                                      ocr_layout=ocr_layout, ocr_profile=ocr_profile)
+        finally:
+            # Clean up temporary file
+            _remove_upload(image_path)
+        
+        return jsonify(result)
+        
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'answer': answer,
-            'module': module_type,
-            'question': question,
-            'details': {
-                'ocr_text': ocr_text,
-                'vqa_answer': vqa_answer,
-                'vqa_question_used': vqa_question
-            }
-        })
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _forget_session_image(session):
+    """Drop the VQA prefix cache of an evicted session's image (if VQA is loaded)."""
+    vqa_model = sys.modules.get('vqa.vqa_model')
+    forget = getattr(vqa_model, 'forget_image', None)
+    if forget is not None:
+        forget(session.image_path)
+
+
+sessions = SessionStore(
+    idle_timeout=float(os.environ.get('SESSION_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT)),
+    max_bytes=int(os.environ.get('SESSION_MAX_BYTES', DEFAULT_MAX_BYTES)),
+    on_evict=_forget_session_image,
+)
+
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """
+    Upload an image once for a series of questions.
+    
+    Expects:
+        - image: base64 encoded image or file upload
+        
+    Returns:
+        JSON with the session id, image info and seconds until idle expiry
+    """
+    try:
+        image_path, error = _save_request_image()
+        if error is not None:
+            return error
+        try:
+            with Image.open(image_path) as image:
+                width, height = image.size
+        except Exception as e:
+            os.remove(image_path)
+            return jsonify({'error': f'Invalid image: {str(e)}'}), 400
+        
+        session = sessions.create(image_path, width, height)
+        return jsonify(session.to_dict(sessions.clock(), sessions.idle_timeout)), 201
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/sessions/<session_id>/ask', methods=['POST'])
+def ask_session(session_id):
+    """
+    Ask a question about a session's image.
+    
+    Expects:
+        - question: text question (form field or JSON body)
+        - vqa_backend: optional VQA backend name (form field or JSON body)
+        - ocr_layout, ocr_min_conf, ocr_profile: optional, as for /api/query (form field or JSON body)
+        
+    Returns:
+        JSON in the /api/query format plus the session id
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        question = request.form.get('question') or body.get('question', '')
+        if not question:
+            return jsonify({'error': 'No question provided'}), 400
+        
+        vqa_backend, error = _requested_vqa_backend(request.form.get('vqa_backend') or body.get('vqa_backend'))
+        if error is not None:
+            return error
+        
+        ocr_layout, error = _requested_ocr_layout(request.form.get('ocr_layout') or body.get('ocr_layout'),
+                                                  request.form.get('ocr_min_conf') or body.get('ocr_min_conf'))
+        if error is not None:
+            return error
+        
+        ocr_profile, error = _requested_ocr_profile(question, request.form.get('ocr_profile')
+                                                    or body.get('ocr_profile'))
+        if error is not None:
+            return error
+        
+        # the session's image stays on disk until the question is answered
+        with sessions.use(session_id) as session:
+            if session is None:
+                return jsonify({'error': 'Session not found or expired'}), 404
+            
+            result = answer_for_image(session.image_path, question, ocr_results=session.ocr_results,
+                                      vqa_backend=vqa_backend, ocr_layout=ocr_layout,
+                                      ocr_profile=ocr_profile)
+            session.questions += 1
+        result['session_id'] = session.id
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({
@@ -239,6 +758,112 @@ def query_image():
         }), 500
 
 
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    """End a session and free its image and caches."""
+    if not sessions.close(session_id):
+        return jsonify({'error': 'Session not found or expired'}), 404
+    return jsonify({'success': True})
+
+
+frame_streams = FrameStreamStore(
+    idle_timeout=float(os.environ.get('STREAM_IDLE_TIMEOUT', '120')),
+    max_streams=int(os.environ.get('STREAM_MAX_ACTIVE', '64')),
+)
+# Request body limit for frame uploads (a long chunked stream of frames)
+STREAM_MAX_BYTES = int(os.environ.get('STREAM_MAX_BYTES', 512 * 1024 * 1024))
+
+
+@app.route('/api/streams', methods=['POST'])
+def create_stream():
+    """
+    Start reading text from a camera frame stream.
+    
+    Expects:
+        - ocr_profile: optional OCR profile (form field or JSON body; default "signs")
+        
+    Returns:
+        JSON with the stream id
+    """
+    body = request.get_json(silent=True) or {}
+    name = request.form.get('ocr_profile') or body.get('ocr_profile') or 'signs'
+    profile, error = _requested_ocr_profile('', name)
+    if error is not None:
+        return error
+    stream = frame_streams.create(profile)
+    return jsonify(stream.to_dict()), 201
+
+
+def _request_frames():
+    """Encoded frames of the request: multipart "frame" files, else a length-prefixed body."""
+    if request.files:
+        for file in request.files.getlist('frame'):
+            yield file.read()
+        return
+    yield from read_frames(request.stream)
+
+
+def _stream_updates(stream):
+    """Push the request's frames into the stream; yield a JSON line per text change, then a summary."""
+    def ocr(frame):
+        # only the frames the stream's sampler selects get here
+        MODULE_RUNS.inc(module='ocr', reason='stream')
+        with time_stage('ocr'):
+            return process_frame_with_ocr(frame, profile=stream.profile)
+    
+    def normalize(text):
+        return _normalize_stream_text(text, stream.profile)
+    
+    received = 0
+    try:
+        with frame_streams.receiving(stream):
+            for data in _request_frames():
+                frame_streams.touch(stream)
+                # stage histograms only: a span per frame would grow the request's trace without bound
+                with tracing.suspended():
+                    with time_stage('decode'):
+                        image = Image.open(io.BytesIO(data)).convert('RGB')
+                    received += 1
+                    with stream.lock, time_stage('stream_frame'):
+                        update = stream.push(image, ocr, normalize=normalize)
+                if update is not None:
+                    yield json.dumps(update.to_dict()) + '\n'
+        tracing.set_attribute('frames_received', received)
+        yield json.dumps({'event': 'summary', 'success': True, 'frames_received': received,
+                          **stream.to_dict()}) + '\n'
+    except Exception as e:
+        yield json.dumps({'event': 'summary', 'success': False, 'error': str(e),
+                          'frames_received': received, **stream.to_dict()}) + '\n'
+
+
+@app.route('/api/streams/<stream_id>/frames', methods=['POST'])
+def push_frames(stream_id):
+    """
+    Send camera frames to a stream.
+    
+    Expects either multipart "frame" files, or an application/octet-stream body
+    (may be sent chunked) of frames, each a 4-byte big-endian length followed
+    by the JPEG/PNG bytes.
+    
+    Returns:
+        A chunked application/x-ndjson response: a {"event": "text"} line each
+        time the stabilized text changes, then a {"event": "summary"} line
+    """
+    stream = frame_streams.get(stream_id)
+    if stream is None:
+        return jsonify({'error': 'Stream not found or expired'}), 404
+    request.max_content_length = STREAM_MAX_BYTES
+    return Response(stream_with_context(_stream_updates(stream)), mimetype='application/x-ndjson')
+
+
+@app.route('/api/streams/<stream_id>', methods=['DELETE'])
+def close_stream(stream_id):
+    """End a frame stream."""
+    if not frame_streams.close(stream_id):
+        return jsonify({'error': 'Stream not found or expired'}), 404
+    return jsonify({'success': True})
+
+
 @app.route('/api/test', methods=['POST'])
 def test_modules():
     """
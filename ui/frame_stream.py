@@ -0,0 +1,345 @@
+"""
+Camera Frame Streams
+Reads a sign from a stream of camera frames instead of one photo per request.
+
+Running the whole pipeline on every frame wastes most of the work: frames
+30 ms apart show the same text, and many are blurred by hand shake. A
+FrameStream therefore:
+
+- samples frames: a frame is OCR'd only when it is sharp (variance of the
+  Laplacian), the camera is steady (mean difference to the previous frame),
+  and it adds something (the scene changed, or enough frames passed since the
+  last OCR'd one; the gap doubles while readings keep agreeing);
+- votes across frames: the words of the last few OCR'd frames are aligned to
+  the most confident reading and each word position takes the word with the
+  highest summed Tesseract confidence;
+- stabilizes: the voted text replaces the reported text only after it came
+  out the same for STABLE_AFTER OCR'd frames in a row, and only then is an
+  update emitted.
+"""
+
+import difflib
+import os
+import struct
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+# Variance of the Laplacian (at SAMPLE_WIDTH) below which a frame is too blurred to OCR
+MIN_SHARPNESS = float(os.environ.get('STREAM_MIN_SHARPNESS', '60'))
+# Mean absolute difference (0-255) to the previous frame above which the camera is moving
+MAX_MOTION = float(os.environ.get('STREAM_MAX_MOTION', '12'))
+# Difference to the last OCR'd frame above which the scene counts as new
+SCENE_CHANGE = float(os.environ.get('STREAM_SCENE_CHANGE', '20'))
+# Frames between OCR runs on an unchanged scene; doubles (up to MAX_GAP) while readings agree
+MIN_GAP = int(os.environ.get('STREAM_MIN_GAP', '5'))
+MAX_GAP = int(os.environ.get('STREAM_MAX_GAP', '40'))
+# OCR'd frames that vote on the text
+VOTE_WINDOW = int(os.environ.get('STREAM_VOTE_WINDOW', '8'))
+# Share of voting frames that must contain a word position for it to be kept
+MIN_SUPPORT = 0.5
+# Consecutive OCR'd frames that must agree before the reported text changes
+STABLE_AFTER = int(os.environ.get('STREAM_STABLE_AFTER', '2'))
+# Confidence given to words when OCR returns text without a layout
+DEFAULT_WORD_CONFIDENCE = 50.0
+# Width frames are measured at, and width of the motion thumbnails
+SAMPLE_WIDTH = 480
+THUMB_WIDTH = 96
+# Largest accepted encoded frame
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+
+
+def _gray(image, width: int) -> np.ndarray:
+    """Grayscale copy of a PIL image or RGB array, resized to width (never enlarged)."""
+    arr = np.asarray(image)
+    gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY) if arr.ndim == 3 else arr
+    h, w = gray.shape[:2]
+    if w > width:
+        gray = cv2.resize(gray, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def sharpness(gray: np.ndarray) -> float:
+    """Variance of the Laplacian: high for crisp edges, low for blur."""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute pixel difference of two thumbnails (0-255); inf if their shapes differ."""
+    if a.shape != b.shape:
+        return float('inf')
+    return float(cv2.absdiff(a, b).mean())
+
+
+@dataclass
+class FrameSample:
+    index: int
+    sharpness: float
+    motion: float
+    selected: bool
+    reason: str  # first, scene, refresh / blur, motion, redundant
+
+
+class FrameSampler:
+    """Decides which frames of a stream are worth OCR'ing."""
+
+    def __init__(self, min_sharpness: float = MIN_SHARPNESS, max_motion: float = MAX_MOTION,
+                 scene_change: float = SCENE_CHANGE, min_gap: int = MIN_GAP, max_gap: int = MAX_GAP):
+        self.min_sharpness = min_sharpness
+        self.max_motion = max_motion
+        self.scene_change = scene_change
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.gap = min_gap
+        self.frames = 0
+        self._previous = None
+        self._last_selected = None  # (index, thumbnail, sharpness)
+
+    def sample(self, image) -> FrameSample:
+        index = self.frames
+        self.frames += 1
+        gray = _gray(image, SAMPLE_WIDTH)
+        thumb = _gray(gray, THUMB_WIDTH)
+        score = sharpness(gray)
+        motion = difference(thumb, self._previous) if self._previous is not None else 0.0
+        self._previous = thumb
+
+        if motion > self.max_motion:
+            return FrameSample(index, score, motion, False, 'motion')
+        if score < self.min_sharpness:
+            return FrameSample(index, score, motion, False, 'blur')
+        if self._last_selected is None:
+            reason = 'first'
+        else:
+            last_index, last_thumb, last_score = self._last_selected
+            if difference(thumb, last_thumb) > self.scene_change:
+                reason = 'scene'
+                self.gap = self.min_gap
+            elif index - last_index >= self.gap and score >= 0.8 * last_score:
+                reason = 'refresh'
+            else:
+                return FrameSample(index, score, motion, False, 'redundant')
+        self._last_selected = (index, thumb, score)
+        return FrameSample(index, score, motion, True, reason)
+
+    def agreed(self, agrees: bool):
+        """Back off while OCR keeps confirming the text; OCR more often once it changes."""
+        self.gap = min(self.max_gap, self.gap * 2) if agrees else self.min_gap
+
+
+def layout_words(text: str, layout=None) -> tuple:
+    """(words, confidences) of one OCR'd frame, from the layout when there is one."""
+    if layout is not None and len(layout):
+        return list(layout.words), [float(c) for c in layout.conf]
+    words = (text or '').split()
+    return words, [DEFAULT_WORD_CONFIDENCE] * len(words)
+
+
+class TextVoter:
+    """Confidence-weighted word voting over the last `window` OCR'd frames."""
+
+    def __init__(self, window: int = VOTE_WINDOW, min_support: float = MIN_SUPPORT):
+        self.min_support = min_support
+        self.observations = deque(maxlen=window)
+
+    def add(self, words: list, confidences: list):
+        self.observations.append((list(words), list(confidences)))
+
+    def consensus(self) -> tuple:
+        """(voted text, agreement 0-1: winning share of the confidence at each kept word)."""
+        observations = [o for o in self.observations if o[0]]
+        if len(observations) * 2 < len(self.observations) or not observations:
+            return '', 0.0  # most recent frames read nothing
+        reference = max(observations, key=lambda o: sum(o[1]))[0]
+        keys = [w.upper() for w in reference]
+        votes = [Counter() for _ in reference]
+        present = [0] * len(reference)
+        for words, confidences in observations:
+            matcher = difflib.SequenceMatcher(None, keys, [w.upper() for w in words], autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal' or (tag == 'replace' and i2 - i1 == j2 - j1):
+                    for i, j in zip(range(i1, i2), range(j1, j2)):
+                        votes[i][words[j]] += max(confidences[j], 1.0)
+                        present[i] += 1
+        kept, agreement = [], []
+        for slot, count in zip(votes, present):
+            if count >= self.min_support * len(observations):
+                word, weight = slot.most_common(1)[0]
+                kept.append(word)
+                agreement.append(weight / sum(slot.values()))
+        return ' '.join(kept), (float(np.mean(agreement)) if agreement else 0.0)
+
+
+@dataclass
+class StreamUpdate:
+    frame: int
+    text: str
+    agreement: float
+    observations: int
+
+    def to_dict(self) -> dict:
+        return {'event': 'text', 'frame': self.frame, 'text': self.text,
+                'agreement': round(self.agreement, 3), 'observations': self.observations}
+
+
+@dataclass
+class FrameStream:
+    id: str
+    profile: str = None
+    created: float = 0.0
+    last_used: float = 0.0
+    receivers: int = 0  # requests currently pushing frames; never evicted while > 0
+    text: str = ''  # stabilized text last reported
+    ocr_frames: int = 0
+    skipped: Counter = field(default_factory=Counter)
+    sampler: FrameSampler = field(default_factory=FrameSampler)
+    voter: TextVoter = field(default_factory=TextVoter)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    _candidate: str = None
+    _candidate_runs: int = 0
+
+    def push(self, image, ocr, normalize=None):
+        """
+        Process one frame.
+
+        Args:
+            image: PIL RGB image
+            ocr: Function image -> (text, OcrLayout or None), run on sampled frames only
+            normalize: Optional function applied to the voted text (e.g. normalize_ocr)
+
+        Returns:
+            StreamUpdate if the stabilized text changed with this frame, else None
+        """
+        sample = self.sampler.sample(image)
+        if not sample.selected:
+            self.skipped[sample.reason] += 1
+            return None
+        text, layout = ocr(image)
+        self.ocr_frames += 1
+        self.voter.add(*layout_words(text, layout))
+        voted, agreement = self.voter.consensus()
+        if voted and normalize is not None:
+            voted = normalize(voted) or ''
+        self.sampler.agreed(voted == self.text)
+
+        if voted == self.text:
+            self._candidate, self._candidate_runs = None, 0
+            return None
+        if voted == self._candidate:
+            self._candidate_runs += 1
+        else:
+            self._candidate, self._candidate_runs = voted, 1
+        if self._candidate_runs < STABLE_AFTER:
+            return None
+        self.text, self._candidate, self._candidate_runs = voted, None, 0
+        return StreamUpdate(sample.index, voted, agreement, len(self.voter.observations))
+
+    def to_dict(self) -> dict:
+        return {
+            'stream_id': self.id,
+            'profile': self.profile,
+            'text': self.text,
+            'frames': self.sampler.frames,
+            'ocr_frames': self.ocr_frames,
+            'skipped': dict(self.skipped),
+        }
+
+
+class FrameStreamStore:
+    """Thread-safe registry of frame streams, evicted after an idle timeout.
+
+    A stream that a request is pushing frames into is not evicted, and each
+    frame restarts its timeout.
+    """
+
+    def __init__(self, idle_timeout: float = 120, max_streams: int = 64, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self.max_streams = max_streams
+        self.clock = clock
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def create(self, profile: str = None) -> FrameStream:
+        now = self.clock()
+        stream = FrameStream(uuid.uuid4().hex, profile, now, now)
+        with self._lock:
+            self._pop_expired(now)
+            while len(self._streams) >= self.max_streams:
+                idle = [s for s in self._streams.values() if not s.receivers]
+                if not idle:
+                    break  # every stream is receiving frames; bounded by the server's threads
+                oldest = min(idle, key=lambda s: s.last_used)
+                del self._streams[oldest.id]
+            self._streams[stream.id] = stream
+        return stream
+
+    def get(self, stream_id: str):
+        now = self.clock()
+        with self._lock:
+            self._pop_expired(now)
+            stream = self._streams.get(stream_id)
+            if stream is not None:
+                stream.last_used = now
+        return stream
+
+    @contextmanager
+    def receiving(self, stream: FrameStream):
+        """Mark a stream as receiving frames for the enclosed block, so it is not evicted."""
+        with self._lock:
+            stream.receivers += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                stream.receivers -= 1
+                stream.last_used = self.clock()
+
+    def touch(self, stream: FrameStream):
+        """Restart a stream's idle timeout (called for every pushed frame)."""
+        stream.last_used = self.clock()
+
+    def close(self, stream_id: str) -> bool:
+        with self._lock:
+            return self._streams.pop(stream_id, None) is not None
+
+    def __len__(self):
+        return len(self._streams)
+
+    def _pop_expired(self, now: float):
+        for stream in [s for s in self._streams.values()
+                       if not s.receivers and now - s.last_used > self.idle_timeout]:
+            del self._streams[stream.id]
+
+
+def read_frames(stream, max_frame_bytes: int = MAX_FRAME_BYTES):
+    """
+    Yield encoded frames from a length-prefixed byte stream, as they arrive.
+
+    Each frame is a 4-byte big-endian length followed by that many bytes of
+    JPEG/PNG data. Raises ValueError on a truncated or oversized frame.
+    """
+    while True:
+        header = stream.read(4)
+        if not header:
+            return
+        while len(header) < 4:
+            more = stream.read(4 - len(header))
+            if not more:
+                raise ValueError('Truncated frame header')
+            header += more
+        (size,) = struct.unpack('>I', header)
+        if size > max_frame_bytes:
+            raise ValueError(f'Frame of {size} bytes exceeds the {max_frame_bytes} byte limit')
+        data = bytearray()
+        while len(data) < size:
+            chunk = stream.read(size - len(data))
+            if not chunk:
+                raise ValueError('Truncated frame')
+            data += chunk
+        yield bytes(data)
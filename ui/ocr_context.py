@@ -0,0 +1,169 @@
+"""
+OCR Context Builder
+Chooses which OCR text goes into the VQA prompt.
+
+The whole OCR text of a dense document can add hundreds of tokens to the
+prompt, which slows prefill and can overflow the language model's context.
+Instead, OCR lines are ranked by how many of the question's words they share
+and by Tesseract's confidence, and the best lines are packed into a token
+budget. Token counts come from the VQA backend's tokenizer when one is
+available; otherwise each word and punctuation mark counts as one token.
+The chosen lines keep their reading order.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+
+# Prompt tokens allowed for injected OCR text; 0 injects the full text (no filtering)
+DEFAULT_TOKEN_BUDGET = int(os.environ.get('VQA_OCR_CONTEXT_TOKENS', '64'))
+# Lines whose mean word confidence (0-100) is below this are never injected
+DEFAULT_MIN_LINE_CONFIDENCE = float(os.environ.get('VQA_OCR_CONTEXT_MIN_CONF', '30'))
+# Weight of line confidence (0-1) relative to question overlap (0-1) in the ranking
+CONFIDENCE_WEIGHT = 0.5
+# Words per pseudo-line when only the flat OCR text is available
+WORDS_PER_LINE = 8
+
+_WORD = re.compile(r"\w+")
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+# Question words that say nothing about which text is relevant
+_QUESTION_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'of', 'on', 'in', 'at', 'to', 'for',
+    'and', 'or', 'it', 'this', 'that', 'what', 'which', 'who', 'how', 'does', 'do', 'did',
+    'say', 'says', 'read', 'text', 'written', 'there', 'image', 'picture', 'photo', 'here',
+    'me', 'can', 'you', 'tell', 'any', 'anything',
+})
+
+
+def approximate_tokens(texts: list) -> list:
+    """Token estimate per text: one per word or punctuation mark (BPE never gives fewer)."""
+    return [len(_PIECE.findall(text)) for text in texts]
+
+
+@dataclass
+class ContextLine:
+    text: str
+    confidence: float | None  # mean word confidence 0-100, None if unknown
+    index: int  # position in reading order
+
+
+@dataclass
+class OcrContext:
+    text: str
+    tokens: int
+    budget: int
+    lines_used: int
+    lines_total: int
+    full_tokens: int
+    token_counter: str = 'approximate'
+
+    def to_dict(self) -> dict:
+        return {
+            'tokens': self.tokens,
+            'budget': self.budget,
+            'lines_used': self.lines_used,
+            'lines_total': self.lines_total,
+            'full_tokens': self.full_tokens,
+            'token_counter': self.token_counter,
+        }
+
+
+def context_lines(ocr_text: str, layout=None, normalize=None) -> list:
+    """
+    OCR lines to rank.
+
+    Args:
+        ocr_text (str): Normalized OCR text (used when there is no layout)
+        layout: ocr_app OcrLayout of the OCR pass, or None
+        normalize: Function applied to each layout line (e.g. normalize_ocr)
+
+    Returns:
+        list: ContextLine per non-empty line, in reading order
+    """
+    lines = []
+    if layout is not None and len(layout):
+        for line in layout.lines():
+            text = normalize(line['text']) if normalize else line['text']
+            if text and text.strip():
+                lines.append(ContextLine(text.strip(), line['conf'], len(lines)))
+        return lines
+    words = (ocr_text or '').split()
+    for start in range(0, len(words), WORDS_PER_LINE):
+        lines.append(ContextLine(' '.join(words[start:start + WORDS_PER_LINE]), None, len(lines)))
+    return lines
+
+
+def question_terms(question: str) -> set:
+    return {w for w in _WORD.findall(question.lower()) if w not in _QUESTION_STOPWORDS}
+
+
+def rank_lines(question: str, lines: list) -> list:
+    """Lines ordered by question overlap plus weighted confidence, best first."""
+    terms = question_terms(question)
+
+    def score(line):
+        overlap = len(terms & set(_WORD.findall(line.text.lower()))) / len(terms) if terms else 0.0
+        confidence = 1.0 if line.confidence is None else line.confidence / 100.0
+        return overlap + CONFIDENCE_WEIGHT * confidence
+
+    return sorted(lines, key=lambda line: (-score(line), line.index))
+
+
+def build_ocr_context(question: str, lines: list, budget: int = DEFAULT_TOKEN_BUDGET,
+                      count_tokens=approximate_tokens,
+                      min_confidence: float = DEFAULT_MIN_LINE_CONFIDENCE) -> OcrContext:
+    """
+    Pack the most relevant OCR lines into a token budget.
+
+    Args:
+        question (str): User's question
+        lines (list): ContextLine list from context_lines()
+        budget (int): Maximum tokens of injected text; <= 0 injects every line
+        count_tokens: Function mapping a list of texts to their token counts
+        min_confidence (float): Drop lines with a lower mean confidence
+
+    Returns:
+        OcrContext: The text to inject (lines in reading order) and its token count
+    """
+    total = len(lines)
+    full_text = ' '.join(line.text for line in lines)
+    full_tokens = count_tokens([full_text])[0] if full_text else 0
+    if budget <= 0:
+        return OcrContext(full_text, full_tokens, budget, total, total, full_tokens)
+
+    candidates = [line for line in lines
+                  if line.confidence is None or line.confidence >= min_confidence]
+    if len(candidates) < total:
+        text = ' '.join(line.text for line in candidates)
+        tokens = count_tokens([text])[0] if text else 0
+    else:
+        text, tokens = full_text, full_tokens
+    if tokens <= budget:
+        return OcrContext(text, tokens, budget, len(candidates), total, full_tokens)
+
+    ranked = rank_lines(question, candidates)
+    costs = count_tokens([line.text for line in ranked]) if ranked else []
+    chosen, used = [], 0
+    for line, cost in zip(ranked, costs):
+        if used + cost <= budget:
+            chosen.append(line)
+            used += cost
+    if not chosen and ranked:
+        # even the best line is over budget: keep as many of its words as fit
+        words = ranked[0].text.split()
+        prefixes = [' '.join(words[:n]) for n in range(1, len(words) + 1)]
+        fitting = [p for p, cost in zip(prefixes, count_tokens(prefixes)) if cost <= budget]
+        if fitting:
+            chosen = [ContextLine(fitting[-1], ranked[0].confidence, ranked[0].index)]
+
+    chosen.sort(key=lambda line: line.index)
+    text = ' '.join(line.text for line in chosen)
+    # joined lines can tokenize differently than their sum; drop the weakest until it fits
+    tokens = count_tokens([text])[0] if text else 0
+    while tokens > budget and len(chosen) > 1:
+        weakest = max(chosen, key=lambda line: ranked.index(line))
+        chosen.remove(weakest)
+        text = ' '.join(line.text for line in chosen)
+        tokens = count_tokens([text])[0]
+    return OcrContext(text, tokens, budget, len(chosen), total, full_tokens)
@@ -0,0 +1,191 @@
+"""
+Question Routing Engine
+Decides whether a question should be answered by OCR or VQA.
+
+All keywords are compiled once into a single regex over word boundaries,
+factored by common prefix, so a question is scanned in one left-to-right
+pass by the regex engine with whole-word matching ("bread" no longer counts
+as "read", "design" as "sign"). At each position the longest keyword wins,
+and common inflections ("signs", "reading", "labeled", "dated") still match.
+Scores are cached per distinct question.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# (keyword, weight) - questions about text content
+OCR_KEYWORDS = [
+    ('read', 1.0), ('text', 1.0), ('say', 1.0), ('said', 1.0), ('written', 1.0), ('word', 1.0),
+    ('letter', 1.0), ('sign', 1.0), ('label', 1.0), ('caption', 1.0), ('title', 1.0),
+    ('heading', 1.0), ('number', 1.0), ('digit', 1.0), ('price', 1.0), ('address', 1.0),
+    ('phone', 1.0), ('email', 1.0), ('url', 1.0), ('date', 1.0), ('name on', 1.0),
+    ('writing', 1.0),
+]
+
+# (keyword, weight) - questions about visual content
+VQA_KEYWORDS = [
+    ('what color', 1.0), ('how many', 1.0), ('where is', 1.0), ('who is', 1.0),
+    ('what is', 1.0), ('describe', 1.0), ('show', 1.0), ('look like', 1.0),
+    ('doing', 1.0), ('wearing', 1.0), ('holding', 1.0), ('scene', 1.0),
+    ('background', 1.0), ('object', 1.0), ('person', 1.0), ('animal', 1.0),
+]
+
+# Steepness of the logistic mapping from score margin to confidence
+CONFIDENCE_SCALE = 1.5
+
+
+@dataclass
+class RoutingDecision:
+    module: str
+    confidence: float
+    ocr_score: float
+    vqa_score: float
+    matched: tuple = field(default_factory=tuple)
+
+    def to_dict(self) -> dict:
+        return {
+            'module': self.module,
+            'confidence': round(self.confidence, 4),
+            'ocr_score': self.ocr_score,
+            'vqa_score': self.vqa_score,
+            'matched': list(self.matched),
+        }
+
+
+# Endings accepted after a keyword token ("signs", "reading", "labeled"); tokens
+# ending in "e" drop it first and take these instead ("dates", "dated", "dating")
+_ENDINGS = ('', 's', 'es', 'ing', 'ed')
+_ENDINGS_E = ('e', 'es', 'ed', 'ing')
+
+_WORD = re.compile(r"\w+")
+
+
+def _inflections(token: str) -> tuple:
+    """(stem, endings) of a keyword token."""
+    return (token[:-1], _ENDINGS_E) if token.endswith('e') else (token, _ENDINGS)
+
+
+def _atoms(keyword: str) -> list:
+    """A keyword as regex atoms: its stem characters, then an inflection, per token."""
+    atoms = []
+    for n, token in enumerate(keyword.split()):
+        if n:
+            atoms.append(r'\W+')
+        stem, endings = _inflections(token)
+        atoms.extend(re.escape(c) for c in stem)
+        # longest ending first, so the greedy match takes "signing" over "sign"
+        atoms.append('(?:' + '|'.join(sorted(endings, key=len, reverse=True)) + ')')
+    return atoms
+
+
+def _render(node: dict) -> str:
+    """Regex for a trie node; a keyword that ends here is the last (empty)
+    alternative, so every longer keyword is tried first and the longest wins."""
+    branches = [atom + _render(child) for atom, child in node.items() if atom is not None]
+    if None in node:
+        branches.append('')
+    return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+
+def _compile(ocr_keywords, vqa_keywords):
+    """
+    One regex over word boundaries with the keywords factored into a prefix
+    trie, so the engine branches once per character instead of trying every
+    keyword, and a dict from every inflected form to its
+    (keyword, module, weight) entry.
+
+    The pattern has no capturing groups, so findall() returns the matched
+    strings without building a match object per keyword.
+    """
+    trie = {}
+    forms = {}
+    for module, keywords in (('ocr', ocr_keywords), ('vqa', vqa_keywords)):
+        for kw, weight in keywords:
+            kw = kw.lower()
+            node = trie
+            for atom in _atoms(kw):
+                node = node.setdefault(atom, {})
+            node[None] = kw
+            variants = ['']
+            for token in kw.split():
+                stem, endings = _inflections(token)
+                variants = [f'{v} {stem}{e}'.lstrip() for v in variants for e in endings]
+            forms.update(dict.fromkeys(variants, (kw, module, weight)))
+    return re.compile(r'(?<!\w)' + _render(trie) + r'\b'), forms
+
+
+_KEYWORDS, _FORMS = _compile(OCR_KEYWORDS, VQA_KEYWORDS)
+
+
+@lru_cache(maxsize=4096)
+def _scores(question_lower: str) -> tuple:
+    """(ocr score, vqa score, matched keywords) of a lowercased question; users
+    ask the same few questions ("what does the sign say?") over and over."""
+    ocr_score = 0.0
+    vqa_score = 0.0
+    matched = []
+    for text in _KEYWORDS.findall(question_lower):
+        # multi-word keywords may be matched across other separators ("name, on")
+        kw, module, weight = _FORMS.get(text) or _FORMS[' '.join(_WORD.findall(text))]
+        matched.append(kw)
+        if module == 'ocr':
+            ocr_score += weight
+        else:
+            vqa_score += weight
+    return ocr_score, vqa_score, tuple(matched)
+
+
+def _decide(ocr_score: float, vqa_score: float, matched: tuple) -> RoutingDecision:
+    # Default to VQA if no clear match
+    module = 'ocr' if ocr_score > vqa_score else 'vqa'
+    margin = abs(ocr_score - vqa_score)
+    confidence = 1.0 / (1.0 + math.exp(-CONFIDENCE_SCALE * margin))
+    return RoutingDecision(module, confidence, ocr_score, vqa_score, matched)
+
+
+def route(question: str) -> RoutingDecision:
+    """
+    Score a question against the OCR and VQA keyword sets.
+
+    Args:
+        question (str): User's question about the image
+
+    Returns:
+        RoutingDecision: chosen module ('ocr' or 'vqa'), confidence in [0.5, 1),
+        per-module scores and the keywords that matched
+    """
+    return _decide(*_scores((question or "").lower()))
+
+
+def route_batch(questions) -> list:
+    """
+    Route many questions (e.g. a whole evaluation CSV) in one call.
+
+    Evaluation sets ask the same question about many images, so each distinct
+    question is scanned once. The scan bypasses route()'s cache, so a large
+    batch does not evict the questions live requests keep asking.
+    """
+    scored = {}
+    decisions = []
+    for question in questions:
+        key = (question or "").lower()
+        scores = scored.get(key)
+        if scores is None:
+            scores = scored[key] = _scores.__wrapped__(key)
+        decisions.append(_decide(*scores))
+    return decisions
+
+
+def determine_module(question):
+    """
+    Determine whether to use OCR or VQA based on the question.
+
+    Args:
+        question (str): User's question about the image
+
+    Returns:
+        str: 'ocr' or 'vqa'
+    """
+    return route(question).module
@@ -0,0 +1,181 @@
+"""
+Image Sessions
+Keeps one uploaded image on the server so follow-up questions do not re-upload it.
+
+A session owns the saved image file and the OCR results computed for it (OCR
+does not depend on the question). The VQA module keeps the image's vision
+embeddings/prefix KV-cache keyed by the image content, so they stay warm for
+follow-up questions too and are dropped when the session goes away.
+
+Sessions expire after an idle timeout, and the total bytes held across
+sessions are capped; when a new session, or the OCR results a question adds,
+would exceed the cap the least recently used sessions are evicted first. A
+session is never evicted while a question about it is running.
+"""
+
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Seconds without a question before a session is evicted
+DEFAULT_IDLE_TIMEOUT = 600
+# Cap on image bytes + cached OCR text held across all sessions
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+@dataclass
+class Session:
+    id: str
+    image_path: str
+    image_bytes: int
+    width: int
+    height: int
+    created: float
+    last_used: float
+    questions: int = 0
+    active: int = 0  # questions currently running on this session; never evicted while > 0
+    closed: bool = False  # closed while active; released when the last question ends
+    # (OCR profile, gated) -> (OCR text, OcrLayout or None) for this image
+    ocr_results: dict = field(default_factory=dict)
+
+    @property
+    def size_bytes(self) -> int:
+        return self.image_bytes + sum(len(text or '') + (layout.nbytes if layout is not None else 0)
+                                      for text, layout in list(self.ocr_results.values()))
+
+    def to_dict(self, now: float, idle_timeout: float) -> dict:
+        return {
+            'session_id': self.id,
+            'image': {'width': self.width, 'height': self.height, 'bytes': self.image_bytes},
+            'questions': self.questions,
+            'expires_in': round(max(0.0, idle_timeout - (now - self.last_used)), 1),
+        }
+
+
+class SessionStore:
+    """Thread-safe registry of sessions with idle-timeout and memory-cap eviction."""
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 max_bytes: int = DEFAULT_MAX_BYTES, on_evict=None, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.clock = clock
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, image_path: str, width: int, height: int) -> Session:
+        """Register a saved image; evicts expired and then least recently used sessions."""
+        now = self.clock()
+        session = Session(uuid.uuid4().hex, image_path, os.path.getsize(image_path),
+                          width, height, now, now)
+        with self._lock:
+            evicted = self._pop_expired(now) + self._pop_over_cap(session.size_bytes)
+            self._sessions[session.id] = session
+        self._release(evicted)
+        return session
+
+    def get(self, session_id: str):
+        """Return the live session and mark it used, or None if unknown or expired."""
+        now = self.clock()
+        with self._lock:
+            evicted = self._pop_expired(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = now
+        self._release(evicted)
+        return session
+
+    @contextmanager
+    def use(self, session_id: str):
+        """
+        The live session (or None) for the enclosed question.
+
+        The session is not evicted or released while in use. Afterwards the byte
+        cap is checked again, since the question may have added OCR results.
+        """
+        now = self.clock()
+        with self._lock:
+            evicted = self._pop_expired(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = now
+                session.active += 1
+        self._release(evicted)
+        if session is None:
+            yield None
+            return
+        try:
+            yield session
+        finally:
+            with self._lock:
+                session.active -= 1
+                session.last_used = self.clock()
+                evicted = self._pop_over_cap(0, keep=session)
+                if session.closed and not session.active:
+                    evicted.append(session)
+            self._release(evicted)
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None and session.active:
+                session.closed = True  # use() releases it when the question ends
+                return True
+        self._release([session] if session else [])
+        return session is not None
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            evicted = self._pop_expired(self.clock())
+        self._release(evicted)
+        return len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            'active': len(sessions),
+            'bytes': sum(s.size_bytes for s in sessions),
+            'max_bytes': self.max_bytes,
+            'idle_timeout_seconds': self.idle_timeout,
+        }
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _pop_expired(self, now: float) -> list:
+        expired = [s for s in self._sessions.values()
+                   if not s.active and now - s.last_used > self.idle_timeout]
+        for session in expired:
+            del self._sessions[session.id]
+        return expired
+
+    def _pop_over_cap(self, incoming: int, keep: Session = None) -> list:
+        """Pop least recently used idle sessions until the held bytes plus `incoming` fit the cap."""
+        used = sum(s.size_bytes for s in self._sessions.values())
+        evicted = []
+        for old in sorted(self._sessions.values(), key=lambda s: s.last_used):
+            if used + incoming <= self.max_bytes:
+                break
+            if old.active or old is keep:
+                continue
+            used -= old.size_bytes
+            evicted.append(self._sessions.pop(old.id))
+        return evicted
+
+    def _release(self, sessions: list):
+        for session in sessions:
+            if self.on_evict is not None:
+                try:
+                    self.on_evict(session)
+                except Exception as e:
+                    print(f"[Sessions] Eviction hook failed for {session.id}: {e}")
+            try:
+                if os.path.exists(session.image_path):
+                    os.remove(session.image_path)
+            except OSError:
+                pass
@@ -0,0 +1,339 @@
+"""
+Unit tests for route-first execution in /api/query
+"""
+
+import base64
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class AppClientBase:
+    """Flask test client with the OCR and VQA modules replaced by recorders"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        pytest.importorskip("flask")
+        PIL = pytest.importorskip("PIL.Image")
+        from ui import app as app_module
+        self.app_module = app_module
+        self.calls = []
+        self.ocr_result = "STOP"
+        self.ocr_layout = None
+        self.vqa_result = "a red car"
+
+        def fake_ocr(image_path, question, detect_text_first=True, profile=None):
+            self.calls.append(('ocr', question))
+            self.detect_text_first = detect_text_first
+            self.ocr_profile = profile
+            return self.ocr_result, self.ocr_layout
+
+        def fake_vqa(image_path, question, backend=None):
+            self.calls.append(('vqa', question))
+            self.vqa_backend = backend
+            return self.vqa_result
+
+        monkeypatch.setattr(app_module, 'process_with_ocr', fake_ocr)
+        monkeypatch.setattr(app_module, 'process_with_vqa', fake_vqa)
+        buf = io.BytesIO()
+        PIL.new('RGB', (32, 32), color='white').save(buf, format='PNG')
+        self.image_b64 = base64.b64encode(buf.getvalue()).decode()
+        return app_module.app.test_client()
+
+    def _query(self, client, question, **extra):
+        form = {'question': question, 'image_base64': self.image_b64, **extra}
+        return client.post('/api/query', data=form).get_json()
+
+
+class TestRouteFirstExecution(AppClientBase):
+    """Test cases for running only the routed module with lazy fallback"""
+
+    def test_confident_ocr_question_skips_vqa(self, client):
+        from monitoring.metrics import MODULE_SKIPS
+        before = MODULE_SKIPS.get(module='vqa')
+        data = self._query(client, "What does the sign say?")
+        assert [m for m, _ in self.calls] == ['ocr']
+        assert data['module'] == 'ocr' and data['answer'] == "STOP"
+        assert data['details']['modules_skipped'] == ['vqa']
+        assert data['details']['vqa_answer'] is None
+        assert MODULE_SKIPS.get(module='vqa') == before + 1
+
+    def test_confident_vqa_question_skips_ocr(self, client):
+        data = self._query(client, "What color is the car?")
+        assert [m for m, _ in self.calls] == ['vqa']
+        assert data['module'] == 'vqa'
+        assert data['details']['modules_skipped'] == ['ocr']
+
+    def test_failed_module_falls_back_lazily(self, client):
+        self.ocr_result = "OCR Error: tesseract not found"
+        data = self._query(client, "What does the sign say?")
+        assert [m for m, _ in self.calls] == ['ocr', 'vqa']
+        assert data['module'] == 'vqa' and data['answer'] == "a red car"
+        assert self.detect_text_first is False
+        assert data['details']['modules_skipped'] == []
+
+    def test_uncertain_question_runs_both_with_ocr_context(self, client):
+        data = self._query(client, "Anything interesting here?")
+        assert [m for m, _ in self.calls] == ['ocr', 'vqa']
+        assert "Detected text in image: STOP" in self.calls[1][1]
+        assert data['module'] == 'vqa'
+        # OCR only provides context here, so the text-presence gate applies
+        assert self.detect_text_first is True
+
+    def test_ocr_context_tokens_are_reported(self, client):
+        data = self._query(client, "Anything interesting here?")
+        assert data['details']['ocr_context']['tokens'] == 1
+        assert data['details']['ocr_context']['token_counter'] in ('tokenizer', 'approximate')
+
+    def test_long_ocr_text_is_trimmed_to_budget(self, client, monkeypatch):
+        monkeypatch.setattr(self.app_module, 'DEFAULT_TOKEN_BUDGET', 16)
+        monkeypatch.setattr(self.app_module, 'vqa_token_counter',
+                            lambda backend=None: (self.app_module.approximate_tokens, 'approximate'))
+        self.ocr_result = " ".join(f"FILLER{i}" for i in range(200)) + " OPEN UNTIL 9PM"
+        data = self._query(client, "Anything open until late here?")
+        context = data['details']['ocr_context']
+        assert context['tokens'] <= 16 < context['full_tokens']
+        assert "OPEN UNTIL 9PM" in self.calls[1][1]
+        assert "FILLER100" not in self.calls[1][1]
+
+    def test_threshold_of_one_always_runs_both(self, client, monkeypatch):
+        monkeypatch.setattr(self.app_module, 'ROUTE_FIRST_MIN_CONFIDENCE', 1.0)
+        self._query(client, "What color is the car?")
+        assert [m for m, _ in self.calls] == ['ocr', 'vqa']
+
+
+class TestVQABackendSelection(AppClientBase):
+    """Test cases for per-request and per-route VQA backend selection"""
+
+    def test_default_backend_is_left_to_vqa_module(self, client):
+        data = self._query(client, "What color is the car?")
+        assert self.vqa_backend is None
+        assert data['details']['vqa_backend'] is None
+
+    def test_request_selects_backend(self, client):
+        data = self._query(client, "What color is the car?", vqa_backend='stub')
+        assert self.vqa_backend == 'stub'
+        assert data['details']['vqa_backend'] == 'stub'
+
+    def test_unknown_backend_is_rejected(self, client):
+        form = {'question': "What color is the car?", 'image_base64': self.image_b64,
+                'vqa_backend': 'nonexistent'}
+        resp = client.post('/api/query', data=form)
+        assert resp.status_code == 400
+        assert self.calls == []
+
+    def test_route_backend_applies_to_matching_questions(self, client, monkeypatch):
+        monkeypatch.setattr(self.app_module, 'VQA_ROUTE_BACKENDS',
+                            self.app_module._parse_route_backends("what color=blip-base"))
+        self._query(client, "What color is the car?")
+        assert self.vqa_backend == 'blip-base'
+        self._query(client, "Describe the scene")
+        assert self.vqa_backend is None
+        # an explicit request still wins over the route
+        self._query(client, "What color is the car?", vqa_backend='torch')
+        assert self.vqa_backend == 'blip2'
+
+
+class TestOcrProfileSelection(AppClientBase):
+    """Test cases for choosing the OCR profile per question"""
+
+    @pytest.fixture(autouse=True)
+    def ocr_module(self):
+        pytest.importorskip("cv2")
+        pytest.importorskip("pytesseract")
+
+    def test_profile_follows_question_type(self, client):
+        data = self._query(client, "What is the price on the tag?")
+        assert self.ocr_profile == 'digits'
+        assert data['details']['ocr_profile'] == 'digits'
+        self._query(client, "What does the sign say?")
+        assert self.ocr_profile == 'signs'
+
+    def test_request_overrides_profile(self, client):
+        self._query(client, "What does the sign say?", ocr_profile='documents')
+        assert self.ocr_profile == 'documents'
+
+    def test_unknown_profile_is_rejected(self, client):
+        form = {'question': "What does the sign say?", 'image_base64': self.image_b64,
+                'ocr_profile': 'nonexistent'}
+        assert client.post('/api/query', data=form).status_code == 400
+        assert self.calls == []
+
+    def test_auto_profile_can_be_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(self.app_module, 'OCR_AUTO_PROFILE', False)
+        self._query(client, "What is the price on the tag?")
+        assert self.ocr_profile == 'default'
+
+
+class TestOcrLayoutOption(AppClientBase):
+    """Test cases for the optional structured OCR output in details"""
+
+    @pytest.fixture
+    def layout(self, client):
+        pytest.importorskip("cv2")
+        pytest.importorskip("pytesseract")
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'ocr' / 'ocr-app' / 'src'))
+        from ocr_app.layout import OcrLayout
+        self.ocr_layout = OcrLayout(["STOP", "AHEAD"], [[0, 0, 10, 5], [12, 0, 10, 5]], [95, 30], [0, 0])
+        return self.ocr_layout
+
+    def test_layout_is_omitted_by_default(self, client, layout):
+        data = self._query(client, "What does the sign say?")
+        assert 'ocr_layout' not in data['details']
+
+    def test_layout_on_request(self, client, layout):
+        data = self._query(client, "What does the sign say?", ocr_layout='1')
+        assert data['details']['ocr_layout']['words'] == ["STOP", "AHEAD"]
+        assert data['details']['ocr_layout']['lines'][0]['text'] == "STOP AHEAD"
+
+    def test_layout_filtered_by_confidence(self, client, layout):
+        data = self._query(client, "What does the sign say?", ocr_layout='true', ocr_min_conf='50')
+        assert data['details']['ocr_layout']['words'] == ["STOP"]
+
+    def test_context_lines_follow_profile_spell_correction(self, client, layout):
+        from ocr_app.layout import OcrLayout
+        self.ocr_layout = OcrLayout(["TOTAL", "5", "ITEMS"], [[0, 0, 10, 5], [12, 0, 4, 5], [18, 0, 10, 5]],
+                                    [95, 95, 95], [0, 0, 0])
+        digits = self.app_module.build_vqa_context("How many?", "TOTAL 5 ITEMS", self.ocr_layout,
+                                                   profile='digits')
+        assert digits.text == "TOTAL 5 ITEMS"
+        # normalize_ocr drops one-character fragments such as "5"
+        default = self.app_module.build_vqa_context("How many?", "TOTAL ITEMS", self.ocr_layout)
+        assert default.text == "TOTAL ITEMS"
+
+    def test_invalid_min_conf_is_rejected(self, client, layout):
+        form = {'question': "What does the sign say?", 'image_base64': self.image_b64,
+                'ocr_layout': '1', 'ocr_min_conf': 'high'}
+        assert client.post('/api/query', data=form).status_code == 400
+        assert self.calls == []
+
+
+class TestDocumentStreaming(AppClientBase):
+    """Test cases for page-by-page answers to multi-page uploads"""
+
+    @pytest.fixture
+    def document(self, client, monkeypatch):
+        pytest.importorskip("cv2")
+        pytest.importorskip("pytesseract")
+        from PIL import Image
+        frames = [Image.new('L', (32, 32), shade) for shade in (0, 128, 255)]
+        buf = io.BytesIO()
+        frames[0].save(buf, format='TIFF', save_all=True, append_images=frames[1:])
+        self.pages_seen = []
+
+        def fake_pages(image_path, profile=None):
+            self.pages_seen.append((image_path, profile))
+            for index in range(3):
+                yield index, f"PAGE {index + 1}", None
+
+        monkeypatch.setattr(self.app_module, 'process_document_with_ocr', fake_pages)
+        return base64.b64encode(buf.getvalue()).decode()
+
+    def _stream(self, client, document, **extra):
+        form = {'question': "What does the letter say?", 'image_base64': document, **extra}
+        response = client.post('/api/query', data=form)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        return response, lines
+
+    def test_one_line_per_page_then_summary(self, client, document):
+        response, lines = self._stream(client, document)
+        assert response.mimetype == 'application/x-ndjson'
+        assert [line.get('page') for line in lines[:-1]] == [1, 2, 3]
+        assert [line['answer'] for line in lines[:-1]] == ["PAGE 1", "PAGE 2", "PAGE 3"]
+        assert lines[-1]['done'] is True and lines[-1]['pages'] == 3
+        assert self.calls == []  # single-image OCR/VQA never ran
+
+    def test_upload_is_removed_after_streaming(self, client, document):
+        self._stream(client, document)
+        image_path, _ = self.pages_seen[0]
+        assert image_path.endswith('.tiff')
+        assert not Path(image_path).exists()
+
+    def test_profile_is_passed_to_pages(self, client, document):
+        _, lines = self._stream(client, document, ocr_profile='documents')
+        assert self.pages_seen[0][1] == 'documents'
+        assert lines[0]['details']['ocr_profile'] == 'documents'
+
+    def test_single_images_are_not_streamed(self, client, document):
+        data = self._query(client, "What does the sign say?")
+        assert data['answer'] == "STOP"
+        assert self.pages_seen == []
+
+
+class TestFrameStreams(AppClientBase):
+    """Test cases for reading text from a stream of camera frames"""
+
+    @pytest.fixture
+    def frames(self, client, monkeypatch):
+        cv2 = pytest.importorskip("cv2")
+        import numpy as np
+        from PIL import Image
+        self.frame_calls = []
+
+        def fake_frame_ocr(image, profile=None):
+            self.frame_calls.append(profile)
+            return "EXIT", None
+
+        monkeypatch.setattr(self.app_module, 'process_frame_with_ocr', fake_frame_ocr)
+        monkeypatch.setattr(self.app_module, '_normalize_stream_text', lambda text, profile=None: text)
+        arr = np.full((240, 320, 3), 200, dtype=np.uint8)
+        cv2.putText(arr, "EXIT", (40, 140), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (0, 0, 0), 6)
+        buf = io.BytesIO()
+        Image.fromarray(arr).save(buf, format='PNG')
+        return buf.getvalue()
+
+    def _create(self, client, **body):
+        response = client.post('/api/streams', json=body)
+        assert response.status_code == 201
+        return response.get_json()['stream_id']
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_length_prefixed_frames_emit_stable_text_once(self, client, frames):
+        import struct
+        stream_id = self._create(client)
+        body = b''.join(struct.pack('>I', len(frames)) + frames for _ in range(30))
+        response = client.post(f'/api/streams/{stream_id}/frames', data=body,
+                               content_type='application/octet-stream')
+        assert response.mimetype == 'application/x-ndjson'
+        lines = self._lines(response)
+        assert [line['text'] for line in lines if line['event'] == 'text'] == ["EXIT"]
+        summary = lines[-1]
+        assert summary['event'] == 'summary' and summary['frames_received'] == 30
+        assert summary['ocr_frames'] == len(self.frame_calls) < 30
+        assert self.frame_calls[0] == 'signs'
+
+    def test_state_carries_across_requests(self, client, frames):
+        stream_id = self._create(client, ocr_profile='labels')
+        for _ in range(3):
+            response = client.post(f'/api/streams/{stream_id}/frames',
+                                   data={'frame': [(io.BytesIO(frames), 'f.png') for _ in range(4)]},
+                                   content_type='multipart/form-data')
+            summary = self._lines(response)[-1]
+        assert summary['frames'] == 12 and summary['text'] == "EXIT"
+        assert summary['profile'] == 'labels'
+
+    def test_unknown_stream_is_404(self, client, frames):
+        assert client.post('/api/streams/nope/frames', data=b'').status_code == 404
+        assert client.delete('/api/streams/nope').status_code == 404
+
+    def test_unknown_profile_is_rejected(self, client, frames):
+        assert client.post('/api/streams', json={'ocr_profile': 'nope'}).status_code == 400
+
+    def test_close_stream(self, client, frames):
+        stream_id = self._create(client)
+        assert client.delete(f'/api/streams/{stream_id}').get_json()['success'] is True
+        assert client.post(f'/api/streams/{stream_id}/frames', data=b'').status_code == 404
+
+    def test_bad_frame_ends_with_error_summary(self, client, frames):
+        stream_id = self._create(client)
+        response = client.post(f'/api/streams/{stream_id}/frames', data=b'\x00\x00\x00\x05abc',
+                               content_type='application/octet-stream')
+        summary = self._lines(response)[-1]
+        assert summary['success'] is False and 'Truncated' in summary['error']
@@ -0,0 +1,210 @@
+"""
+Unit tests for camera frame sampling and temporal OCR voting
+"""
+
+import io
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from ui.frame_stream import (
+    FrameSampler, FrameStream, FrameStreamStore, TextVoter, read_frames, sharpness,
+)
+
+
+def sign(text="EXIT", shift=0, blur=0):
+    """A sign-like RGB frame, optionally shifted (camera moved) or blurred (shake)."""
+    arr = np.full((240, 320, 3), 200, dtype=np.uint8)
+    cv2.putText(arr, text, (40 + shift, 140), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (0, 0, 0), 6)
+    if blur:
+        arr = cv2.GaussianBlur(arr, (0, 0), blur)
+    return arr
+
+
+class TestFrameSampler:
+    """Test cases for choosing the frames worth OCR'ing"""
+
+    def test_blur_lowers_sharpness(self):
+        gray = cv2.cvtColor(sign(), cv2.COLOR_RGB2GRAY)
+        blurred = cv2.cvtColor(sign(blur=4), cv2.COLOR_RGB2GRAY)
+        assert sharpness(gray) > 10 * sharpness(blurred)
+
+    def test_first_sharp_frame_is_selected(self):
+        sample = FrameSampler().sample(sign())
+        assert sample.selected and sample.reason == 'first'
+
+    def test_blurred_frames_are_skipped(self):
+        sample = FrameSampler().sample(sign(blur=6))
+        assert not sample.selected and sample.reason == 'blur'
+
+    def test_moving_camera_is_skipped(self):
+        sampler = FrameSampler()
+        sampler.sample(sign())
+        sample = sampler.sample(sign(shift=80))
+        assert not sample.selected and sample.reason == 'motion'
+
+    def test_still_scene_is_resampled_after_gap(self):
+        sampler = FrameSampler(min_gap=3)
+        reasons = [sampler.sample(sign()).reason for _ in range(5)]
+        assert reasons == ['first', 'redundant', 'redundant', 'refresh', 'redundant']
+
+    def test_gap_backs_off_while_text_agrees(self):
+        sampler = FrameSampler(min_gap=2, max_gap=8)
+        for _ in range(5):
+            sampler.agreed(True)
+        assert sampler.gap == 8
+        sampler.agreed(False)
+        assert sampler.gap == 2
+
+    def test_new_scene_is_selected_at_once(self):
+        sampler = FrameSampler(max_motion=255, min_gap=100)
+        sampler.sample(sign("EXIT"))
+        sample = sampler.sample(np.full((240, 320, 3), 40, dtype=np.uint8) + sign("OPEN") // 2)
+        assert sample.selected and sample.reason == 'scene'
+
+
+class TestTextVoter:
+    """Test cases for confidence-weighted voting across frames"""
+
+    def test_single_reading_is_returned(self):
+        voter = TextVoter()
+        voter.add(["PLATFORM", "4"], [90, 80])
+        assert voter.consensus()[0] == "PLATFORM 4"
+
+    def test_confident_words_outvote_misreads(self):
+        voter = TextVoter()
+        voter.add(["EMERGENCY", "EXIT"], [91, 90])
+        voter.add(["EMERGFNCY", "EXIT"], [35, 88])
+        voter.add(["EMERGENCY", "EX1T"], [89, 30])
+        text, agreement = voter.consensus()
+        assert text == "EMERGENCY EXIT"
+        assert 0.5 < agreement < 1.0
+
+    def test_word_seen_once_is_dropped(self):
+        voter = TextVoter()
+        for _ in range(3):
+            voter.add(["NO", "PARKING"], [90, 90])
+        voter.add(["NO", "PARKING", "XX"], [90, 90, 99])
+        assert voter.consensus()[0] == "NO PARKING"
+
+    def test_old_readings_leave_the_window(self):
+        voter = TextVoter(window=2)
+        voter.add(["OPEN"], [90])
+        voter.add(["CLOSED"], [60])
+        voter.add(["CLOSED"], [60])
+        assert voter.consensus()[0] == "CLOSED"
+
+    def test_empty_readings_clear_the_text(self):
+        voter = TextVoter(window=3)
+        voter.add(["STOP"], [90])
+        voter.add([], [])
+        voter.add([], [])
+        assert voter.consensus() == ('', 0.0)
+
+
+class TestFrameStream:
+    """Test cases for emitting updates when the stabilized text changes"""
+
+    def _ocr(self, readings):
+        calls = []
+
+        def ocr(image):
+            calls.append(image)
+            return readings[min(len(calls), len(readings)) - 1], None
+        return ocr, calls
+
+    def test_update_after_text_is_stable(self):
+        stream = FrameStream('s', sampler=FrameSampler(min_gap=1))
+        ocr, _ = self._ocr(["EXIT"])
+        updates = [stream.push(sign(), ocr) for _ in range(3)]
+        assert updates[0] is None  # seen once: not stable yet
+        assert updates[1].text == "EXIT" and updates[1].frame == 1
+        assert updates[2] is None  # unchanged
+        assert stream.text == "EXIT"
+
+    def test_skipped_frames_do_not_run_ocr(self):
+        stream = FrameStream('s', sampler=FrameSampler(min_gap=4))
+        ocr, calls = self._ocr(["EXIT"])
+        for frame in [sign(), sign(blur=6), sign(), sign(), sign(), sign()]:
+            stream.push(frame, ocr)
+        assert len(calls) == 2
+        assert stream.skipped == {'blur': 1, 'redundant': 3}
+
+    def test_single_misread_does_not_flip_the_text(self):
+        stream = FrameStream('s', sampler=FrameSampler(min_gap=1, max_gap=1))
+        ocr, _ = self._ocr(["EXIT", "EXIT", "EX1T", "EXIT"])
+        updates = [stream.push(sign(), ocr) for _ in range(4)]
+        assert [u.text for u in updates if u] == ["EXIT"]
+
+    def test_normalize_applies_to_voted_text(self):
+        stream = FrameStream('s', sampler=FrameSampler(min_gap=1))
+        ocr, _ = self._ocr(["exit"])
+        stream.push(sign(), ocr, normalize=str.upper)
+        assert stream.push(sign(), ocr, normalize=str.upper).text == "EXIT"
+
+
+class TestFrameStreamStore:
+    """Test cases for stream registration and idle expiry"""
+
+    def test_idle_streams_expire(self):
+        now = [0.0]
+        store = FrameStreamStore(idle_timeout=10, clock=lambda: now[0])
+        stream = store.create('signs')
+        now[0] = 5
+        assert store.get(stream.id) is stream
+        now[0] = 20
+        assert store.get(stream.id) is None
+
+    def test_oldest_stream_is_evicted_at_capacity(self):
+        now = [0.0]
+        store = FrameStreamStore(max_streams=2, clock=lambda: now[0])
+        first = store.create()
+        now[0] = 1
+        store.create()
+        now[0] = 2
+        store.create()
+        assert store.get(first.id) is None and len(store) == 2
+
+    def test_receiving_stream_is_not_evicted(self):
+        now = [0.0]
+        store = FrameStreamStore(idle_timeout=10, max_streams=1, clock=lambda: now[0])
+        stream = store.create()
+        with store.receiving(stream):
+            now[0] = 30  # a long upload without a frame for longer than the timeout
+            store.create()
+            assert store.get(stream.id) is stream
+        now[0] = 35
+        assert store.get(stream.id) is stream  # the timeout restarts when the upload ends
+
+    def test_each_frame_restarts_the_timeout(self):
+        now = [0.0]
+        store = FrameStreamStore(idle_timeout=10, clock=lambda: now[0])
+        stream = store.create()
+        for t in (8, 16, 24):
+            now[0] = t
+            store.touch(stream)
+        now[0] = 30
+        assert store.get(stream.id) is stream
+
+
+class TestReadFrames:
+    """Test cases for the length-prefixed frame body"""
+
+    def test_frames_are_split(self):
+        body = b''.join(struct.pack('>I', len(p)) + p for p in (b'abc', b'', b'defg'))
+        assert list(read_frames(io.BytesIO(body))) == [b'abc', b'', b'defg']
+
+    def test_truncated_frame_raises(self):
+        with pytest.raises(ValueError):
+            list(read_frames(io.BytesIO(struct.pack('>I', 10) + b'abc')))
+
+    def test_oversized_frame_raises(self):
+        with pytest.raises(ValueError):
+            list(read_frames(io.BytesIO(struct.pack('>I', 100) + b'x' * 100), max_frame_bytes=50))
@@ -0,0 +1,66 @@
+"""
+Unit tests for the relevance-filtered OCR context builder
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ui.ocr_context import (
+    ContextLine, approximate_tokens, build_ocr_context, context_lines, rank_lines,
+)
+
+DOCUMENT = [
+    ContextLine("ACME ELECTRIC COMPANY", 92.0, 0),
+    ContextLine("ACCOUNT NUMBER 1234 5678", 88.0, 1),
+    ContextLine("THANK YOU FOR YOUR BUSINESS", 90.0, 2),
+    ContextLine("AMOUNT DUE $42.10 BY MARCH 3", 85.0, 3),
+    ContextLine("~~ ;; .. %%", 12.0, 4),
+]
+
+
+class TestOcrContext:
+    """Test cases for ranking OCR lines and fitting them to a token budget"""
+
+    def test_short_text_is_injected_whole(self):
+        context = build_ocr_context("What does the sign say?", [ContextLine("STOP", None, 0)], budget=64)
+        assert context.text == "STOP"
+        assert context.tokens == 1 and context.lines_used == 1
+
+    def test_question_overlap_ranks_first(self):
+        ranked = rank_lines("What is the amount due?", DOCUMENT)
+        assert ranked[0].index == 3
+
+    def test_budget_keeps_relevant_lines_in_reading_order(self):
+        context = build_ocr_context("What is the account number and amount due?", DOCUMENT, budget=14)
+        assert context.text == "ACCOUNT NUMBER 1234 5678 AMOUNT DUE $42.10 BY MARCH 3"
+        assert context.tokens <= 14 < context.full_tokens
+        assert context.lines_used == 2 and context.lines_total == 5
+
+    def test_low_confidence_lines_are_dropped(self):
+        context = build_ocr_context("anything", DOCUMENT, budget=30)
+        assert "~~" not in context.text
+
+    def test_oversized_line_is_truncated(self):
+        line = ContextLine(" ".join(["WORD"] * 50), 90.0, 0)
+        context = build_ocr_context("word", [line], budget=5)
+        assert context.text == "WORD WORD WORD WORD WORD" and context.tokens == 5
+
+    def test_zero_budget_injects_everything(self):
+        context = build_ocr_context("anything", DOCUMENT, budget=0)
+        assert context.lines_used == len(DOCUMENT)
+
+    def test_custom_token_counter(self):
+        # a tokenizer that splits every character: nothing but a short prefix fits
+        chars = lambda texts: [len(t.replace(' ', '')) for t in texts]
+        context = build_ocr_context("account", DOCUMENT, budget=8, count_tokens=chars)
+        assert context.text == "ACCOUNT"
+
+    def test_flat_text_is_split_into_pseudo_lines(self):
+        lines = context_lines(" ".join(f"W{i}" for i in range(20)))
+        assert [len(line.text.split()) for line in lines] == [8, 8, 4]
+        assert all(line.confidence is None for line in lines)
+
+    def test_approximate_tokens_counts_words_and_punctuation(self):
+        assert approximate_tokens(["AMOUNT DUE: $42.10", ""]) == [7, 0]
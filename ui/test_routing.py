@@ -0,0 +1,73 @@
+"""
+Unit tests for the question routing engine
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ui.routing import determine_module, route, route_batch
+
+CASES_CSV = Path(__file__).resolve().parents[1] / 'data' / 'cases.csv'
+
+
+class TestRouting:
+    """Test cases for keyword routing"""
+
+    def test_text_questions_go_to_ocr(self):
+        assert determine_module("What does the sign say?") == 'ocr'
+        assert determine_module("Read the text on the label") == 'ocr'
+
+    def test_visual_questions_go_to_vqa(self):
+        assert determine_module("What color is the car?") == 'vqa'
+        assert determine_module("How many people are in the scene?") == 'vqa'
+
+    def test_whole_word_matching(self):
+        decision = route("Is there bread in the design?")
+        assert decision.matched == ()
+        assert decision.module == 'vqa'
+
+    def test_inflections_match(self):
+        assert route("What do the signs say?").matched == ('sign', 'say')
+        assert route("Is anything labeled here?").matched == ('label',)
+
+    def test_common_text_forms_match(self):
+        assert route("What did it say?").matched == ('say',)
+        assert route("What does the note say it said?").matched == ('say', 'said')
+        assert route("When is the receipt dated?").module == 'ocr'
+        assert route("How is the chapter titled?").matched == ('title',)
+        assert route("Which prices are listed?").matched == ('price',)
+
+    def test_multi_word_keyword_inflections(self):
+        assert route("What does it looks like?").matched == ('look like',)
+        assert route("Is there a name, on the badge?").matched == ('name on',)
+
+    def test_longest_keyword_wins(self):
+        assert route("What color is it?").matched == ('what color',)
+
+    def test_tie_defaults_to_vqa_with_low_confidence(self):
+        decision = route("Describe the text")
+        assert decision.module == 'vqa'
+        assert decision.confidence == 0.5
+
+    def test_confidence_grows_with_margin(self):
+        one = route("Read it").confidence
+        two = route("Read the text").confidence
+        assert 0.5 < one < two < 1.0
+
+    def test_empty_question(self):
+        assert route("").module == 'vqa'
+        assert route(None).module == 'vqa'
+
+    def test_batch_matches_single(self):
+        questions = ["What does the sign say?", "What color is the car?", "What does the sign say?"]
+        assert route_batch(questions) == [route(q) for q in questions]
+
+    def test_evaluation_cases_route_correctly(self):
+        with open(CASES_CSV, 'r', encoding='utf-8') as f:
+            rows = [r for r in csv.DictReader(f) if r.get('question', '').strip()]
+        decisions = route_batch(r['question'].strip() for r in rows)
+        for row, decision in zip(rows, decisions):
+            assert decision.module == row['expected_module'].strip().lower(), row['question']
@@ -0,0 +1,137 @@
+"""
+Unit tests for image sessions and the session endpoints
+"""
+
+import base64
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ui.sessions import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _image_file(tmp_path, name, size=1000):
+    path = tmp_path / name
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+class TestSessionStore:
+    """Test cases for idle-timeout and memory-cap eviction"""
+
+    def test_idle_sessions_expire(self, tmp_path):
+        clock = FakeClock()
+        store = SessionStore(idle_timeout=60, clock=clock)
+        session = store.create(_image_file(tmp_path, "a.png"), 10, 10)
+        clock.now += 30
+        assert store.get(session.id) is session
+        clock.now += 61
+        assert store.get(session.id) is None
+        assert not os.path.exists(session.image_path)
+
+    def test_memory_cap_evicts_least_recently_used(self, tmp_path):
+        clock = FakeClock()
+        evicted = []
+        store = SessionStore(max_bytes=2500, on_evict=evicted.append, clock=clock)
+        first = store.create(_image_file(tmp_path, "a.png"), 10, 10)
+        clock.now += 1
+        second = store.create(_image_file(tmp_path, "b.png"), 10, 10)
+        clock.now += 1
+        store.get(first.id)
+        clock.now += 1
+        third = store.create(_image_file(tmp_path, "c.png"), 10, 10)
+        assert [s.id for s in evicted] == [second.id]
+        assert store.get(first.id) is first and store.get(third.id) is third
+        assert store.stats()['bytes'] == 2000
+
+    def test_ocr_results_added_by_a_question_count_towards_cap(self, tmp_path):
+        clock = FakeClock()
+        store = SessionStore(max_bytes=2500, clock=clock)
+        first = store.create(_image_file(tmp_path, "a.png"), 10, 10)
+        clock.now += 1
+        second = store.create(_image_file(tmp_path, "b.png"), 10, 10)
+        with store.use(second.id) as session:
+            session.ocr_results[(None, False)] = ("x" * 1000, None)
+        assert store.get(first.id) is None and store.get(second.id) is second
+        assert not os.path.exists(first.image_path)
+
+    def test_session_in_use_is_not_evicted_or_released(self, tmp_path):
+        clock = FakeClock()
+        store = SessionStore(idle_timeout=60, max_bytes=1500, clock=clock)
+        session = store.create(_image_file(tmp_path, "a.png"), 10, 10)
+        with store.use(session.id):
+            clock.now += 120
+            store.create(_image_file(tmp_path, "b.png"), 10, 10)
+            assert store.evict_expired() == 0
+            assert store.close(session.id)
+            assert os.path.exists(session.image_path)
+        assert not os.path.exists(session.image_path)
+        with store.use(session.id) as missing:
+            assert missing is None
+
+    def test_close_releases_image(self, tmp_path):
+        store = SessionStore()
+        session = store.create(_image_file(tmp_path, "a.png"), 10, 10)
+        assert store.close(session.id)
+        assert not store.close(session.id)
+        assert not os.path.exists(session.image_path)
+
+
+class TestSessionEndpoints:
+    """Test cases for POST /api/sessions and /api/sessions/<id>/ask"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        pytest.importorskip("flask")
+        PIL = pytest.importorskip("PIL.Image")
+        from ui import app as app_module
+        self.ocr_calls = 0
+
+        def fake_ocr(image_path, question, detect_text_first=True, profile=None):
+            self.ocr_calls += 1
+            return "STOP", None
+
+        monkeypatch.setattr(app_module, 'process_with_ocr', fake_ocr)
+        monkeypatch.setattr(app_module, 'process_with_vqa', lambda path, q: "a red sign")
+        buf = io.BytesIO()
+        PIL.new('RGB', (40, 30), color='red').save(buf, format='PNG')
+        self.image_b64 = base64.b64encode(buf.getvalue()).decode()
+        return app_module.app.test_client()
+
+    def test_upload_once_ask_many(self, client):
+        created = client.post('/api/sessions', data={'image_base64': self.image_b64})
+        assert created.status_code == 201
+        body = created.get_json()
+        assert body['image']['width'] == 40 and body['image']['height'] == 30
+        session_id = body['session_id']
+
+        first = client.post(f'/api/sessions/{session_id}/ask', data={'question': 'What does the text say?'})
+        second = client.post(f'/api/sessions/{session_id}/ask', json={'question': 'Read the text'})
+        assert first.get_json()['answer'] == "STOP"
+        assert second.get_json()['session_id'] == session_id
+        # OCR output depends only on the OCR profile, so it runs once per profile
+        assert self.ocr_calls == 1
+        client.post(f'/api/sessions/{session_id}/ask', data={'question': 'What is the price?'})
+        assert self.ocr_calls == 2
+
+        assert client.delete(f'/api/sessions/{session_id}').status_code == 200
+        gone = client.post(f'/api/sessions/{session_id}/ask', data={'question': 'Read it'})
+        assert gone.status_code == 404
+
+    def test_ask_requires_question(self, client):
+        session_id = client.post('/api/sessions', data={'image_base64': self.image_b64}).get_json()['session_id']
+        assert client.post(f'/api/sessions/{session_id}/ask', data={}).status_code == 400
+        client.delete(f'/api/sessions/{session_id}')
@@ -0,0 +1,408 @@
+"""
+VQA Backends
+A common interface over the models that can answer a visual question, so the
+service can trade accuracy for latency per request or per question type.
+
+- blip2       Salesforce/blip2-opt-2.7b on PyTorch (vqa_model.py, the default)
+- blip-base   Salesforce/blip-vqa-base, a ~385M parameter VQA model
+- stub        no model; deterministic answers from image statistics, for tests
+- cascade     a small backend first, escalating low-confidence answers to a large one
+
+Backends return raw answers. vqa_model.answer_question(..., backend=name)
+validates inputs, cleans answers and turns errors into messages, and is the
+entry point callers use.
+"""
+
+import os
+import threading
+import time
+
+from PIL import Image, ImageStat
+
+try:
+    from monitoring.metrics import time_stage, record_cache, record_cascade, record_model_load
+except ImportError:  # monitoring lives at the project root; absent when run standalone
+    from contextlib import nullcontext as time_stage
+
+    def record_cache(cache: str, hit: bool):
+        pass
+
+    def record_cascade(escalated: bool):
+        pass
+
+    def record_model_load(model: str, seconds: float):
+        pass
+
+try:
+    from monitoring.governor import register_resident, touch_resident
+except ImportError:  # no memory governor when run standalone
+    def register_resident(*args, **kwargs):
+        pass
+
+    def touch_resident(name: str):
+        pass
+
+
+try:
+    from vqa.model_manager import ModelManager, configure_torch_threads
+except ImportError:  # imported as a top-level module from inside vqa/
+    from model_manager import ModelManager, configure_torch_threads
+
+
+def _vqa_model():
+    try:
+        from vqa import vqa_model
+    except ImportError:  # imported as a top-level module from inside vqa/
+        import vqa_model
+    return vqa_model
+
+
+class VQABackend:
+    """Interface implemented by every VQA backend."""
+
+    name = ''
+    model_id = ''
+
+    def load(self):
+        """Load the model (idempotent)."""
+        raise NotImplementedError
+
+    def is_loaded(self) -> bool:
+        raise NotImplementedError
+
+    def encode_image(self, image_path: str):
+        """Image representation the backend answers from (also warms any per-image cache)."""
+        raise NotImplementedError
+
+    def answer(self, image_path: str, question: str) -> str:
+        """Raw answer to one question."""
+        raise NotImplementedError
+
+    def answer_batch(self, image_paths: list, questions: list) -> list:
+        """Raw answers to many (image, question) pairs, in input order."""
+        return [self.answer(p, q) for p, q in zip(image_paths, questions)]
+
+    def answer_scored(self, image_path: str, question: str) -> tuple:
+        """
+        (raw answer, confidence), where confidence is the probability of the
+        generated sequence, exp(sum of token log-probs), or None if the
+        backend cannot score its answers.
+        """
+        return self.answer(image_path, question), None
+
+    def answer_batch_scored(self, image_paths: list, questions: list) -> list:
+        """answer_scored() for many pairs, in input order."""
+        return [self.answer_scored(p, q) for p, q in zip(image_paths, questions)]
+
+    def unload(self):
+        raise NotImplementedError
+
+    def tokenizer(self):
+        """Tokenizer the backend's prompts go through (loads the model), or None if it has none."""
+        return None
+
+    def version(self) -> str:
+        """Model and decoding configuration, used to key cached answers."""
+        return self.model_id
+
+
+class Blip2Backend(VQABackend):
+    """BLIP-2-opt-2.7b through vqa_model (PyTorch)."""
+
+    name = 'blip2'
+    model_id = "Salesforce/blip2-opt-2.7b"
+
+    def load(self):
+        return _vqa_model().load_model()
+
+    def is_loaded(self) -> bool:
+        return _vqa_model()._torch_manager.peek() is not None
+
+    def encode_image(self, image_path: str):
+        return _vqa_model().encode_image(image_path)
+
+    def answer(self, image_path: str, question: str) -> str:
+        return _vqa_model()._answer_torch(image_path, question)
+
+    def answer_batch(self, image_paths: list, questions: list) -> list:
+        return _vqa_model()._answer_batch_torch(image_paths, questions)
+
+    def tokenizer(self):
+        return _vqa_model().load_model()[1].tokenizer
+
+    def unload(self):
+        _vqa_model().unload_model()
+
+    def version(self) -> str:
+        vqa_model = _vqa_model()
+        params = "|".join(f"{k}={v}" for k, v in sorted(vqa_model.GENERATION_KWARGS.items()))
+        return f"{vqa_model.MODEL_ID}|{params}"
+
+
+class BlipVqaBackend(VQABackend):
+    """BLIP (ViT-B) fine-tuned for VQA: short answers at a fraction of BLIP-2's cost."""
+
+    name = 'blip-base'
+    model_id = os.environ.get('VQA_SMALL_MODEL_ID', 'Salesforce/blip-vqa-base')
+    generation_kwargs = {'max_new_tokens': 20, 'num_beams': 1}
+
+    def __init__(self):
+        self._manager = ModelManager(f"vqa_{self.name}", self._load)
+        register_resident(f"vqa_{self.name}", 'model', release=self.unload,
+                          is_loaded=self.is_loaded,
+                          idle_timeout=float(os.environ.get('VQA_MODEL_IDLE_SECONDS', '1800')))
+
+    def load(self):
+        touch_resident(f"vqa_{self.name}")
+        record_cache(f"vqa_{self.name}", self.is_loaded())
+        return self._manager.get()
+
+    def _load(self):
+        import torch
+        from transformers import BlipForQuestionAnswering, BlipProcessor
+
+        print(f"Loading {self.model_id}...")
+        load_start = time.perf_counter()
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if device.type == "cpu":
+            configure_torch_threads(max_concurrent=self._manager.max_concurrent)
+        processor = BlipProcessor.from_pretrained(self.model_id)
+        model = BlipForQuestionAnswering.from_pretrained(self.model_id).to(device)
+        model.eval()
+        record_model_load(self.model_id, time.perf_counter() - load_start)
+        return model, processor, device
+
+    def is_loaded(self) -> bool:
+        return self._manager.peek() is not None
+
+    def encode_image(self, image_path: str):
+        import torch
+
+        model, processor, device = self.load()
+        image = Image.open(image_path).convert('RGB')
+        pixel_values = processor(images=image, return_tensors="pt").pixel_values.to(device)
+        with self._manager.slot(), torch.no_grad():
+            return model.vision_model(pixel_values=pixel_values)[0]
+
+    def answer(self, image_path: str, question: str) -> str:
+        return self.answer_batch_scored([image_path], [question])[0][0]
+
+    def answer_batch(self, image_paths: list, questions: list) -> list:
+        return [answer for answer, _ in self.answer_batch_scored(image_paths, questions)]
+
+    def answer_scored(self, image_path: str, question: str) -> tuple:
+        return self.answer_batch_scored([image_path], [question])[0]
+
+    def answer_batch_scored(self, image_paths: list, questions: list) -> list:
+        import torch
+
+        model, processor, device = self.load()
+        with time_stage('vqa_preprocess'):
+            images = [Image.open(p).convert('RGB') for p in image_paths]
+            inputs = processor(images=images, text=list(questions), padding=True,
+                               return_tensors="pt").to(device)
+        with self._manager.slot(), time_stage('vqa_generate'), torch.no_grad():
+            outputs = model.generate(**inputs, **self.generation_kwargs,
+                                     output_scores=True, return_dict_in_generate=True)
+        with time_stage('vqa_decode'):
+            answers = processor.batch_decode(outputs.sequences, skip_special_tokens=True)
+            confidences = sequence_confidence(model.text_decoder, outputs,
+                                              processor.tokenizer.pad_token_id)
+        return [(answer.strip(), confidence) for answer, confidence in zip(answers, confidences)]
+
+    def tokenizer(self):
+        return self.load()[1].tokenizer
+
+    def unload(self):
+        self._manager.unload()
+
+    def version(self) -> str:
+        params = "|".join(f"{k}={v}" for k, v in sorted(self.generation_kwargs.items()))
+        return f"{self.model_id}|{params}"
+
+
+def sequence_confidence(decoder, outputs, pad_token_id) -> list:
+    """exp(sum of token log-probs) of each generated sequence, ignoring padding after eos."""
+    import torch
+
+    scores = decoder.compute_transition_scores(outputs.sequences, outputs.scores,
+                                               normalize_logits=True)
+    tokens = outputs.sequences[:, -scores.shape[1]:]
+    logprobs = torch.where(tokens != pad_token_id, scores, torch.zeros_like(scores)).sum(dim=1)
+    return torch.exp(logprobs).float().cpu().tolist()
+
+
+def should_escalate(confidence, threshold: float) -> bool:
+    """Cascade rule: unscored and low-confidence answers go to the large model."""
+    return confidence is None or confidence < threshold
+
+
+# Named colours the stub backend answers colour questions with
+_STUB_COLORS = {
+    'black': (0, 0, 0), 'white': (255, 255, 255), 'gray': (128, 128, 128),
+    'red': (200, 30, 30), 'green': (40, 160, 60), 'blue': (30, 60, 200),
+    'yellow': (230, 210, 40), 'orange': (240, 140, 30), 'brown': (120, 80, 40),
+    'purple': (120, 50, 160), 'pink': (240, 150, 180),
+}
+
+_YES_NO_STARTS = ('is', 'are', 'was', 'were', 'does', 'do', 'did', 'can', 'could', 'has', 'have')
+
+
+class StubBackend(VQABackend):
+    """No model: answers from the image's mean colour. Deterministic and instant."""
+
+    name = 'stub'
+    model_id = 'stub'
+
+    def __init__(self):
+        self._loaded = False
+
+    def load(self):
+        self._loaded = True
+
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def encode_image(self, image_path: str):
+        with Image.open(image_path) as image:
+            return tuple(ImageStat.Stat(image.convert('RGB')).mean)
+
+    def answer(self, image_path: str, question: str) -> str:
+        return self.answer_scored(image_path, question)[0]
+
+    def answer_scored(self, image_path: str, question: str) -> tuple:
+        # confident about colours (measured), not about anything else (guessed)
+        self.load()
+        words = question.lower().split()
+        if 'color' in words or 'colour' in words:
+            mean = self.encode_image(image_path)
+            colour = min(_STUB_COLORS, key=lambda c: sum((a - b) ** 2 for a, b in zip(_STUB_COLORS[c], mean)))
+            return colour, 0.9
+        if words[:2] == ['how', 'many']:
+            return "2", 0.2
+        if words and words[0] in _YES_NO_STARTS:
+            return "yes", 0.5
+        return "an object", 0.1
+
+    def unload(self):
+        self._loaded = False
+
+
+class CascadeBackend(VQABackend):
+    """
+    Answer with a small backend and re-answer with a large one only when the
+    small answer's confidence is below `threshold` (see should_escalate()).
+    """
+
+    name = 'cascade'
+
+    def __init__(self, small: str = None, large: str = None, threshold: float = None):
+        self.small_name = resolve_backend(small or os.environ.get('VQA_CASCADE_SMALL', 'blip-base'))
+        self.large_name = resolve_backend(large or os.environ.get('VQA_CASCADE_LARGE', 'blip2'))
+        if threshold is None:
+            threshold = float(os.environ.get('VQA_CASCADE_THRESHOLD', '0.5'))
+        self.threshold = threshold
+        self.model_id = f"cascade({self.small_name}->{self.large_name})"
+
+    @property
+    def small(self) -> VQABackend:
+        return get_backend(self.small_name)
+
+    @property
+    def large(self) -> VQABackend:
+        return get_backend(self.large_name)
+
+    def load(self):
+        # the large model loads lazily on the first escalation
+        self.small.load()
+
+    def is_loaded(self) -> bool:
+        return self.small.is_loaded()
+
+    def encode_image(self, image_path: str):
+        return self.small.encode_image(image_path)
+
+    def answer(self, image_path: str, question: str) -> str:
+        return self.answer_scored(image_path, question)[0]
+
+    def answer_scored(self, image_path: str, question: str) -> tuple:
+        return self.answer_batch_scored([image_path], [question])[0]
+
+    def answer_batch(self, image_paths: list, questions: list) -> list:
+        return [answer for answer, _ in self.answer_batch_scored(image_paths, questions)]
+
+    def answer_batch_scored(self, image_paths: list, questions: list) -> list:
+        """Small-model answers, with low-confidence ones replaced by the large model's (confidence None)."""
+        with time_stage('vqa_cascade_small'):
+            results = list(self.small.answer_batch_scored(image_paths, questions))
+        escalate = [i for i, (_, confidence) in enumerate(results)
+                    if should_escalate(confidence, self.threshold)]
+        for i in range(len(results)):
+            record_cascade(i in escalate)
+        if escalate:
+            with time_stage('vqa_cascade_large'):
+                if len(escalate) == 1:
+                    # answer() keeps BLIP-2's prefix KV-cache for the session's image;
+                    # padded batches re-run the vision encoder and the full prefill
+                    i = escalate[0]
+                    answers = [self.large.answer(image_paths[i], questions[i])]
+                else:
+                    answers = self.large.answer_batch([image_paths[i] for i in escalate],
+                                                      [questions[i] for i in escalate])
+            for i, answer in zip(escalate, answers):
+                results[i] = (answer, None)
+        return results
+
+    def tokenizer(self):
+        # the prompt always reaches the small model; escalations reuse it unchanged
+        return self.small.tokenizer()
+
+    def unload(self):
+        self.small.unload()
+
+    def version(self) -> str:
+        return f"cascade|{self.small.version()}|{self.large.version()}|threshold={self.threshold}"
+
+
+# Canonical backend name -> factory
+BACKENDS = {
+    'blip2': Blip2Backend,
+    'blip-base': BlipVqaBackend,
+    'stub': StubBackend,
+    'cascade': CascadeBackend,
+}
+ALIASES = {'torch': 'blip2'}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_backend(name: str, factory):
+    """Make a backend selectable by name (factory() -> VQABackend)."""
+    BACKENDS[name] = factory
+
+
+def available_backends() -> list:
+    return sorted(BACKENDS)
+
+
+def resolve_backend(name: str) -> str:
+    """
+    Canonical backend name.
+
+    Raises:
+        ValueError: If no backend of that name exists
+    """
+    key = ALIASES.get(name.strip().lower(), name.strip().lower())
+    if key not in BACKENDS:
+        raise ValueError(f"Unknown VQA backend '{name}' (available: {', '.join(available_backends())})")
+    return key
+
+
+def get_backend(name: str) -> VQABackend:
+    """The process-wide instance of a backend."""
+    key = resolve_backend(name)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = BACKENDS[key]()
+        return _instances[key]
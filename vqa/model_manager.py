@@ -0,0 +1,132 @@
+"""
+Model Manager
+Thread-safe model residency and inference admission for concurrent requests.
+
+- The model is loaded once: concurrent first requests wait on a load lock
+  instead of each calling from_pretrained() and loading their own copy.
+- At most `max_concurrent` inferences run on the shared model at a time; the
+  rest queue on a semaphore (time spent waiting is the `<name>_queue` stage).
+- configure_torch_threads() splits the CPU cores between web workers and
+  concurrent inferences, so N parallel generate() calls do not each start
+  one intra-op thread per core.
+
+Settings (environment):
+  VQA_MAX_CONCURRENT         inferences per model at once (default 1)
+  VQA_WEB_WORKERS            web server processes sharing the machine
+                             (default WEB_CONCURRENCY, else 1)
+  VQA_TORCH_THREADS          intra-op threads override
+  VQA_TORCH_INTEROP_THREADS  inter-op threads override (default 1)
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    from monitoring.metrics import time_stage
+except ImportError:  # monitoring lives at the project root; absent when run standalone
+    from contextlib import nullcontext as time_stage
+
+MAX_CONCURRENT = max(1, int(os.environ.get('VQA_MAX_CONCURRENT', '1')))
+WEB_WORKERS = max(1, int(os.environ.get('VQA_WEB_WORKERS', os.environ.get('WEB_CONCURRENCY', '1'))))
+
+
+class ModelManager:
+    """Loads a model once under a lock and bounds concurrent inference on it."""
+
+    def __init__(self, name: str, loader, max_concurrent: int = MAX_CONCURRENT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self._loader = loader
+        self._value = None
+        self._load_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._count_lock = threading.Lock()
+        self.loads = 0
+        self.active = 0
+        self.waiting = 0
+        self.peak_active = 0
+
+    def get(self):
+        """The loaded model, loading it first if needed (exactly once across threads)."""
+        value = self._value
+        if value is not None:
+            return value
+        with self._load_lock:
+            if self._value is None:
+                self._value = self._loader()
+                self.loads += 1
+            return self._value
+
+    def peek(self):
+        """The loaded model or None, without loading."""
+        return self._value
+
+    def unload(self):
+        """Forget the model; running inferences keep their own reference until they finish."""
+        with self._load_lock:
+            value, self._value = self._value, None
+        return value
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the `max_concurrent` inference slots for the enclosed block."""
+        with self._count_lock:
+            self.waiting += 1
+        try:
+            with time_stage(f"{self.name}_queue"):
+                self._slots.acquire()
+        finally:
+            with self._count_lock:
+                self.waiting -= 1
+        with self._count_lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            yield
+        finally:
+            with self._count_lock:
+                self.active -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._count_lock:
+            return {
+                'loaded': self._value is not None,
+                'loads': self.loads,
+                'max_concurrent': self.max_concurrent,
+                'active': self.active,
+                'waiting': self.waiting,
+                'peak_active': self.peak_active,
+            }
+
+
+def plan_threads(cores: int, web_workers: int = WEB_WORKERS,
+                 max_concurrent: int = MAX_CONCURRENT) -> dict:
+    """Intra-op threads per inference so workers x inferences x threads <= cores."""
+    intra = int(os.environ.get('VQA_TORCH_THREADS', '0')) or max(1, cores // (web_workers * max_concurrent))
+    interop = int(os.environ.get('VQA_TORCH_INTEROP_THREADS', '0')) or 1
+    return {'intra_op': intra, 'inter_op': interop}
+
+
+_threads_configured = None
+
+
+def configure_torch_threads(web_workers: int = WEB_WORKERS, max_concurrent: int = MAX_CONCURRENT) -> dict:
+    """Apply plan_threads() to torch once per process; returns the plan in effect."""
+    global _threads_configured
+    if _threads_configured is not None:
+        return _threads_configured
+    import torch
+
+    plan = plan_threads(os.cpu_count() or 1, web_workers, max_concurrent)
+    torch.set_num_threads(plan['intra_op'])
+    try:
+        torch.set_num_interop_threads(plan['inter_op'])
+    except RuntimeError:
+        # only settable before torch's first inter-op parallel work
+        plan['inter_op'] = torch.get_num_interop_threads()
+    print(f"torch threads: {plan['intra_op']} intra-op, {plan['inter_op']} inter-op "
+          f"({web_workers} worker(s) x {max_concurrent} concurrent inference(s))")
+    _threads_configured = plan
+    return plan
@@ -0,0 +1,161 @@
+"""
+Prefix KV-Cache for BLIP-2
+Reuses the image-dependent part of the prompt across questions on one image.
+
+Every prompt the VQA module sends to the OPT decoder is
+
+    [32 Q-Former query embeddings][</s> Question:][ {question}\nAnswer:]
+
+and only the last segment changes between questions. For each image this
+module runs the vision encoder, Q-Former and the decoder over the first two
+segments once, keeps the resulting past_key_values, and for every question
+only prefills the question tokens on top of a copy of that cache. Entries are
+kept in a small LRU keyed by the image's content hash, so asking several
+questions about the same picture (in a session or by re-uploading it) skips
+both the ViT forward pass and most of the decoder prefill.
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import torch
+
+
+@dataclass
+class ImagePrefix:
+    """Decoder state after the image query tokens and the fixed prompt prefix."""
+    embeds: torch.Tensor          # (1, prefix_len, hidden) inputs_embeds of the prefix
+    token_ids: list               # tokenizer ids of the text part of the prefix
+    past_key_values: object       # transformers Cache holding keys/values for `embeds`
+
+    @property
+    def length(self) -> int:
+        return self.embeds.shape[1]
+
+
+class PrefixCache:
+    """Thread-safe LRU of ImagePrefix by image content hash."""
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            prefix = self._entries.get(key)
+            if prefix is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return prefix
+
+    def put(self, key: str, prefix: ImagePrefix):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = prefix
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def estimated_bytes(self) -> int:
+        """Bytes held by cached prefix embeddings and key/value tensors."""
+        with self._lock:
+            prefixes = list(self._entries.values())
+        total = 0
+        for prefix in prefixes:
+            total += prefix.embeds.nelement() * prefix.embeds.element_size()
+            for layer in prefix.past_key_values:
+                total += sum(t.nelement() * t.element_size() for t in layer
+                             if isinstance(t, torch.Tensor))
+        return total
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def image_key(image_path: str) -> str:
+    """SHA-256 of the image bytes, so re-uploads of the same picture share an entry."""
+    h = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def split_prompt(tokenizer, prefix_text: str, prompt: str):
+    """
+    Token ids of `prompt` after `prefix_text`, or None if tokenizing the two
+    parts separately would not reproduce the tokenization of the whole prompt.
+    """
+    full_ids = tokenizer(prompt).input_ids
+    prefix_ids = tokenizer(prefix_text).input_ids
+    if not prompt.startswith(prefix_text) or full_ids[:len(prefix_ids)] != prefix_ids:
+        return None
+    suffix_ids = tokenizer(prompt[len(prefix_text):], add_special_tokens=False).input_ids
+    if prefix_ids + suffix_ids != full_ids:
+        return None
+    return suffix_ids
+
+
+@torch.no_grad()
+def build_prefix(model, processor, image, prefix_text: str, device) -> ImagePrefix:
+    """Run vision encoder, Q-Former and the decoder over the image + prefix_text."""
+    dtype = next(model.vision_model.parameters()).dtype
+    pixel_values = processor.image_processor(images=image, return_tensors="pt").pixel_values
+    image_embeds = model.vision_model(pixel_values=pixel_values.to(device, dtype))[0]
+    image_attention_mask = torch.ones(image_embeds.shape[:-1], dtype=torch.long,
+                                      device=image_embeds.device)
+    query_tokens = model.query_tokens.expand(image_embeds.shape[0], -1, -1)
+    query_output = model.qformer(query_embeds=query_tokens, encoder_hidden_states=image_embeds,
+                                 encoder_attention_mask=image_attention_mask)[0]
+    query_embeds = model.language_projection(query_output)
+
+    token_ids = processor.tokenizer(prefix_text).input_ids
+    ids = torch.tensor([token_ids], device=query_embeds.device)
+    text_embeds = model.get_input_embeddings()(ids).to(query_embeds.dtype)
+    embeds = torch.cat([query_embeds, text_embeds], dim=1)
+    attention_mask = torch.ones(embeds.shape[:-1], dtype=torch.long, device=embeds.device)
+    outputs = model.language_model(inputs_embeds=embeds, attention_mask=attention_mask,
+                                   use_cache=True)
+    return ImagePrefix(embeds, token_ids, outputs.past_key_values)
+
+
+@torch.no_grad()
+def generate_with_prefix(model, prefix: ImagePrefix, suffix_ids: list, generation_kwargs: dict):
+    """
+    generate() continuing from the cached prefix; only `suffix_ids` are prefilled.
+
+    Returns:
+        torch.Tensor: generated token ids (new tokens only)
+    """
+    device = prefix.embeds.device
+    suffix = torch.tensor([suffix_ids], device=device)
+    suffix_embeds = model.get_input_embeddings()(suffix).to(prefix.embeds.dtype)
+    embeds = torch.cat([prefix.embeds, suffix_embeds], dim=1)
+    attention_mask = torch.ones(embeds.shape[:-1], dtype=torch.long, device=device)
+
+    # generate() extends the cache in place, so every question gets its own copy;
+    # beam search expands the inputs per beam but not a cache passed in
+    past = copy.deepcopy(prefix.past_key_values)
+    num_beams = generation_kwargs.get('num_beams', 1)
+    if num_beams > 1:
+        past.batch_repeat_interleave(num_beams)
+
+    return model.language_model.generate(inputs_embeds=embeds, attention_mask=attention_mask,
+                                         past_key_values=past, **generation_kwargs)
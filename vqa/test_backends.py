@@ -0,0 +1,147 @@
+"""
+Unit tests for the pluggable VQA backends
+"""
+
+import os
+import tempfile
+
+import pytest
+from PIL import Image
+
+from backends import (VQABackend, available_backends, get_backend, register_backend,
+                      resolve_backend)
+
+
+class TestBackendRegistry:
+    """Test cases for selecting backends by name"""
+
+    def test_builtin_backends_are_available(self):
+        assert {'blip2', 'blip-base', 'stub', 'cascade'} <= set(available_backends())
+
+    def test_runtime_aliases_resolve_to_blip2(self):
+        assert resolve_backend('TORCH') == 'blip2'
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError, match="Unknown VQA backend"):
+            resolve_backend('gpt-vision')
+
+    def test_get_backend_returns_shared_instance(self):
+        assert get_backend('stub') is get_backend('stub')
+
+    def test_register_custom_backend(self, monkeypatch):
+        import backends
+        monkeypatch.setattr(backends, 'BACKENDS', dict(backends.BACKENDS))
+        monkeypatch.setattr(backends, '_instances', {})
+
+        class EchoBackend(VQABackend):
+            name = 'echo'
+            model_id = 'echo'
+
+            def answer(self, image_path, question):
+                return question
+
+        register_backend('echo', EchoBackend)
+        backend = get_backend('echo')
+        assert backend.answer_batch(['a.jpg', 'b.jpg'], ['one', 'two']) == ['one', 'two']
+        assert backend.version() == 'echo'
+
+
+class TestStubBackend:
+    """Test cases for the model-free stub backend"""
+
+    @pytest.fixture(scope="class")
+    def red_image(self):
+        img = Image.new('RGB', (64, 64), color=(210, 20, 25))
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+            img.save(f.name)
+            yield f.name
+        os.unlink(f.name)
+
+    def test_colour_question_uses_mean_colour(self, red_image):
+        assert get_backend('stub').answer(red_image, "What color is the car?") == "red"
+
+    def test_question_types(self, red_image):
+        stub = get_backend('stub')
+        assert stub.answer(red_image, "How many cars are there?") == "2"
+        assert stub.answer(red_image, "Is it raining?") == "yes"
+        assert stub.answer(red_image, "Describe the scene") == "an object"
+
+    def test_encode_image_and_load_state(self, red_image):
+        stub = get_backend('stub')
+        stub.unload()
+        assert not stub.is_loaded()
+        assert stub.encode_image(red_image)[0] > 200
+        stub.answer(red_image, "What is this?")
+        assert stub.is_loaded()
+
+    def test_stub_has_no_tokenizer(self):
+        # prompt budgets fall back to word counts (ui/ocr_context.py)
+        assert get_backend('stub').tokenizer() is None
+
+
+class TestCascadeBackend:
+    """Test cases for small-model-first answering with escalation"""
+
+    @pytest.fixture
+    def cascade(self, monkeypatch):
+        import backends
+        monkeypatch.setattr(backends, 'BACKENDS', dict(backends.BACKENDS))
+        monkeypatch.setattr(backends, '_instances', {})
+        self.escalated = []
+        self.large_batches = []
+
+        class LargeBackend(VQABackend):
+            name = 'large'
+            model_id = 'large'
+
+            def answer(inner, image_path, question):
+                self.escalated.append(question)
+                return "large answer"
+
+            def answer_batch(inner, image_paths, questions):
+                self.large_batches.append(len(questions))
+                return super().answer_batch(image_paths, questions)
+
+        register_backend('large', LargeBackend)
+        return backends.CascadeBackend(small='stub', large='large', threshold=0.5)
+
+    @pytest.fixture(scope="class")
+    def blue_image(self):
+        img = Image.new('RGB', (32, 32), color=(30, 60, 200))
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+            img.save(f.name)
+            yield f.name
+        os.unlink(f.name)
+
+    def test_confident_answer_is_kept(self, cascade, blue_image):
+        assert cascade.answer_scored(blue_image, "What color is it?") == ("blue", 0.9)
+        assert self.escalated == []
+
+    def test_low_confidence_answer_escalates(self, cascade, blue_image):
+        assert cascade.answer(blue_image, "How many cars are there?") == "large answer"
+        assert self.escalated == ["How many cars are there?"]
+
+    def test_batch_escalates_only_low_confidence_items(self, cascade, blue_image):
+        questions = ["What color is it?", "Is it raining?", "Describe the scene"]
+        answers = cascade.answer_batch([blue_image] * 3, questions)
+        assert answers == ["blue", "yes", "large answer"]
+        assert self.escalated == ["Describe the scene"]
+
+    def test_single_escalation_uses_answer(self, cascade, blue_image):
+        # Blip2Backend.answer() reuses the image's prefix KV-cache; answer_batch() does not
+        cascade.answer(blue_image, "Describe the scene")
+        assert self.large_batches == []
+        cascade.answer_batch([blue_image] * 2, ["Describe the scene", "How many cars are there?"])
+        assert self.large_batches == [2]
+
+    def test_threshold_boundary_and_unscored(self):
+        from backends import should_escalate
+        assert not should_escalate(0.5, 0.5)
+        assert should_escalate(0.49, 0.5)
+        assert should_escalate(None, 0.0)
+
+    def test_cascade_decisions_are_counted(self, cascade, blue_image):
+        metrics = pytest.importorskip("monitoring.metrics")
+        before = metrics.CASCADE_DECISIONS.get(outcome='escalated')
+        cascade.answer(blue_image, "Describe the scene")
+        assert metrics.CASCADE_DECISIONS.get(outcome='escalated') == before + 1
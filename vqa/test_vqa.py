@@ -73,6 +73,64 @@ class TestVQAModule:
             assert len(answer2) > 0
         except Exception as e:
             pytest.skip(f"Test skipped: {e}")
+    
+    def test_answer_question_with_stub_backend(self, sample_image):
+        """Test per-call backend selection without loading a model"""
+        assert answer_question(sample_image, "What color is this?", backend='stub') == "red"
+    
+    def test_answer_question_with_unknown_backend(self, sample_image):
+        """Test that an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            answer_question(sample_image, "What color is this?", backend='nonexistent')
+
+
+class TestPrefixCache:
+    """Test cases for prefix KV-cache reuse across questions on one image"""
+    
+    @pytest.fixture(scope="class")
+    def sample_image(self):
+        img = Image.new('RGB', (100, 100), color='blue')
+        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as f:
+            img.save(f.name)
+            yield f.name
+        os.unlink(f.name)
+    
+    def test_lru_evicts_oldest(self):
+        from prefix_cache import PrefixCache
+        cache = PrefixCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.hits == 3 and cache.misses == 1
+    
+    def test_prompt_splits_at_prefix(self):
+        import vqa_model
+        from prefix_cache import split_prompt
+        try:
+            _, processor, _ = load_model()
+        except Exception as e:
+            pytest.skip(f"Model loading failed: {e}")
+        tokenizer = processor.tokenizer
+        prompt = vqa_model.PROMPT_TEMPLATE.format(question="What color is the car?")
+        suffix_ids = split_prompt(tokenizer, vqa_model.PROMPT_PREFIX, prompt)
+        assert suffix_ids is not None
+        assert tokenizer(vqa_model.PROMPT_PREFIX).input_ids + suffix_ids == tokenizer(prompt).input_ids
+    
+    def test_cached_answers_match_uncached(self, sample_image, monkeypatch):
+        import vqa_model
+        questions = ["What color is this?", "Describe this image"]
+        try:
+            cached = [answer_question(sample_image, q) for q in questions]
+            if not vqa_model._prefix_supported:
+                pytest.skip("Prefix reuse not supported by the installed transformers")
+            monkeypatch.setattr(vqa_model, 'PREFIX_CACHE_SIZE', 0)
+            uncached = [answer_question(sample_image, q) for q in questions]
+        except Exception as e:
+            pytest.skip(f"Test skipped: {e}")
+        assert cached == uncached
 
 
 if __name__ == "__main__":
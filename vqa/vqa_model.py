@@ -7,13 +7,87 @@ import torch
 from transformers import Blip2Processor, Blip2ForConditionalGeneration
 from PIL import Image
 import os
+import time
 from pathlib import Path
 
-# Global model and processor instances (loaded once)
-_model = None
-_processor = None
+try:
+    from monitoring.metrics import time_stage, record_cache, record_model_load
+except ImportError:  # monitoring lives at the project root; absent when run standalone
+    from contextlib import nullcontext as time_stage
+
+    def record_cache(cache: str, hit: bool):
+        pass
+
+    def record_model_load(model: str, seconds: float):
+        pass
+
+try:
+    from monitoring.governor import register_resident, touch_resident
+except ImportError:  # no memory governor when run standalone
+    def register_resident(*args, **kwargs):
+        pass
+
+    def touch_resident(name: str):
+        pass
+
+try:
+    from vqa.prefix_cache import PrefixCache, build_prefix, generate_with_prefix, image_key, split_prompt
+except ImportError:  # imported as a top-level module from inside vqa/
+    from prefix_cache import PrefixCache, build_prefix, generate_with_prefix, image_key, split_prompt
+
+try:
+    from vqa.backends import get_backend
+    from vqa.model_manager import ModelManager, configure_torch_threads
+except ImportError:
+    from backends import get_backend
+    from model_manager import ModelManager, configure_torch_threads
+
 _device = None
 
+MODEL_ID = "Salesforce/blip2-opt-2.7b"
+
+# Decoding parameters shared by single and batched inference
+# - use max_new_tokens to limit generated tokens (preferable to max_length)
+# - use beam search for more stable outputs
+# - prevent short n-gram repetition
+GENERATION_KWARGS = {
+    'max_new_tokens': 64,
+    'num_beams': 3,
+    'no_repeat_ngram_size': 3,
+    'early_stopping': True,
+}
+
+
+# Prompt sent to the decoder; everything up to PROMPT_PREFIX is identical for all questions
+PROMPT_TEMPLATE = "Question: {question}\nAnswer:"
+PROMPT_PREFIX = "Question:"
+
+# Images whose prefix KV-cache is kept for follow-up questions; 0 disables reuse
+PREFIX_CACHE_SIZE = int(os.environ.get('VQA_PREFIX_CACHE_SIZE', '4'))
+_prefix_cache = PrefixCache(PREFIX_CACHE_SIZE)
+# Cleared if the installed transformers cannot continue generate() from a cache
+_prefix_supported = True
+
+# Seconds without a question before the memory governor unloads the model; 0 = never
+MODEL_IDLE_SECONDS = float(os.environ.get('VQA_MODEL_IDLE_SECONDS', '1800'))
+
+# Default backend (see backends.py): 'blip2' (alias 'torch'), 'blip-base' or 'stub'
+BACKEND = os.environ.get('VQA_BACKEND', 'blip2').lower()
+
+
+def model_version(backend: str = None) -> str:
+    """
+    Identify the model and decoding configuration.
+    Used to key cached answers so they are invalidated when either changes.
+    
+    Args:
+        backend (str): Backend name (defaults to BACKEND)
+    
+    Returns:
+        str: Version string, e.g. "Salesforce/blip2-opt-2.7b|early_stopping=True|..."
+    """
+    return get_backend(backend or BACKEND).version()
+
 
 def get_device():
     """
@@ -41,63 +115,133 @@ def get_device():
 def load_model():
     """
     Load the BLIP-2-opt-2.7b model and processor.
-    Uses caching to avoid reloading the model.
+    Loaded once per process: concurrent first requests wait for the same load.
     
     Returns:
         tuple: (model, processor, device)
     """
-    global _model, _processor, _device
-    
-    if _model is not None:
-        return _model, _processor, _device
-    
+    touch_resident('vqa_model')
+    record_cache('vqa_model', _torch_manager.peek() is not None)
+    return _torch_manager.get()
+
+
+def _load_blip2():
+    """Build (model, processor, device); called by _torch_manager under its load lock."""
     print("Loading BLIP-2-opt-2.7b model...")
     
     device = get_device()
-    model_id = "Salesforce/blip2-opt-2.7b"
+    model_id = MODEL_ID
+    load_start = time.perf_counter()
+    if device.type == "cpu":
+        configure_torch_threads(max_concurrent=_torch_manager.max_concurrent)
     
     try:
         # Load processor
-        _processor = Blip2Processor.from_pretrained(model_id)
+        processor = Blip2Processor.from_pretrained(model_id)
         
         # Load model with appropriate settings
         if device.type == "cuda":
-            _model = Blip2ForConditionalGeneration.from_pretrained(
+            model = Blip2ForConditionalGeneration.from_pretrained(
                 model_id,
                 torch_dtype=torch.float16,
                 device_map="auto"
             )
         else:
-            _model = Blip2ForConditionalGeneration.from_pretrained(
+            model = Blip2ForConditionalGeneration.from_pretrained(
                 model_id,
                 device_map=device
             )
         
-        _model.eval()
+        model.eval()
+        record_model_load(model_id, time.perf_counter() - load_start)
         print(f"Model loaded successfully on {device}")
-        return _model, _processor, device
+        return model, processor, device
         
     except Exception as e:
         print(f"Error loading model: {str(e)}")
         raise
 
 
-def answer_question(image_path: str, question: str) -> str:
+# Load lock + VQA_MAX_CONCURRENT inference slots
+_torch_manager = ModelManager('vqa_model', _load_blip2)
+
+
+def answer_question(image_path: str, question: str, backend: str = None) -> str:
     """
-    Answer a visual question about an image using BLIP-2-opt-2.7b model.
+    Answer a visual question about an image using BLIP-2-opt-2.7b model
+    (or another backend, see backends.py).
     
     Args:
         image_path (str): Path to the image file
         question (str): The question to answer about the image
+        backend (str): Backend name (defaults to BACKEND)
         
     Returns:
         str: The answer to the question
         
     Raises:
         FileNotFoundError: If the image file doesn't exist
-        ValueError: If the question is empty
+        ValueError: If the question is empty or the backend is unknown
     """
-    # Validate inputs
+    _validate_inputs(image_path, question)
+    vqa_backend = get_backend(backend or BACKEND)
+    
+    try:
+        return _clean_answer(vqa_backend.answer(image_path, question), question)
+        
+    except FileNotFoundError as e:
+        return f"Error: {str(e)}"
+    except ValueError as e:
+        return f"Validation Error: {str(e)}"
+    except Exception as e:
+        return f"VQA Processing Error: {str(e)}"
+
+
+def answer_with_confidence(image_path: str, question: str, backend: str = None) -> tuple:
+    """
+    Like answer_question(), plus the backend's confidence in the answer.
+    
+    Returns:
+        tuple: (answer, confidence) - confidence is the generated sequence's
+        probability, or None if the backend cannot score answers or failed
+        
+    Raises:
+        FileNotFoundError: If the image file doesn't exist
+        ValueError: If the question is empty or the backend is unknown
+    """
+    _validate_inputs(image_path, question)
+    vqa_backend = get_backend(backend or BACKEND)
+    
+    try:
+        answer, confidence = vqa_backend.answer_scored(image_path, question)
+        return _clean_answer(answer, question), confidence
+        
+    except FileNotFoundError as e:
+        return f"Error: {str(e)}", None
+    except ValueError as e:
+        return f"Validation Error: {str(e)}", None
+    except Exception as e:
+        return f"VQA Processing Error: {str(e)}", None
+
+
+def count_tokens(texts: list, backend: str = None):
+    """
+    Token count of each text under a backend's tokenizer (loads the model).
+    
+    Args:
+        texts (list): Prompt fragments to measure
+        backend (str): Backend name (defaults to BACKEND)
+        
+    Returns:
+        list: Token counts without special tokens, or None if the backend has no tokenizer
+    """
+    tokenizer = get_backend(backend or BACKEND).tokenizer()
+    if tokenizer is None:
+        return None
+    return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)['input_ids']]
+
+
+def _validate_inputs(image_path, question: str):
     if not isinstance(image_path, (str, Path)):
         raise ValueError("image_path must be a string or Path object")
     
@@ -106,53 +250,189 @@ def answer_question(image_path: str, question: str) -> str:
     
     if not question or not question.strip():
         raise ValueError("Question cannot be empty")
+
+
+def _answer_torch(image_path: str, question: str) -> str:
+    """Raw decoded answer from BLIP-2 on PyTorch (the 'blip2' backend)."""
+    # Load model if not already loaded
+    model, processor, device = load_model()
     
-    try:
-        # Load model if not already loaded
-        model, processor, device = load_model()
-        
+    with _torch_manager.slot():
+        return _answer_torch_locked(model, processor, device, image_path, question)
+
+
+def _answer_torch_locked(model, processor, device, image_path: str, question: str) -> str:
+    if _prefix_supported and PREFIX_CACHE_SIZE > 0:
+        answer = _answer_with_prefix(model, processor, device, image_path, question)
+        if answer is not None:
+            return answer
+    
+    with time_stage('vqa_preprocess'):
         # Load and prepare image
         image = Image.open(image_path).convert('RGB')
         
         # Prepare a clearer instruction-style prompt to avoid the model echoing the question
-        prompt = f"Question: {question}\nAnswer:"
+        prompt = PROMPT_TEMPLATE.format(question=question)
 
         # Prepare inputs for BLIP-2
         inputs = processor(images=image, text=prompt, return_tensors="pt").to(device)
 
-        # Generate answer with safer decoding parameters
-        # - use max_new_tokens to limit generated tokens (preferable to max_length)
-        # - use beam search for more stable outputs
-        # - prevent short n-gram repetition
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=64,
-                num_beams=3,
-                no_repeat_ngram_size=3,
-                early_stopping=True
-            )
+    # Generate answer with safer decoding parameters (see GENERATION_KWARGS)
+    with time_stage('vqa_generate'), torch.no_grad():
+        outputs = model.generate(**inputs, **GENERATION_KWARGS)
+
+    # Decode the answer text
+    # Use batch decode for consistency
+    with time_stage('vqa_decode'):
+        return processor.batch_decode(outputs, skip_special_tokens=True)[0].strip()
+
+
+def encode_image(image_path: str):
+    """
+    Vision embeddings and prompt-prefix KV-cache of an image, cached for later questions.
+    
+    Returns:
+        ImagePrefix: The image's cached prefix
+    """
+    model, processor, device = load_model()
+    with _torch_manager.slot():
+        return _image_prefix(model, processor, device, image_path)
+
+
+def _image_prefix(model, processor, device, image_path: str):
+    key = image_key(image_path)
+    touch_resident('vqa_prefix_cache')
+    prefix = _prefix_cache.get(key)
+    record_cache('vqa_prefix', prefix is not None)
+    if prefix is None:
+        with time_stage('vqa_prefix_build'):
+            image = Image.open(image_path).convert('RGB')
+            prefix = build_prefix(model, processor, image, PROMPT_PREFIX, device)
+        _prefix_cache.put(key, prefix)
+    return prefix
 
-        # Decode the answer text
-        # Use batch decode for consistency
-        answer = processor.batch_decode(outputs, skip_special_tokens=True)[0].strip()
-
-        # Post-process: if model echoed the question/prompt, remove the prompt portion
-        if answer.lower().startswith(f"question: {question.lower()}"):
-            # remove the repeated question portion
-            answer = answer[len(f"question: {question}"):].strip(' :\n')
-        # If the model left the literal 'Answer:' marker, strip it
-        if answer.lower().startswith("answer:"):
-            answer = answer[len("answer:"):].strip(' :\n')
+
+def _answer_with_prefix(model, processor, device, image_path: str, question: str):
+    """
+    Answer using the image's cached prefix KV-cache, building it on first use.
+    
+    Returns:
+        str | None: Raw decoded answer, or None if the prompt cannot be split
+        at PROMPT_PREFIX or prefix reuse is unsupported (the caller then runs
+        the regular, uncached path)
+    """
+    global _prefix_supported
+    
+    suffix_ids = split_prompt(processor.tokenizer, PROMPT_PREFIX,
+                              PROMPT_TEMPLATE.format(question=question))
+    if suffix_ids is None:
+        return None
+    
+    try:
+        prefix = _image_prefix(model, processor, device, image_path)
         
-        return answer if answer else "Unable to generate a response."
+        with time_stage('vqa_generate'):
+            outputs = generate_with_prefix(model, prefix, suffix_ids, GENERATION_KWARGS)
+    except (AttributeError, TypeError, NotImplementedError) as e:
+        # older transformers: legacy tuple caches or no inputs_embeds continuation
+        _prefix_supported = False
+        _prefix_cache.clear()
+        print(f"Prefix KV-cache reuse disabled: {str(e)}")
+        return None
+    
+    with time_stage('vqa_decode'):
+        return processor.batch_decode(outputs, skip_special_tokens=True)[0].strip()
+
+
+def _clean_answer(answer: str, question: str) -> str:
+    """Strip an echoed prompt or 'Answer:' marker from decoded model output."""
+    # Post-process: if model echoed the question/prompt, remove the prompt portion
+    if answer.lower().startswith(f"question: {question.lower()}"):
+        # remove the repeated question portion
+        answer = answer[len(f"question: {question}"):].strip(' :\n')
+    # If the model left the literal 'Answer:' marker, strip it
+    if answer.lower().startswith("answer:"):
+        answer = answer[len("answer:"):].strip(' :\n')
+    
+    return answer if answer else "Unable to generate a response."
+
+
+def answer_questions(image_paths: list, questions: list, batch_size: int = 8,
+                     backend: str = None) -> list:
+    """
+    Answer many (image, question) pairs, running generate() on padded batches.
+    
+    Errors are reported per item in the same string form answer_question()
+    returns, so one bad image does not fail the whole batch.
+    
+    Args:
+        image_paths (list): Paths to the image files
+        questions (list): One question per image path
+        batch_size (int): Number of pairs per generate() call
+        backend (str): Backend name (defaults to BACKEND)
         
-    except FileNotFoundError as e:
-        return f"Error: {str(e)}"
-    except ValueError as e:
-        return f"Validation Error: {str(e)}"
-    except Exception as e:
-        return f"VQA Processing Error: {str(e)}"
+    Returns:
+        list: Answers, in the same order as the inputs
+    """
+    if len(image_paths) != len(questions):
+        raise ValueError("image_paths and questions must have the same length")
+    vqa_backend = get_backend(backend or BACKEND)
+    
+    answers = [None] * len(questions)
+    pending = []
+    for i, (image_path, question) in enumerate(zip(image_paths, questions)):
+        if not os.path.exists(image_path):
+            answers[i] = f"Error: Image file not found: {image_path}"
+        elif not question or not question.strip():
+            answers[i] = "Validation Error: Question cannot be empty"
+        else:
+            pending.append(i)
+    
+    if not pending:
+        return answers
+    
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            decoded = vqa_backend.answer_batch([image_paths[i] for i in batch],
+                                               [questions[i] for i in batch])
+            for i, text in zip(batch, decoded):
+                answers[i] = _clean_answer(text.strip(), questions[i])
+        except Exception as e:
+            for i in batch:
+                answers[i] = f"VQA Processing Error: {str(e)}"
+    
+    return answers
+
+
+def _answer_batch_torch(image_paths: list, questions: list) -> list:
+    """Raw decoded answers for one padded generate() batch on PyTorch."""
+    model, processor, device = load_model()
+    tokenizer = processor.tokenizer
+    
+    with time_stage('vqa_preprocess'):
+        images = [Image.open(path).convert('RGB') for path in image_paths]
+        prompts = [PROMPT_TEMPLATE.format(question=question) for question in questions]
+        # decoder-only generation needs left padding so every prompt ends at the same position
+        original_side = tokenizer.padding_side
+        tokenizer.padding_side = "left"
+        try:
+            inputs = processor(images=images, text=prompts, padding=True,
+                               return_tensors="pt").to(device)
+        finally:
+            tokenizer.padding_side = original_side
+    
+    with _torch_manager.slot(), time_stage('vqa_generate'), torch.no_grad():
+        outputs = model.generate(**inputs, **GENERATION_KWARGS)
+    
+    with time_stage('vqa_decode'):
+        return processor.batch_decode(outputs, skip_special_tokens=True)
+
+
+def forget_image(image_path: str):
+    """Drop the cached prefix KV-cache of an image (e.g. when its session ends)."""
+    if os.path.exists(image_path):
+        _prefix_cache.pop(image_key(image_path))
 
 
 def unload_model():
@@ -160,15 +440,8 @@ def unload_model():
     Unload the model to free GPU memory.
     Useful for cleanup or switching models.
     """
-    global _model, _processor, _device
-    
-    if _model is not None:
-        del _model
-        _model = None
-    
-    if _processor is not None:
-        del _processor
-        _processor = None
+    _torch_manager.unload()
+    _prefix_cache.clear()
     
     # Clear GPU cache if using CUDA
     if torch.cuda.is_available():
@@ -177,6 +450,25 @@ def unload_model():
     print("Model unloaded.")
 
 
+def _model_bytes() -> int:
+    """Parameter and buffer bytes of the loaded model."""
+    loaded = _torch_manager.peek()
+    if loaded is None:
+        return 0
+    model = loaded[0]
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.nelement() * t.element_size() for t in tensors)
+
+
+# The governor unloads the model after MODEL_IDLE_SECONDS (or under memory
+# pressure, after the caches); load_model() brings it back on the next question
+register_resident('vqa_model', 'model', release=unload_model,
+                  is_loaded=lambda: _torch_manager.peek() is not None, size=_model_bytes,
+                  idle_timeout=MODEL_IDLE_SECONDS)
+register_resident('vqa_prefix_cache', 'cache', release=_prefix_cache.clear,
+                  is_loaded=lambda: len(_prefix_cache) > 0, size=_prefix_cache.estimated_bytes)
+
+
 if __name__ == "__main__":
     # Example usage
     import sys